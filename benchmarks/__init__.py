@@ -0,0 +1,5 @@
+"""
+Standalone performance benchmarks for Dione Ecommerce.
+
+Run one with ``python -m benchmarks.<name>`` from the repository root.
+"""
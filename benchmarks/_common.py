@@ -0,0 +1,34 @@
+"""
+Shared helpers for the benchmark scripts.
+"""
+import statistics
+import time
+
+from project import create_app, db
+
+
+def make_app(database_uri=None):
+    """Create a testing app with a fresh schema, optionally on another database."""
+    overrides = {"SQLALCHEMY_DATABASE_URI": database_uri} if database_uri else None
+    app = create_app("testing", config_overrides=overrides)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def report(label, timings, statements=None):
+    """Print a one-line summary of a list of timings in seconds."""
+    line = (
+        f"{label}: runs={len(timings)} "
+        f"median={statistics.median(timings) * 1000:.2f}ms "
+        f"min={min(timings) * 1000:.2f}ms max={max(timings) * 1000:.2f}ms"
+    )
+    if statements is not None:
+        line += f" statements/run={statements}"
+    print(line)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
@@ -0,0 +1,75 @@
+"""
+Benchmark ``checkout_cart`` on carts spanning many sellers.
+
+    python -m benchmarks.bench_checkout [--sellers 20] [--lines 3] [--runs 25]
+"""
+import argparse
+from decimal import Decimal
+
+from project import db
+from project.models import Cart, CartItem, Product, User
+from project.services.storefront_service import checkout_cart
+from project.utils.statements import StatementCounter
+
+from benchmarks._common import make_app, report, timed
+
+
+def seed(sellers: int, lines_per_seller: int):
+    seller_rows = [User(username=f"seller{i}", email=f"seller{i}@bench.local", role="seller") for i in range(sellers)]
+    db.session.add_all(seller_rows)
+    db.session.flush()
+    products = [
+        Product(seller_id=seller.id, name=f"P{seller.id}-{n}", price=Decimal("9.99"), stock=10**6)
+        for seller in seller_rows
+        for n in range(lines_per_seller)
+    ]
+    db.session.add_all(products)
+    db.session.commit()
+    return [product.id for product in products]
+
+
+def fill_cart(buyer: User, product_ids):
+    cart = Cart(user_id=buyer.id, status="active")
+    db.session.add(cart)
+    db.session.flush()
+    db.session.add_all(
+        CartItem(cart_id=cart.id, product_id=pid, quantity=2, unit_price=Decimal("9.99")) for pid in product_ids
+    )
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sellers", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=3, help="cart lines per seller")
+    parser.add_argument("--runs", type=int, default=25)
+    parser.add_argument("--database-uri", default=None)
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    with app.app_context():
+        product_ids = seed(args.sellers, args.lines)
+        buyer = User(username="buyer", email="buyer@bench.local")
+        db.session.add(buyer)
+        db.session.commit()
+        buyer_id = buyer.id
+
+        timings = []
+        statements = None
+        for _ in range(args.runs):
+            fill_cart(db.session.get(User, buyer_id), product_ids)
+            with StatementCounter(db.engine) as counter:
+                orders, elapsed = timed(checkout_cart, db.session.get(User, buyer_id))
+            assert len(orders) == args.sellers
+            timings.append(elapsed)
+            statements = counter.count
+        report(
+            f"checkout_cart sellers={args.sellers} lines={args.sellers * args.lines}",
+            timings,
+            statements,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark the admin order explorer on a large seeded ``order`` table.
+
+    python -m benchmarks.bench_order_explorer [--orders 1000000] [--sellers 200] [--buyers 20000] [--runs 10]
+
+Pass ``--database-uri`` to run against MySQL instead of in-memory SQLite.
+"""
+import argparse
+import random
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert, select
+
+from project import db
+from project.models import Order, User
+from project.services.order_explorer_service import (
+    OrderFilters,
+    encode_cursor,
+    iter_orders_csv,
+    list_orders,
+    order_totals,
+)
+from project.utils.statements import StatementCounter
+
+from benchmarks._common import make_app, report, timed
+
+SEED_CHUNK = 50_000
+
+
+def seed(orders: int, sellers: int, buyers: int, days: int):
+    """Insert sellers, buyers and ``orders`` orders spread over the last ``days`` days."""
+    db.session.execute(
+        insert(User),
+        [{"username": f"seller{idx}", "email": f"seller{idx}@bench.local", "role": "seller"} for idx in range(sellers)]
+        + [{"username": f"buyer{idx}", "email": f"buyer{idx}@bench.local", "role": "buyer"} for idx in range(buyers)],
+    )
+    seller_ids = db.session.execute(select(User.id).where(User.role == "seller")).scalars().all()
+    buyer_ids = db.session.execute(select(User.id).where(User.role == "buyer")).scalars().all()
+    rng = random.Random(42)
+    start = datetime.utcnow() - timedelta(days=days)
+    span = days * 86400
+    for offset in range(0, orders, SEED_CHUNK):
+        db.session.execute(
+            insert(Order),
+            [
+                {
+                    "seller_id": rng.choice(seller_ids),
+                    "buyer_id": rng.choice(buyer_ids) if rng.random() < 0.9 else None,
+                    "status": rng.choice(Order.STATUS_CHOICES),
+                    "total_amount": Decimal(rng.randint(100, 500_000)) / 100,
+                    "currency": "PHP",
+                    "placed_at": start + timedelta(seconds=rng.randrange(span)),
+                }
+                for _ in range(min(SEED_CHUNK, orders - offset))
+            ],
+        )
+        db.session.commit()
+    return seller_ids, buyer_ids
+
+
+def measure(label, runs, fn, *args, **kwargs):
+    timings = []
+    statements = None
+    result = None
+    for _ in range(runs):
+        with StatementCounter(db.engine) as counter:
+            result, elapsed = timed(fn, *args, **kwargs)
+        timings.append(elapsed)
+        statements = counter.count
+    report(label, timings, statements)
+    return result
+
+
+def export(filters):
+    return sum(len(chunk) for chunk in iter_orders_csv(filters))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--sellers", type=int, default=200)
+    parser.add_argument("--buyers", type=int, default=20_000)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-uri", default=None)
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    with app.app_context():
+        (seller_ids, buyer_ids), seconds = timed(seed, args.orders, args.sellers, args.buyers, args.days)
+        print(f"seeded {args.orders} orders in {seconds:.1f}s")
+
+        everything = OrderFilters()
+        last_month = OrderFilters(start=date.today() - timedelta(days=30), end=date.today())
+        shipped_last_month = last_month._replace(status="shipped")
+        one_seller = OrderFilters(seller_id=seller_ids[0])
+        one_buyer = OrderFilters(buyer_id=buyer_ids[0])
+
+        rows, _ = measure("first page, no filters", args.runs, list_orders, everything)
+        # A cursor half-way through the table: keyset pages cost the same at any depth.
+        middle = db.session.execute(
+            select(Order.id, Order.placed_at).order_by(Order.placed_at.desc(), Order.id.desc())
+            .offset(args.orders // 2).limit(1)
+        ).one()
+        measure("page at 50% depth", args.runs, list_orders, everything, after=encode_cursor(middle))
+        measure("first page, status + last 30 days", args.runs, list_orders, shipped_last_month)
+        measure("first page, one seller", args.runs, list_orders, one_seller)
+        measure("first page, one buyer", args.runs, list_orders, one_buyer)
+
+        measure("totals, no filters", args.runs, order_totals, everything)
+        measure("totals, last 30 days", args.runs, order_totals, last_month)
+        measure("totals, status + last 30 days", args.runs, order_totals, shipped_last_month)
+
+        size = measure("csv export, last 30 days", max(1, args.runs // 5), export, last_month)
+        print(f"csv export size {size / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
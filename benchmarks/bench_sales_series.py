@@ -0,0 +1,80 @@
+"""
+Benchmark ``sales_series`` over multi-year ``seller_daily_stats`` history.
+
+    python -m benchmarks.bench_sales_series [--years 3] [--density 0.8] [--runs 25]
+"""
+import argparse
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from sqlalchemy import insert
+
+from project import db
+from project.models import SellerDailyStats, User
+from project.services.analytics_service import GRANULARITIES, sales_series
+from project.utils.statements import StatementCounter
+
+from benchmarks._common import make_app, report, timed
+
+
+def seed(seller_id: int, start: date, days: int, density: float):
+    """Insert one rollup row for roughly ``density`` of the days in the range."""
+    rng = random.Random(seller_id)
+    rows = []
+    for offset in range(days):
+        if rng.random() > density:
+            continue
+        orders = rng.randint(1, 40)
+        revenue = Decimal(orders * rng.randint(5, 60))
+        rows.append({
+            "seller_id": seller_id,
+            "day": start + timedelta(days=offset),
+            "orders": orders,
+            "units": orders * rng.randint(1, 3),
+            "gross_revenue": revenue,
+            "recognized_revenue": revenue,
+        })
+    db.session.execute(insert(SellerDailyStats), rows)
+    db.session.commit()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--years", type=int, default=3)
+    parser.add_argument("--density", type=float, default=0.8, help="fraction of days with sales")
+    parser.add_argument("--window", type=int, default=7)
+    parser.add_argument("--runs", type=int, default=25)
+    parser.add_argument("--database-uri", default=None)
+    args = parser.parse_args()
+
+    app = make_app(args.database_uri)
+    with app.app_context():
+        seller = User(username="seller", email="seller@bench.local", role="seller")
+        db.session.add(seller)
+        db.session.commit()
+        # The series also reads the preceding period, so seed twice the range.
+        end = date.today()
+        days = 365 * args.years
+        start = end - timedelta(days=days - 1)
+        seeded = seed(seller.id, start - timedelta(days=days), days * 2, args.density)
+        print(f"seeded {seeded} daily rows")
+
+        for granularity in GRANULARITIES:
+            timings = []
+            statements = None
+            for _ in range(args.runs):
+                with StatementCounter(db.engine) as counter:
+                    payload, elapsed = timed(sales_series, seller.id, start, end, granularity, args.window)
+                timings.append(elapsed)
+                statements = counter.count
+            report(
+                f"sales_series years={args.years} granularity={granularity} buckets={len(payload['labels'])}",
+                timings,
+                statements,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,33 @@
+"""enforce one active cart per user
+
+Revision ID: 3f9a2c71e4b8
+Revises: d6fbc1d5d5b4
+Create Date: 2026-10-19 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a2c71e4b8'
+down_revision = 'd6fbc1d5d5b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('cart', sa.Column('active_user_id', sa.Integer(), nullable=True))
+    # Keep the newest active cart per user; older duplicates become abandoned
+    # and are swept up by the prune-carts job.
+    op.execute(
+        "UPDATE cart SET status = 'abandoned' "
+        "WHERE status = 'active' AND id NOT IN ("
+        "SELECT id FROM (SELECT MAX(id) AS id FROM cart WHERE status = 'active' GROUP BY user_id) AS newest)"
+    )
+    op.execute("UPDATE cart SET active_user_id = user_id WHERE status = 'active'")
+    op.create_unique_constraint('uq_cart_active_user_id', 'cart', ['active_user_id'])
+
+
+def downgrade():
+    op.drop_constraint('uq_cart_active_user_id', 'cart', type_='unique')
+    op.drop_column('cart', 'active_user_id')
@@ -0,0 +1,26 @@
+"""add user directory indexes
+
+Revision ID: 4f6c2d8b1a93
+Revises: 9b1e4c6f8a32
+Create Date: 2026-10-19 16:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4f6c2d8b1a93'
+down_revision = '9b1e4c6f8a32'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_user_username', 'user', ['username'])
+    op.create_index('ix_user_role_created', 'user', ['role', 'created_at'])
+    op.create_index('ix_user_pending_created', 'user', ['is_approved', 'role_requested', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_user_pending_created', table_name='user')
+    op.drop_index('ix_user_role_created', table_name='user')
+    op.drop_index('ix_user_username', table_name='user')
@@ -0,0 +1,28 @@
+"""add product sales counters
+
+Revision ID: 5be0f7a3c2d1
+Revises: a71c5e0d93f2
+Create Date: 2026-10-19 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5be0f7a3c2d1'
+down_revision = 'a71c5e0d93f2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('product', sa.Column('units_sold', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('product', sa.Column('revenue', sa.Numeric(14, 2), nullable=False, server_default='0'))
+    op.create_index('ix_product_seller_revenue', 'product', ['seller_id', 'revenue'])
+    # Run `flask reconcile-product-sales` afterwards to backfill existing orders.
+
+
+def downgrade():
+    op.drop_index('ix_product_seller_revenue', table_name='product')
+    op.drop_column('product', 'revenue')
+    op.drop_column('product', 'units_sold')
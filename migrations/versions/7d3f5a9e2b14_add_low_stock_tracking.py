@@ -0,0 +1,42 @@
+"""add reorder thresholds and low_stock_item
+
+Revision ID: 7d3f5a9e2b14
+Revises: e2a9b7d41c60
+Create Date: 2026-10-19 14:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7d3f5a9e2b14'
+down_revision = 'e2a9b7d41c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('product', sa.Column('reorder_threshold', sa.Integer(), nullable=False, server_default='5'))
+    op.create_table(
+        'low_stock_item',
+        sa.Column('product_id', sa.Integer(), sa.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('seller_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False),
+        sa.Column('threshold', sa.Integer(), nullable=False),
+        sa.Column('crossed_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('alerted_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_low_stock_item_seller_stock', 'low_stock_item', ['seller_id', 'stock'])
+    # Seed with products that are already low; they are marked alerted so the
+    # first digest run only reports new crossings.
+    op.execute(
+        "INSERT INTO low_stock_item (product_id, seller_id, stock, threshold, crossed_at, alerted_at) "
+        "SELECT id, seller_id, stock, reorder_threshold, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP "
+        "FROM product WHERE stock <= reorder_threshold"
+    )
+
+
+def downgrade():
+    op.drop_index('ix_low_stock_item_seller_stock', table_name='low_stock_item')
+    op.drop_table('low_stock_item')
+    op.drop_column('product', 'reorder_threshold')
@@ -0,0 +1,29 @@
+"""add platform_counter
+
+Revision ID: 9b1e4c6f8a32
+Revises: 7d3f5a9e2b14
+Create Date: 2026-10-19 15:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9b1e4c6f8a32'
+down_revision = '7d3f5a9e2b14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'platform_counter',
+        sa.Column('name', sa.String(64), primary_key=True),
+        sa.Column('value', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    )
+    # Run `flask rebuild-platform-counters` afterwards to seed the counts.
+
+
+def downgrade():
+    op.drop_table('platform_counter')
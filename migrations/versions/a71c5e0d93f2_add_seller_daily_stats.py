@@ -0,0 +1,40 @@
+"""add seller_daily_stats rollup
+
+Revision ID: a71c5e0d93f2
+Revises: 3f9a2c71e4b8
+Create Date: 2026-10-19 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a71c5e0d93f2'
+down_revision = '3f9a2c71e4b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'seller_daily_stats',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('seller_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('units', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('gross_revenue', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('recognized_revenue', sa.Numeric(14, 2), nullable=False, server_default='0'),
+        sa.Column('pending_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('processing_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('shipped_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('completed_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('cancelled_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.UniqueConstraint('seller_id', 'day', name='uq_seller_daily_stats_day'),
+    )
+    # Run `flask rebuild-seller-stats` afterwards to backfill existing orders.
+
+
+def downgrade():
+    op.drop_table('seller_daily_stats')
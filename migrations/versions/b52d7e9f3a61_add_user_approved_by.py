@@ -0,0 +1,29 @@
+"""add user approved_by_id and approved_at
+
+Revision ID: b52d7e9f3a61
+Revises: a83e5f1c7d24
+Create Date: 2026-10-19 18:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b52d7e9f3a61'
+down_revision = 'a83e5f1c7d24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('approved_by_id', sa.Integer(), nullable=True))
+    op.add_column('user', sa.Column('approved_at', sa.DateTime(), nullable=True))
+    op.create_foreign_key(
+        'fk_user_approved_by_id_user', 'user', 'user', ['approved_by_id'], ['id'], ondelete='SET NULL'
+    )
+
+
+def downgrade():
+    op.drop_constraint('fk_user_approved_by_id_user', 'user', type_='foreignkey')
+    op.drop_column('user', 'approved_at')
+    op.drop_column('user', 'approved_by_id')
@@ -0,0 +1,24 @@
+"""add seller order list indexes
+
+Revision ID: c4d81e6b0f27
+Revises: 5be0f7a3c2d1
+Create Date: 2026-10-19 12:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d81e6b0f27'
+down_revision = '5be0f7a3c2d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_order_seller_placed', 'order', ['seller_id', 'placed_at'])
+    op.create_index('ix_order_seller_status_placed', 'order', ['seller_id', 'status', 'placed_at'])
+
+
+def downgrade():
+    op.drop_index('ix_order_seller_status_placed', table_name='order')
+    op.drop_index('ix_order_seller_placed', table_name='order')
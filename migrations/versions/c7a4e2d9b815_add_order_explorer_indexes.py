@@ -0,0 +1,26 @@
+"""add order explorer indexes
+
+Revision ID: c7a4e2d9b815
+Revises: b52d7e9f3a61
+Create Date: 2026-10-19 19:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7a4e2d9b815'
+down_revision = 'b52d7e9f3a61'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_order_placed_status_total', 'order', ['placed_at', 'status', 'total_amount'])
+    op.create_index('ix_order_status_placed_total', 'order', ['status', 'placed_at', 'total_amount'])
+    op.create_index('ix_order_buyer_placed', 'order', ['buyer_id', 'placed_at'])
+
+
+def downgrade():
+    op.drop_index('ix_order_buyer_placed', table_name='order')
+    op.drop_index('ix_order_status_placed_total', table_name='order')
+    op.drop_index('ix_order_placed_status_total', table_name='order')
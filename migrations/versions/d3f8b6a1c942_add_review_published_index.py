@@ -0,0 +1,22 @@
+"""add review published index
+
+Revision ID: d3f8b6a1c942
+Revises: c7a4e2d9b815
+Create Date: 2026-10-19 20:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3f8b6a1c942'
+down_revision = 'c7a4e2d9b815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_review_published_created', 'review', ['is_published', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_review_published_created', table_name='review')
@@ -0,0 +1,33 @@
+"""add inventory snapshots and ledger index
+
+Revision ID: e2a9b7d41c60
+Revises: c4d81e6b0f27
+Create Date: 2026-10-19 13:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e2a9b7d41c60'
+down_revision = 'c4d81e6b0f27'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_inventory_transaction_product_id_id', 'inventory_transaction', ['product_id', 'id'])
+    op.create_table(
+        'inventory_snapshot',
+        sa.Column('product_id', sa.Integer(), sa.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True),
+        sa.Column('balance', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_transaction_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('taken_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+    )
+    # Checkouts before this revision did not write ledger rows; run
+    # `flask reconcile-inventory` to list the products that drifted.
+
+
+def downgrade():
+    op.drop_table('inventory_snapshot')
+    op.drop_index('ix_inventory_transaction_product_id_id', table_name='inventory_transaction')
@@ -0,0 +1,47 @@
+"""add user deleted_at and user_deletion_job
+
+Revision ID: e8c1f4a7b263
+Revises: d3f8b6a1c942
+Create Date: 2026-10-19 21:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8c1f4a7b263'
+down_revision = 'd3f8b6a1c942'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('user', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_table(
+        'user_deletion_job',
+        sa.Column('id', sa.Integer(), primary_key=True),
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('user.id'), nullable=False, unique=True),
+        sa.Column('requested_by_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('status', sa.String(20), nullable=False, server_default='pending'),
+        sa.Column('stage', sa.String(20), nullable=False, server_default='store_reviews'),
+        sa.Column('last_id', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('products_removed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('products_retired', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('files_removed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('reviews_removed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('carts_removed', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('orders_anonymized', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('attempts', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('last_error', sa.String(500), nullable=True),
+        sa.Column('claimed_until', sa.DateTime(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP'), nullable=False),
+        sa.Column('finished_at', sa.DateTime(), nullable=True),
+    )
+    op.create_index('ix_user_deletion_job_status_claimed', 'user_deletion_job', ['status', 'claimed_until'])
+
+
+def downgrade():
+    op.drop_index('ix_user_deletion_job_status_claimed', table_name='user_deletion_job')
+    op.drop_table('user_deletion_job')
+    op.drop_column('user', 'deleted_at')
@@ -0,0 +1,37 @@
+"""add audit_event
+
+Revision ID: f4b9d2e6a718
+Revises: e8c1f4a7b263
+Create Date: 2026-10-19 22:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b9d2e6a718'
+down_revision = 'e8c1f4a7b263'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'audit_event',
+        sa.Column('id', sa.BigInteger(), primary_key=True, autoincrement=False),
+        sa.Column('actor_id', sa.Integer(), sa.ForeignKey('user.id', ondelete='SET NULL'), nullable=True),
+        sa.Column('action', sa.String(50), nullable=False),
+        sa.Column('target_type', sa.String(30), nullable=True),
+        sa.Column('target_id', sa.Integer(), nullable=True),
+        sa.Column('details', sa.Text(), nullable=True),
+    )
+    op.create_index('ix_audit_event_action_id', 'audit_event', ['action', 'id'])
+    op.create_index('ix_audit_event_actor_id', 'audit_event', ['actor_id', 'id'])
+    op.create_index('ix_audit_event_target_id', 'audit_event', ['target_type', 'target_id', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_audit_event_target_id', table_name='audit_event')
+    op.drop_index('ix_audit_event_actor_id', table_name='audit_event')
+    op.drop_index('ix_audit_event_action_id', table_name='audit_event')
+    op.drop_table('audit_event')
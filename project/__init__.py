@@ -12,13 +12,15 @@ db = SQLAlchemy()
 jwt = JWTManager()
 mail = Mail()
 
-def create_app(config_name='default'):
+def create_app(config_name='default', config_overrides=None):
     """Create and configure Flask application"""
     app = Flask(__name__)
 
     # Load configuration
     from .config import config
     app.config.from_object(config[config_name])
+    # Applied before the extensions initialise, since engines are created in init_app.
+    app.config.update(config_overrides or {})
     os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
     db.init_app(app)
     jwt.init_app(app)
@@ -52,4 +54,13 @@ def create_app(config_name='default'):
     app.register_blueprint(seller_bp)
     app.register_blueprint(shop_bp)
 
+    from .services.settings_service import maintenance_gate
+    app.before_request(maintenance_gate)
+
+    from .services.audit_service import flush_audit_log_on_teardown
+    app.teardown_appcontext(flush_audit_log_on_teardown)
+
+    from .commands import register_commands
+    register_commands(app)
+
     return app
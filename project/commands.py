@@ -0,0 +1,181 @@
+"""
+Flask CLI commands for maintenance jobs (``flask --app app <command>``).
+"""
+import time
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from project.services.account_deletion_service import drain_deletion_jobs
+from project.services.email_service import drain_outbox
+from project.services.inventory_service import (
+    iter_inventory_drift_batches,
+    rebuild_low_stock,
+    repair_inventory_drift,
+    send_low_stock_digests,
+    take_inventory_snapshots,
+)
+from project.services.platform_service import rebuild_platform_counters
+from project.services.retention_service import prune_carts
+from project.services.stats_service import rebuild_seller_daily_stats, reconcile_product_sales
+from project.utils.debug_smtp import DebugSMTPServer
+
+
+@click.command("prune-carts")
+@click.option("--active-ttl-days", type=int, default=None, help="Age after which idle active carts are removed.")
+@click.option("--batch-size", type=int, default=500, show_default=True)
+@click.option("--pause", type=float, default=0.0, show_default=True, help="Seconds to sleep between batches.")
+@click.option("--dry-run", is_flag=True, help="Report what would be deleted without deleting it.")
+@with_appcontext
+def prune_carts_command(active_ttl_days, batch_size, pause, dry_run):
+    """Delete checked-out carts and abandoned active carts in batches."""
+    if active_ttl_days is None:
+        active_ttl_days = current_app.config["ABANDONED_CART_TTL_DAYS"]
+    report = prune_carts(
+        active_ttl_days=active_ttl_days,
+        batch_size=batch_size,
+        dry_run=dry_run,
+        pause=pause,
+    )
+    verb = "Would delete" if dry_run else "Deleted"
+    click.echo(
+        f"{verb} {report['checked_out_carts']} checked-out cart(s), "
+        f"{report['expired_active_carts']} abandoned cart(s) and "
+        f"{report['cart_items']} cart item(s) in {report['batches']} batch(es)."
+    )
+
+
+@click.command("rebuild-seller-stats")
+@click.option("--seller-id", type=int, default=None, help="Rebuild a single seller instead of everyone.")
+@with_appcontext
+def rebuild_seller_stats_command(seller_id):
+    """Backfill or rebuild the seller_daily_stats rollup from the order table."""
+    processed = rebuild_seller_daily_stats(seller_id)
+    click.echo(f"Rebuilt daily stats for {processed} seller(s).")
+
+
+@click.command("reconcile-product-sales")
+@click.option("--seller-id", type=int, default=None, help="Reconcile a single seller's products.")
+@with_appcontext
+def reconcile_product_sales_command(seller_id):
+    """Recompute product units_sold/revenue counters from order items."""
+    corrected = reconcile_product_sales(seller_id)
+    click.echo(f"Corrected sales counters on {corrected} product(s).")
+
+
+@click.command("snapshot-inventory")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+@with_appcontext
+def snapshot_inventory_command(batch_size):
+    """Roll recent inventory ledger rows into per-product balance snapshots."""
+    advanced = take_inventory_snapshots(batch_size=batch_size)
+    click.echo(f"Advanced inventory snapshots for {advanced} product(s).")
+
+
+@click.command("reconcile-inventory")
+@click.option("--batch-size", type=int, default=1000, show_default=True)
+@click.option("--repair", is_flag=True, help="Write reconciliation ledger rows so the ledger matches stock.")
+@with_appcontext
+def reconcile_inventory_command(batch_size, repair):
+    """Report products whose stock disagrees with the inventory ledger."""
+    repaired = 0
+    for drifts in iter_inventory_drift_batches(batch_size=batch_size):
+        for drift in drifts:
+            click.echo(
+                f"product {drift['product_id']} (seller {drift['seller_id']}): "
+                f"stock={drift['stock']} ledger={drift['ledger_balance']} drift={drift['drift']:+d}"
+            )
+        if repair:
+            # Each batch is repaired as it arrives, so only one is ever held in memory.
+            repaired += repair_inventory_drift(drifts)
+    if repair:
+        click.echo(f"Wrote {repaired} reconciliation row(s).")
+
+
+@click.command("rebuild-low-stock")
+@click.option("--seller-id", type=int, default=None, help="Rebuild a single seller instead of everyone.")
+@with_appcontext
+def rebuild_low_stock_command(seller_id):
+    """Re-derive the low-stock table from current product stock."""
+    scanned = rebuild_low_stock(seller_id)
+    click.echo(f"Checked {scanned} product(s) against their reorder thresholds.")
+
+
+@click.command("send-low-stock-digests")
+@with_appcontext
+def send_low_stock_digests_command():
+    """Queue one digest email per seller for products that newly reached their reorder threshold."""
+    queued = send_low_stock_digests()
+    click.echo(f"Queued {queued} low-stock digest(s).")
+
+
+@click.command("rebuild-platform-counters")
+@with_appcontext
+def rebuild_platform_counters_command():
+    """Recompute the platform_counter rows from the user table."""
+    counts = rebuild_platform_counters()
+    click.echo(", ".join(f"{name}={value}" for name, value in sorted(counts.items())) or "No users.")
+
+
+@click.command("send-outbox")
+@click.option("--watch", is_flag=True, help="Keep polling for new mail instead of exiting once drained.")
+@with_appcontext
+def send_outbox_command(watch):
+    """Deliver queued email from the outbox over reused SMTP connections."""
+    while True:
+        processed = drain_outbox()
+        if processed or not watch:
+            click.echo(f"Processed {processed} outbox message(s).")
+        if not watch:
+            return
+        time.sleep(current_app.config["EMAIL_OUTBOX_POLL_SECONDS"])
+
+
+@click.command("process-user-deletions")
+@click.option("--watch", is_flag=True, help="Keep polling for new deletion jobs instead of exiting when idle.")
+@click.option("--chunk-size", type=int, default=None, help="Rows handled per transaction.")
+@with_appcontext
+def process_user_deletions_command(watch, chunk_size):
+    """Remove the data of deleted accounts, one bounded chunk per transaction."""
+    while True:
+        steps = drain_deletion_jobs(chunk_size)
+        if steps or not watch:
+            click.echo(f"Processed {steps} deletion chunk(s).")
+        if not watch:
+            return
+        time.sleep(current_app.config["USER_DELETION_POLL_SECONDS"])
+
+
+@click.command("debug-smtp")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=1025, show_default=True)
+def debug_smtp_command(host, port):
+    """Run a local SMTP stand-in that prints every message it receives."""
+    server = DebugSMTPServer(host, port)
+    click.echo(f"Debug SMTP server listening on {host}:{server.port}")
+    server.start()
+    seen = 0
+    try:
+        while True:
+            time.sleep(0.5)
+            for message in server.messages[seen:]:
+                click.echo(f"--- from {message.sender} to {', '.join(message.recipients)}")
+                click.echo(message.data.decode(errors="replace"))
+            seen = len(server.messages)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+def register_commands(app):
+    app.cli.add_command(prune_carts_command)
+    app.cli.add_command(rebuild_seller_stats_command)
+    app.cli.add_command(reconcile_product_sales_command)
+    app.cli.add_command(snapshot_inventory_command)
+    app.cli.add_command(reconcile_inventory_command)
+    app.cli.add_command(rebuild_low_stock_command)
+    app.cli.add_command(send_low_stock_digests_command)
+    app.cli.add_command(rebuild_platform_counters_command)
+    app.cli.add_command(send_outbox_command)
+    app.cli.add_command(process_user_deletions_command)
+    app.cli.add_command(debug_smtp_command)
@@ -42,6 +42,34 @@ class Config:
     MAX_CONTENT_LENGTH = 10 * 1024 * 1024  # 10 MB upload ceiling
     UPLOAD_FOLDER = os.path.join(BASE_DIR, 'static', 'uploads')
     ALLOWED_IMAGE_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'webp'}
+    GUEST_CART_MAX_AGE = 30 * 24 * 3600  # seconds a guest cart cookie survives
+    ABANDONED_CART_TTL_DAYS = 60  # idle active carts older than this are pruned
+    SELLER_METRICS_SOFT_TTL = 30  # seconds before cached seller metrics are refreshed
+    SELLER_METRICS_HARD_TTL = 600  # seconds after which stale metrics are never served
+    SELLER_METRICS_ASYNC_REFRESH = True
+    PLATFORM_METRICS_SOFT_TTL = 60  # seconds before cached admin figures are refreshed
+    PLATFORM_METRICS_HARD_TTL = 900  # seconds after which stale admin figures are never served
+    PLATFORM_METRICS_ASYNC_REFRESH = True
+    # Read admin user counts from the maintained platform_counter rows instead
+    # of a grouped COUNT over the user table (run `flask rebuild-platform-counters` first).
+    ADMIN_COUNTS_FROM_COUNTERS = False
+    # Outgoing mail is queued in email_outbox and delivered off the request path.
+    EMAIL_OUTBOX_BACKGROUND = True  # run the sender thread in-process; or use `flask send-outbox --watch`
+    EMAIL_OUTBOX_BATCH_SIZE = 50  # messages sent per SMTP connection
+    EMAIL_OUTBOX_POLL_SECONDS = 15
+    EMAIL_OUTBOX_RETRY_BASE = 30  # seconds before the first retry, doubling after each failure
+    EMAIL_OUTBOX_RETRY_MAX = 3600
+    EMAIL_OUTBOX_MAX_ATTEMPTS = 6
+    # Deleted accounts are cleared in chunks by a background worker.
+    USER_DELETION_BACKGROUND = True  # run the worker thread in-process; or use `flask process-user-deletions --watch`
+    USER_DELETION_CHUNK_SIZE = 200  # rows handled per transaction
+    USER_DELETION_POLL_SECONDS = 30
+    USER_DELETION_MAX_ATTEMPTS = 5
+    # Admin actions are buffered in-process and written to audit_event in batches.
+    AUDIT_BACKGROUND = True  # write from a background thread; otherwise when each app context ends
+    AUDIT_FLUSH_SECONDS = 5
+    AUDIT_BATCH_SIZE = 500  # rows per insert; a fuller buffer is written early
+    SITE_SETTINGS_CHECK_SECONDS = 5  # how stale another process's settings change may be here
 
 class DevelopmentConfig(Config):
     """Development configuration"""
@@ -56,6 +84,11 @@ class TestingConfig(Config):
     WTF_CSRF_ENABLED = False
     MAIL_SUPPRESS_SEND = True
     SECRET_KEY = 'test-secret-key'
+    SELLER_METRICS_ASYNC_REFRESH = False
+    PLATFORM_METRICS_ASYNC_REFRESH = False
+    EMAIL_OUTBOX_BACKGROUND = False
+    USER_DELETION_BACKGROUND = False
+    AUDIT_BACKGROUND = False
 
 class ProductionConfig(Config):
     """Production configuration"""
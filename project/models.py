@@ -6,6 +6,7 @@ from flask_dance.consumer.storage.sqla import OAuthConsumerMixin
 from flask import current_app
 import jwt
 from time import time
+from .utils.timeids import id_timestamp
 
 class User(UserMixin, db.Model):
   id = db.Column(db.Integer, primary_key=True)
@@ -20,6 +21,16 @@ class User(UserMixin, db.Model):
   is_approved = db.Column(db.Boolean, nullable=False, default=True)
   created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
   is_suspended = db.Column(db.Boolean, nullable=False, default=False)
+  approved_by_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'))  # admin who approved the role request
+  approved_at = db.Column(db.DateTime)
+  deleted_at = db.Column(db.DateTime)  # set when deletion is requested; the row is anonymized, never removed
+
+  # Admin directory: username prefix search, role filter and pending queue by date
+  __table_args__ = (
+    db.Index('ix_user_username', 'username'),
+    db.Index('ix_user_role_created', 'role', 'created_at'),
+    db.Index('ix_user_pending_created', 'is_approved', 'role_requested', 'created_at'),
+  )
 
 
   oauth = db.relationship('OAuth', back_populates='user')
@@ -107,6 +118,18 @@ class SiteSetting(db.Model):
     return f"<SiteSetting {self.key}={self.value}>"
 
 
+# Maintained platform-wide counts (users, per-role users, pending requests).
+class PlatformCounter(db.Model):
+  __tablename__ = 'platform_counter'
+
+  name = db.Column(db.String(64), primary_key=True)
+  value = db.Column(db.Integer, nullable=False, default=0)
+  updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
+
+  def __repr__(self):
+    return f"<PlatformCounter {self.name}={self.value}>"
+
+
 class Category(db.Model):
   id = db.Column(db.Integer, primary_key=True)
   name = db.Column(db.String(120), nullable=False, unique=True)
@@ -131,11 +154,17 @@ class Product(db.Model):
   price = db.Column(db.Numeric(12, 2), nullable=False, default=0)
   sku = db.Column(db.String(64), unique=True)
   stock = db.Column(db.Integer, nullable=False, default=0)
+  reorder_threshold = db.Column(db.Integer, nullable=False, default=5, server_default='5')
   is_active = db.Column(db.Boolean, default=True, nullable=False)
   is_featured = db.Column(db.Boolean, default=False, nullable=False)
+  # Lifetime sales counters, maintained when orders are written (see stats_service).
+  units_sold = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+  revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0, server_default='0')
   created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
   updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
 
+  __table_args__ = (db.Index('ix_product_seller_revenue', 'seller_id', 'revenue'),)
+
   seller = db.relationship('User', backref=db.backref('products', lazy='dynamic'))
   category = db.relationship('Category', back_populates='products')
   images = db.relationship('ProductImage', back_populates='product', cascade='all, delete-orphan')
@@ -183,12 +212,44 @@ class InventoryTransaction(db.Model):
   note = db.Column(db.String(255))
   created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
 
+  __table_args__ = (db.Index('ix_inventory_transaction_product_id_id', 'product_id', 'id'),)
+
   product = db.relationship('Product', back_populates='inventory_transactions')
 
   def __repr__(self):
     return f"<InventoryTransaction product={self.product_id} change={self.change}>"
 
 
+# Products at or below their reorder threshold, maintained on every stock write.
+# alerted_at stays NULL until the seller's next low-stock digest goes out.
+class LowStockItem(db.Model):
+  __tablename__ = 'low_stock_item'
+  __table_args__ = (db.Index('ix_low_stock_item_seller_stock', 'seller_id', 'stock'),)
+
+  product_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True)
+  seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+  stock = db.Column(db.Integer, nullable=False)
+  threshold = db.Column(db.Integer, nullable=False)
+  crossed_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+  alerted_at = db.Column(db.DateTime, nullable=True)
+
+  def __repr__(self):
+    return f"<LowStockItem product={self.product_id} stock={self.stock}/{self.threshold}>"
+
+
+# Latest ledger balance per product; only rows after last_transaction_id need replaying.
+class InventorySnapshot(db.Model):
+  __tablename__ = 'inventory_snapshot'
+
+  product_id = db.Column(db.Integer, db.ForeignKey('product.id', ondelete='CASCADE'), primary_key=True)
+  balance = db.Column(db.Integer, nullable=False, default=0)
+  last_transaction_id = db.Column(db.Integer, nullable=False, default=0)
+  taken_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+
+  def __repr__(self):
+    return f"<InventorySnapshot product={self.product_id} balance={self.balance}>"
+
+
 class Order(db.Model):
   id = db.Column(db.Integer, primary_key=True)
   seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
@@ -199,6 +260,16 @@ class Order(db.Model):
   placed_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
   updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
 
+  __table_args__ = (
+    db.Index('ix_order_seller_placed', 'seller_id', 'placed_at'),
+    db.Index('ix_order_seller_status_placed', 'seller_id', 'status', 'placed_at'),
+    # Admin order explorer: newest-first pages and totals per filter, with the
+    # totals read from the index alone.
+    db.Index('ix_order_placed_status_total', 'placed_at', 'status', 'total_amount'),
+    db.Index('ix_order_status_placed_total', 'status', 'placed_at', 'total_amount'),
+    db.Index('ix_order_buyer_placed', 'buyer_id', 'placed_at'),
+  )
+
   seller = db.relationship('User', foreign_keys=[seller_id], backref=db.backref('orders', lazy='dynamic'))
   buyer = db.relationship('User', foreign_keys=[buyer_id])
   items = db.relationship('OrderItem', back_populates='order', cascade='all, delete-orphan')
@@ -212,6 +283,29 @@ class Order(db.Model):
     self.total_amount = sum((item.quantity * item.unit_price) for item in self.items)
 
 
+# Per-seller, per-day order rollup maintained on every order write.
+class SellerDailyStats(db.Model):
+  __tablename__ = 'seller_daily_stats'
+  __table_args__ = (db.UniqueConstraint('seller_id', 'day', name='uq_seller_daily_stats_day'),)
+
+  id = db.Column(db.Integer, primary_key=True)
+  seller_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+  day = db.Column(db.Date, nullable=False)
+  orders = db.Column(db.Integer, nullable=False, default=0)
+  units = db.Column(db.Integer, nullable=False, default=0)
+  gross_revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+  recognized_revenue = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+  pending_count = db.Column(db.Integer, nullable=False, default=0)
+  processing_count = db.Column(db.Integer, nullable=False, default=0)
+  shipped_count = db.Column(db.Integer, nullable=False, default=0)
+  completed_count = db.Column(db.Integer, nullable=False, default=0)
+  cancelled_count = db.Column(db.Integer, nullable=False, default=0)
+  updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
+
+  def __repr__(self):
+    return f"<SellerDailyStats seller={self.seller_id} day={self.day} orders={self.orders}>"
+
+
 class OrderItem(db.Model):
   id = db.Column(db.Integer, primary_key=True)
   order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
@@ -277,10 +371,18 @@ class ProductVariant(db.Model):
     return f"<ProductVariant product={self.product_id} {self.attribute}={self.value}>"
 
 
+def _active_cart_owner(context):
+  params = context.get_current_parameters()
+  return params['user_id'] if params.get('status', 'active') == 'active' else None
+
+
 class Cart(db.Model):
   id = db.Column(db.Integer, primary_key=True)
   user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
   status = db.Column(db.String(20), nullable=False, default='active')
+  # Mirrors user_id while the cart is active and is NULL afterwards, so the
+  # unique constraint allows at most one active cart per user on every backend.
+  active_user_id = db.Column(db.Integer, unique=True, default=_active_cart_owner)
   created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
   updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
 
@@ -319,6 +421,9 @@ class Review(db.Model):
   is_published = db.Column(db.Boolean, nullable=False, default=True)
   created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
 
+  # Content center: newest reviews per published/hidden state
+  __table_args__ = (db.Index('ix_review_published_created', 'is_published', 'created_at'),)
+
   product = db.relationship('Product', back_populates='reviews')
   store = db.relationship('StoreProfile', backref=db.backref('reviews', lazy='dynamic'))
   user = db.relationship('User')
@@ -368,3 +473,93 @@ class OrderTrackingEvent(db.Model):
     return f"<OrderTrackingEvent order={self.order_id} status={self.status}>"
 
 
+# Durable queue of outgoing email. Rows are written in the same transaction as
+# the change they announce and delivered by the outbox sender.
+class EmailOutbox(db.Model):
+  __tablename__ = 'email_outbox'
+  __table_args__ = (db.Index('ix_email_outbox_status_next_attempt', 'status', 'next_attempt_at'),)
+
+  id = db.Column(db.Integer, primary_key=True)
+  recipients = db.Column(db.Text, nullable=False)  # comma-separated addresses
+  sender = db.Column(db.String(255))
+  subject = db.Column(db.String(255), nullable=False)
+  body = db.Column(db.Text)
+  html = db.Column(db.Text)
+  status = db.Column(db.String(20), nullable=False, default='pending')  # pending, sent, failed
+  attempts = db.Column(db.Integer, nullable=False, default=0)
+  next_attempt_at = db.Column(db.DateTime, nullable=False)
+  last_error = db.Column(db.String(500))
+  created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+  sent_at = db.Column(db.DateTime)
+
+  def __repr__(self):
+    return f"<EmailOutbox {self.id} {self.status} to={self.recipients}>"
+
+
+# One per deleted account. The deletion worker removes or anonymizes the
+# account's data a chunk at a time; stage and last_id say where to resume.
+class UserDeletionJob(db.Model):
+  __tablename__ = 'user_deletion_job'
+  __table_args__ = (db.Index('ix_user_deletion_job_status_claimed', 'status', 'claimed_until'),)
+
+  STAGES = ('store_reviews', 'products', 'reviews', 'carts', 'orders', 'account')
+
+  id = db.Column(db.Integer, primary_key=True)
+  user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, unique=True)
+  requested_by_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'))
+  status = db.Column(db.String(20), nullable=False, default='pending')  # pending, running, done, failed
+  stage = db.Column(db.String(20), nullable=False, default='store_reviews')
+  last_id = db.Column(db.Integer, nullable=False, default=0)  # last id handled in the current stage
+  products_removed = db.Column(db.Integer, nullable=False, default=0)
+  products_retired = db.Column(db.Integer, nullable=False, default=0)  # kept, deactivated, for order history
+  files_removed = db.Column(db.Integer, nullable=False, default=0)
+  reviews_removed = db.Column(db.Integer, nullable=False, default=0)
+  carts_removed = db.Column(db.Integer, nullable=False, default=0)
+  orders_anonymized = db.Column(db.Integer, nullable=False, default=0)
+  attempts = db.Column(db.Integer, nullable=False, default=0)
+  last_error = db.Column(db.String(500))
+  claimed_until = db.Column(db.DateTime)
+  created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+  updated_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now(), onupdate=db.func.now())
+  finished_at = db.Column(db.DateTime)
+
+  user = db.relationship('User', foreign_keys=[user_id])
+
+  def __repr__(self):
+    return f"<UserDeletionJob user={self.user_id} {self.status}/{self.stage}>"
+
+
+# Append-only trail of admin actions, written in batches by audit_service.
+# Ids are time-ordered (utils.timeids), so the primary key is also the time index.
+class AuditEvent(db.Model):
+  __tablename__ = 'audit_event'
+  __table_args__ = (
+    db.Index('ix_audit_event_action_id', 'action', 'id'),
+    db.Index('ix_audit_event_actor_id', 'actor_id', 'id'),
+    db.Index('ix_audit_event_target_id', 'target_type', 'target_id', 'id'),
+  )
+
+  id = db.Column(db.BigInteger, primary_key=True, autoincrement=False)
+  actor_id = db.Column(db.Integer, db.ForeignKey('user.id', ondelete='SET NULL'))
+  action = db.Column(db.String(50), nullable=False)
+  target_type = db.Column(db.String(30))
+  target_id = db.Column(db.Integer)
+  details = db.Column(db.Text)  # JSON object
+
+  actor = db.relationship('User')
+
+  def __repr__(self):
+    return f"<AuditEvent {self.id} {self.action} {self.target_type}={self.target_id}>"
+
+  @property
+  def occurred_at(self):
+    return id_timestamp(self.id)
+
+  @property
+  def details_dict(self):
+    if not self.details:
+      return {}
+    try:
+      return json.loads(self.details)
+    except (TypeError, json.JSONDecodeError):
+      return {}
@@ -1,14 +1,40 @@
 """
 Admin routes for managing user approvals and viewing admin dashboard
 """
-from flask import Blueprint, render_template, redirect, url_for, flash, request, current_app
+from flask import Blueprint, Response, render_template, redirect, url_for, flash, request, stream_with_context
 from flask_login import login_required, current_user, login_user, logout_user
 from werkzeug.security import check_password_hash
-from flask_mail import Message
-from project import db, mail
-from project.models import Order, Review, SiteSetting, StoreProfile, User
-from project.services.storefront_service import moderate_review
-from sqlalchemy import func
+from project import db
+from project.models import Order, User
+from project.services.account_deletion_service import deletion_jobs_for, request_user_deletion
+from project.services.admin_service import (
+    AdminError,
+    USER_ROLES,
+    USER_SORTS,
+    USER_STATUSES,
+    list_pending_requests,
+    list_reviews,
+    list_users,
+    review_role_requests,
+)
+from project.services.audit_service import (
+    AUDIT_ACTIONS,
+    AUDIT_FILTER_ARGS,
+    AuditError,
+    list_audit_events,
+    parse_audit_filters,
+    record_audit,
+)
+from project.services.order_explorer_service import (
+    ORDER_FILTER_ARGS,
+    iter_orders_csv,
+    list_orders,
+    order_totals,
+    parse_order_filters,
+)
+from project.services.platform_service import monitoring_metrics, user_overview_counts
+from project.services.settings_service import ensure_default_settings, save_settings, to_bool
+from project.services.storefront_service import StorefrontError, moderate_review, moderate_reviews
 
 admin_bp = Blueprint('admin', __name__, url_prefix='/admin')
 
@@ -69,56 +95,56 @@ def profile():
 @login_required
 def overview():
     """Overview dashboard with statistics"""
-    # KPIs
-    total_users = User.query.count()
-    total_buyers = User.query.filter_by(role='buyer').count()
-    total_sellers = User.query.filter_by(role='seller').count()
-    total_riders = User.query.filter_by(role='rider').count()
-    total_pending = User.query.filter(
-        User.role_requested.isnot(None),
-        User.is_approved.is_(False)
-    ).count()
-
-    return render_template(
-        'admin/overview.html',
-        total_users=total_users,
-        total_buyers=total_buyers,
-        total_sellers=total_sellers,
-        total_riders=total_riders,
-        total_pending=total_pending
-    )
+    counts, counts_age = user_overview_counts()
+    return render_template('admin/overview.html', counts_age=counts_age, **counts)
 
 
 @admin_bp.get('/pending')
 @login_required
 def pending():
     """Pending approvals page"""
-    pending_requests = User.query.filter(
-        User.role_requested.isnot(None),
-        User.is_approved.is_(False)
-    ).order_by(User.created_at.desc()).all()
-
-    return render_template('admin/pending.html', pending_requests=pending_requests)
+    search = request.args.get('q', '').strip()
+    role = request.args.get('role') or None
+    sort = request.args.get('sort', 'newest')
+    if sort not in USER_SORTS:
+        sort = 'newest'
+    listing = list_pending_requests(
+        search=search, role=role, sort=sort, page=request.args.get('page', 1, type=int)
+    )
+    return render_template(
+        'admin/pending.html',
+        pending_requests=listing.rows,
+        listing=listing,
+        search=search,
+        role=role,
+        sort=sort,
+    )
 
 
 @admin_bp.get('/users')
 @login_required
 def users():
     """User management page"""
-    buyers = User.query.filter_by(role='buyer', is_approved=True).order_by(User.created_at.desc()).all()
-    sellers = User.query.filter_by(role='seller', is_approved=True).order_by(User.created_at.desc()).all()
-    riders = User.query.filter_by(role='rider', is_approved=True).order_by(User.created_at.desc()).all()
-    pending_requests = User.query.filter(
-        User.role_requested.isnot(None),
-        User.is_approved.is_(False)
-    ).order_by(User.created_at.desc()).all()
-
+    search = request.args.get('q', '').strip()
+    role = request.args.get('role') or None
+    status = request.args.get('status') or None
+    sort = request.args.get('sort', 'newest')
+    if sort not in USER_SORTS:
+        sort = 'newest'
+    listing = list_users(
+        search=search, role=role, status=status, sort=sort, page=request.args.get('page', 1, type=int)
+    )
     return render_template(
         'admin/users.html',
-        buyers=buyers,
-        sellers=sellers,
-        riders=riders,
-        pending_requests=pending_requests
+        users=listing.rows,
+        listing=listing,
+        deletions=deletion_jobs_for(user.id for user in listing.rows if user.deleted_at),
+        search=search,
+        role=role,
+        status=status,
+        sort=sort,
+        roles=USER_ROLES,
+        statuses=USER_STATUSES,
     )
 
 
@@ -132,23 +158,11 @@ def approve_request(user_id):
         return redirect(url_for('admin.users'))
 
     try:
-        new_role = user.role_requested
-        user.role = new_role
-        user.is_approved = True
-        user.role_requested = None
-        db.session.commit()
-
-        _send_notification(
-            user,
-            subject=f"Your {new_role} request has been approved",
-            body=(
-                f"Hi {user.username},\n\n"
-                f"Good news! Your request to become a {new_role} has been approved. "
-                "You may now log in and use the new dashboard.\n\n"
-                "Thanks,\nDione Admin Team"
-            )
-        )
-        flash(f"{user.username}'s request approved as {new_role}.", 'success')
+        reviewed = review_role_requests([user.id], approve=True, reviewer_id=current_user.id)
+        if reviewed:
+            flash(f"{reviewed[0].username}'s request approved as {reviewed[0].role}.", 'success')
+        else:
+            flash('No pending request for this user.', 'warning')
     except Exception as exc:
         db.session.rollback()
         flash(f"Error approving request: {exc}", 'danger')
@@ -161,27 +175,16 @@ def approve_request(user_id):
 def reject_request(user_id):
     """Reject a user's role request"""
     user = User.query.get_or_404(user_id)
-    if not user.role_requested:
+    if not user.role_requested or user.is_approved:
         flash('No pending request for this user.', 'warning')
         return redirect(url_for('admin.users'))
 
     try:
-        rejected_role = user.role_requested
-        user.role_requested = None
-        user.is_approved = False
-        db.session.commit()
-
-        _send_notification(
-            user,
-            subject=f"Your {rejected_role} request was declined",
-            body=(
-                f"Hi {user.username},\n\n"
-                f"We reviewed your request to become a {rejected_role} but had to decline it at this time. "
-                "Feel free to update your profile and try again.\n\n"
-                "Thanks,\nDione Admin Team"
-            )
-        )
-        flash(f"{user.username}'s request declined.", 'info')
+        reviewed = review_role_requests([user.id], approve=False, reviewer_id=current_user.id)
+        if reviewed:
+            flash(f"{reviewed[0].username}'s request declined.", 'info')
+        else:
+            flash('No pending request for this user.', 'warning')
     except Exception as exc:
         db.session.rollback()
         flash(f"Error declining request: {exc}", 'danger')
@@ -189,21 +192,86 @@ def reject_request(user_id):
     return redirect(url_for('admin.users'))
 
 
+@admin_bp.post('/pending/review')
+@login_required
+def bulk_review_requests():
+    """Approve or decline every selected pending request at once"""
+    action = request.form.get('action')
+    if action not in ('approve', 'reject'):
+        flash('Choose whether to approve or decline the selected requests.', 'warning')
+        return redirect(url_for('admin.pending'))
+    user_ids = request.form.getlist('user_ids', type=int)
+    if not user_ids:
+        flash('Select at least one request.', 'warning')
+        return redirect(url_for('admin.pending'))
+
+    try:
+        reviewed = review_role_requests(user_ids, approve=action == 'approve', reviewer_id=current_user.id)
+        verb = 'approved' if action == 'approve' else 'declined'
+        flash(f"{len(reviewed)} request(s) {verb}.", 'success' if action == 'approve' else 'info')
+    except AdminError as exc:
+        flash(str(exc), 'danger')
+    except Exception as exc:
+        db.session.rollback()
+        flash(f"Error reviewing requests: {exc}", 'danger')
+
+    return redirect(url_for('admin.pending'))
+
 
 @admin_bp.get('/orders')
 @login_required
 def orders():
-    """Order history page"""
-    # Placeholder for orders - will be implemented when Order model exists
-    return render_template('admin/orders.html')
+    """Order explorer: filters, keyset pages and totals for the filtered set"""
+    try:
+        filters = parse_order_filters(request.args)
+        order_rows, next_cursor = list_orders(filters, after=request.args.get('after'))
+    except AdminError as exc:
+        flash(str(exc), 'danger')
+        return redirect(url_for('admin.orders'))
+    query_args = {key: request.args[key] for key in ORDER_FILTER_ARGS if request.args.get(key)}
+    return render_template(
+        'admin/orders.html',
+        orders=order_rows,
+        next_cursor=next_cursor,
+        totals=order_totals(filters),
+        query_args=query_args,
+        is_first_page=not request.args.get('after'),
+        status_choices=Order.STATUS_CHOICES,
+    )
+
+
+@admin_bp.get('/orders/export.csv')
+@login_required
+def orders_export():
+    """Stream every order matching the explorer filters as CSV"""
+    try:
+        filters = parse_order_filters(request.args)
+    except AdminError as exc:
+        flash(str(exc), 'danger')
+        return redirect(url_for('admin.orders'))
+    return Response(
+        stream_with_context(iter_orders_csv(filters)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=orders.csv'},
+    )
 
 
 @admin_bp.get('/sales')
 @login_required
 def sales():
     """Sales reports page"""
-    # Placeholder for sales reports - will be implemented when Order model exists
-    return render_template('admin/sales.html')
+    try:
+        filters = parse_order_filters(request.args)
+    except AdminError as exc:
+        flash(str(exc), 'danger')
+        return redirect(url_for('admin.sales'))
+    query_args = {key: request.args[key] for key in ORDER_FILTER_ARGS if request.args.get(key)}
+    return render_template(
+        'admin/sales.html',
+        totals=order_totals(filters),
+        query_args=query_args,
+        status_choices=Order.STATUS_CHOICES,
+    )
 
 
 @admin_bp.get('/products')
@@ -252,14 +320,7 @@ def support_center():
 @login_required
 def settings():
     """Settings page"""
-    defaults = {
-        'support_email': 'support@example.com',
-        'support_phone': '+63 900 000 0000',
-        'auto_approve_sellers': 'false',
-        'auto_approve_riders': 'false',
-        'maintenance_mode': 'false'
-    }
-    settings_map = _ensure_settings(defaults)
+    settings_map = ensure_default_settings()
     if request.method == 'POST':
         updates = {
             'support_email': request.form.get('support_email', '').strip(),
@@ -268,66 +329,18 @@ def settings():
             'auto_approve_riders': 'true' if request.form.get('auto_approve_riders') else 'false',
             'maintenance_mode': 'true' if request.form.get('maintenance_mode') else 'false'
         }
-        _save_settings(updates)
+        save_settings(updates)
         flash('Settings updated.', 'success')
         return redirect(url_for('admin.settings'))
 
     bools = {
-        'auto_approve_sellers': _to_bool(settings_map['auto_approve_sellers']),
-        'auto_approve_riders': _to_bool(settings_map['auto_approve_riders']),
-        'maintenance_mode': _to_bool(settings_map['maintenance_mode'])
+        'auto_approve_sellers': to_bool(settings_map['auto_approve_sellers']),
+        'auto_approve_riders': to_bool(settings_map['auto_approve_riders']),
+        'maintenance_mode': to_bool(settings_map['maintenance_mode'])
     }
     return render_template('admin/settings.html', settings=settings_map, flags=bools)
 
 
-def _ensure_settings(defaults):
-    """Ensure settings exist in DB and return dict of values."""
-    settings_map = {}
-    created = False
-    for key, default in defaults.items():
-        setting = SiteSetting.query.filter_by(key=key).first()
-        if not setting:
-            setting = SiteSetting(key=key, value=str(default))
-            db.session.add(setting)
-            created = True
-        settings_map[key] = setting.value
-    if created:
-        db.session.commit()
-    return settings_map
-
-
-def _save_settings(updates: dict):
-    changed = False
-    for key, value in updates.items():
-        setting = SiteSetting.query.filter_by(key=key).first()
-        if setting:
-            if setting.value != value:
-                setting.value = value
-                changed = True
-        else:
-            db.session.add(SiteSetting(key=key, value=value))
-            changed = True
-    if changed:
-        db.session.commit()
-
-
-def _to_bool(value):
-    return str(value).lower() in ('1', 'true', 'yes', 'on')
-
-
-def _send_notification(user: User, subject: str, body: str):
-    if not user.email:
-        return
-    sender = current_app.config.get('MAIL_USERNAME') or current_app.config.get('MAIL_DEFAULT_SENDER')
-    msg = Message(
-        subject=subject,
-        recipients=[user.email],
-        body=body,
-        sender=sender
-    )
-    mail.send(msg)
-
-
 @admin_bp.post('/users/<int:user_id>/suspend')
 @login_required
 def user_suspend(user_id):
@@ -337,6 +350,7 @@ def user_suspend(user_id):
         return redirect(url_for('admin.users'))
     try:
         user.is_suspended = True
+        record_audit('user.suspend', 'user', user.id)
         db.session.commit()
         flash(f"{user.username} has been suspended.", 'info')
     except Exception as exc:
@@ -349,8 +363,12 @@ def user_suspend(user_id):
 @login_required
 def user_reactivate(user_id):
     user = User.query.get_or_404(user_id)
+    if user.deleted_at:
+        flash("Deleted accounts cannot be reactivated.", 'warning')
+        return redirect(url_for('admin.users'))
     try:
         user.is_suspended = False
+        record_audit('user.reactivate', 'user', user.id)
         db.session.commit()
         flash(f"{user.username} has been reactivated.", 'success')
     except Exception as exc:
@@ -362,54 +380,59 @@ def user_reactivate(user_id):
 @admin_bp.post('/users/<int:user_id>/delete')
 @login_required
 def user_delete(user_id):
-    """Delete a user and all associated data (OAuth records deleted first)"""
+    """Mark a user deleted; their data is removed in the background."""
     user = User.query.get_or_404(user_id)
     if user.id == current_user.id:
         flash("You cannot delete your own admin account.", 'warning')
         return redirect(url_for('admin.users'))
     try:
         username = user.username
-        # Delete OAuth records first to avoid foreign key constraint issues
-        for oauth in user.oauth:
-            db.session.delete(oauth)
-        db.session.flush()  # Ensure OAuth records are deleted before user
-        db.session.delete(user)
-        db.session.commit()
-        flash(f"User '{username}' and all associated data have been permanently deleted.", 'success')
+        request_user_deletion(user, requested_by_id=current_user.id)
+        flash(f"User '{username}' has been deleted. Their data is being removed in the background.", 'success')
+    except AdminError as exc:
+        flash(str(exc), 'warning')
     except Exception as exc:
         db.session.rollback()
         flash(f"Error deleting user: {str(exc)}", 'danger')
     return redirect(url_for('admin.users'))
 
 
+@admin_bp.get('/audit')
+@login_required
+def audit_log():
+    """Audit log of admin actions, newest first, in keyset pages"""
+    try:
+        filters = parse_audit_filters(request.args)
+        events, next_cursor = list_audit_events(filters, before=request.args.get('before', type=int))
+    except AuditError as exc:
+        flash(str(exc), 'danger')
+        return redirect(url_for('admin.audit_log'))
+    query_args = {key: request.args[key] for key in AUDIT_FILTER_ARGS if request.args.get(key)}
+    return render_template(
+        'admin/audit.html',
+        events=events,
+        next_cursor=next_cursor,
+        query_args=query_args,
+        is_first_page=not request.args.get('before'),
+        actions=AUDIT_ACTIONS,
+    )
+
+
 @admin_bp.get('/monitoring')
 @login_required
 def monitoring():
     """Platform monitoring dashboard."""
-    total_orders = Order.query.count()
-    revenue = (
-        db.session.query(func.coalesce(func.sum(Order.total_amount), 0)).scalar()
-        or 0
-    )
-    stores = StoreProfile.query.count()
-    pending_reviews = Review.query.filter_by(is_published=False).count()
-    return render_template(
-        'admin/monitoring.html',
-        metrics={
-            'orders': total_orders,
-            'revenue': float(revenue),
-            'stores': stores,
-            'pending_reviews': pending_reviews,
-        },
-    )
+    metrics, metrics_age = monitoring_metrics()
+    return render_template('admin/monitoring.html', metrics=metrics, metrics_age=metrics_age)
 
 
 @admin_bp.get('/content')
 @login_required
 def content_center():
     """Content moderation for reviews."""
-    reviews = Review.query.order_by(Review.created_at.desc()).limit(50).all()
-    return render_template('admin/content.html', reviews=reviews)
+    status = request.args.get('status') or None
+    listing = list_reviews(status=status, page=request.args.get('page', 1, type=int))
+    return render_template('admin/content.html', reviews=listing.rows, listing=listing, status=status)
 
 
 @admin_bp.post('/content/reviews/<int:review_id>/<string:action>')
@@ -422,3 +445,21 @@ def content_review_action(review_id, action):
     except Exception as exc:
         flash(f'Unable to update review: {exc}', 'danger')
     return redirect(url_for('admin.content_center'))
+
+
+@admin_bp.post('/content/reviews/bulk')
+@login_required
+def content_bulk_action():
+    """Publish or hide every selected review in one statement."""
+    action = request.form.get('action')
+    review_ids = request.form.getlist('review_ids', type=int)
+    if action not in ('publish', 'hide') or not review_ids:
+        flash('Select reviews and choose whether to publish or hide them.', 'warning')
+    else:
+        try:
+            changed = moderate_reviews(review_ids, publish=action == 'publish')
+            flash(f"{changed} review(s) {'published' if action == 'publish' else 'hidden'}.", 'success')
+        except StorefrontError as exc:
+            flash(str(exc), 'danger')
+    return redirect(url_for('admin.content_center', status=request.form.get('status') or None,
+                            page=request.form.get('page', type=int)))
@@ -4,6 +4,7 @@ Authentication routes for Dione Ecommerce
 from flask import Blueprint, render_template, redirect, url_for, request, flash
 from flask_login import login_user, logout_user, login_required
 from project.services.auth_service import AuthService
+from project.routes.storefront_routes import merge_guest_cart_on_login
 from project.utils.validators import Validators
 
 auth = Blueprint('auth', __name__)
@@ -73,6 +74,7 @@ def login_post():
         return redirect(url_for('auth.login'))
 
     login_user(user, remember=remember)
+    merge_guest_cart_on_login(user)
     # If pending approval, inform and keep on public area
     if getattr(user, 'role_requested', None) and not getattr(user, 'is_approved', True):
         flash(f"Your request to become a {user.role_requested} is pending admin approval.", 'info')
@@ -11,6 +11,7 @@ from project import db
 from project.models import User, OAuth
 from project.config import config
 from project.services.oauth_service import OAuthService
+from project.routes.storefront_routes import merge_guest_cart_on_login
 
 # Get current configuration
 current_config = config['default']
@@ -99,6 +100,7 @@ def google_logged_in(blueprint, token):
                 OAuthService.update_oauth_token(oauth, token)
 
             login_user(user)
+            merge_guest_cart_on_login(user)
         except Exception as e:
             from project import db
             db.session.rollback()
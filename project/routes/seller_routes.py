@@ -1,16 +1,23 @@
 """
 Seller focused routes for product management, analytics, and order operations.
 """
-from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+from flask import Blueprint, current_app, flash, jsonify, redirect, render_template, request, session, url_for
 from flask_login import current_user, login_required
 
-from project.models import Order, Product, Review
+from project import db
+from project.models import Order, Product, Review, StoreProfile
+from project.services.analytics_service import AnalyticsError, parse_range, sales_series
+from project.services.metrics_cache import cached_seller_metrics
 from project.services.seller_service import (
+    PRODUCT_SORTS,
     ProductValidationError,
     gather_dashboard_metrics,
     list_categories,
+    list_seller_orders,
+    list_seller_products,
     log_manual_order,
     save_product_from_form,
+    search_seller_products,
     toggle_featured,
     update_order_status,
 )
@@ -22,6 +29,7 @@ from project.services.storefront_service import (
     store_analytics,
     update_store_profile,
 )
+from project.utils.query_args import parse_date_arg
 
 seller_bp = Blueprint("seller", __name__, url_prefix="/seller")
 
@@ -36,47 +44,70 @@ def ensure_seller():
     if (current_user.role or "").lower() != "seller" or not current_user.is_approved:
         flash("Seller access required.", "warning")
         return redirect(url_for("main.profile"))
-    ensure_store_profile(current_user)
+    if _cached_store_profile_id() is None:
+        _current_store()
+
+
+STORE_PROFILE_SESSION_KEY = "seller_store_profile"
+
+
+def _cached_store_profile_id():
+    """Store profile id remembered in the session for the logged-in seller, if any."""
+    cached = session.get(STORE_PROFILE_SESSION_KEY)
+    if cached and cached[0] == current_user.id:
+        return cached[1]
+    return None
+
+
+def _current_store() -> StoreProfile:
+    """Load the seller's store profile, creating and remembering it on first use.
+
+    The cached id is checked against the row it points at, so a deleted or
+    reassigned profile simply falls back to ``ensure_store_profile``.
+    """
+    store_id = _cached_store_profile_id()
+    if store_id is not None:
+        store = db.session.get(StoreProfile, store_id)
+        if store is not None and store.seller_id == current_user.id:
+            return store
+    store = ensure_store_profile(current_user)
+    session[STORE_PROFILE_SESSION_KEY] = [current_user.id, store.id]
+    return store
 
 
 @seller_bp.route("/dashboard")
 @login_required
 def dashboard():
-    metrics = gather_dashboard_metrics(current_user.id)
-    recent_orders = (
-        Order.query.filter_by(seller_id=current_user.id)
-        .order_by(Order.placed_at.desc())
-        .limit(5)
-        .all()
-    )
-    featured = (
-        Product.query.filter_by(seller_id=current_user.id, is_featured=True)
-        .order_by(Product.updated_at.desc())
-        .limit(5)
-        .all()
+    seller_id = current_user.id
+    metrics, metrics_age = cached_seller_metrics(
+        "dashboard", seller_id, lambda: gather_dashboard_metrics(seller_id)
     )
     return render_template(
         "seller/dashboard.html",
         username=current_user.username,
         metrics=metrics,
-        recent_orders=recent_orders,
-        featured_products=featured,
+        metrics_age=metrics_age,
+        recent_orders=metrics["recent_orders"],
+        featured_products=metrics["featured_list"],
     )
 
 
 @seller_bp.route("/products")
 @login_required
 def products():
-    items = (
-        Product.query.filter_by(seller_id=current_user.id)
-        .order_by(Product.created_at.desc())
-        .all()
-    )
+    search = request.args.get("q", "").strip()
+    sort = request.args.get("sort", "newest")
+    if sort not in PRODUCT_SORTS:
+        sort = "newest"
+    catalog = list_seller_products(current_user.id, search=search, sort=sort, page=request.args.get("page", 1, type=int))
     categories = list_categories()
     return render_template(
         "seller/products.html",
         username=current_user.username,
-        products=items,
+        products=catalog.rows,
+        catalog=catalog,
+        search=search,
+        sort=sort,
         categories=categories,
     )
 
@@ -144,20 +175,35 @@ def orders():
         except (ValueError, ProductValidationError) as exc:
             flash(str(exc), "danger")
 
-    order_rows = (
-        Order.query.filter_by(seller_id=current_user.id)
-        .order_by(Order.placed_at.desc())
-        .all()
-    )
-    products = Product.query.filter_by(seller_id=current_user.id).order_by(Product.name.asc()).all()
+    try:
+        filters = {
+            "status": request.args.get("status") or None,
+            "start": parse_date_arg(request.args.get("start"), "Start date", ProductValidationError),
+            "end": parse_date_arg(request.args.get("end"), "End date", ProductValidationError),
+        }
+        order_rows, next_cursor = list_seller_orders(current_user.id, after=request.args.get("after"), **filters)
+    except ProductValidationError as exc:
+        flash(str(exc), "danger")
+        return redirect(url_for("seller.orders"))
+    has_products = db.session.query(Product.query.filter_by(seller_id=current_user.id).exists()).scalar()
     return render_template(
         "seller/orders.html",
         orders=order_rows,
-        products=products,
+        next_cursor=next_cursor,
+        filters={key: value for key, value in filters.items() if value},
+        is_first_page=not request.args.get("after"),
+        has_products=has_products,
         status_choices=Order.STATUS_CHOICES,
     )
 
 
+@seller_bp.route("/products/search")
+@login_required
+def product_search():
+    """Typeahead source for the manual-order product picker."""
+    return jsonify({"results": search_seller_products(current_user.id, request.args.get("q", ""))})
+
+
 @seller_bp.post("/orders/<int:order_id>/status")
 @login_required
 def order_status(order_id):
@@ -174,7 +220,7 @@ def order_status(order_id):
 @seller_bp.route("/store/profile", methods=["GET", "POST"])
 @login_required
 def store_profile():
-    store = ensure_store_profile(current_user)
+    store = _current_store()
     if request.method == "POST":
         try:
             update_store_profile(store, request.form, request.files, current_app.config)
@@ -188,21 +234,51 @@ def store_profile():
 @seller_bp.route("/store/analytics")
 @login_required
 def store_insights():
-    store = ensure_store_profile(current_user)
-    metrics = store_analytics(store)
+    store = _current_store()
+    store_id = store.id
+    metrics, metrics_age = cached_seller_metrics(
+        "analytics", store.seller_id, lambda: store_analytics(db.session.get(StoreProfile, store_id))
+    )
     catalog = list_store_catalog(store)
     return render_template(
         "seller/store_analytics.html",
         store=store,
         metrics=metrics,
+        metrics_age=metrics_age,
         catalog=catalog,
     )
 
 
+@seller_bp.route("/store/analytics/series")
+@login_required
+def store_sales_series():
+    """JSON revenue/units/orders series for charting.
+
+    Query parameters: ``start`` and ``end`` (YYYY-MM-DD), ``granularity``
+    (day, week or month) and ``window`` (moving-average width in buckets).
+    """
+    try:
+        window = int(request.args.get("window", "7"))
+    except ValueError:
+        return jsonify({"error": "Window must be a whole number."}), 400
+    try:
+        start, end = parse_range(request.args.get("start"), request.args.get("end"))
+        payload = sales_series(
+            current_user.id,
+            start,
+            end,
+            granularity=request.args.get("granularity", "day"),
+            window=window,
+        )
+    except AnalyticsError as exc:
+        return jsonify({"error": str(exc)}), 400
+    return jsonify(payload)
+
+
 @seller_bp.route("/store/reviews")
 @login_required
 def store_reviews():
-    store = ensure_store_profile(current_user)
+    store = _current_store()
     reviews = (
         Review.query.filter_by(store_id=store.id)
         .order_by(Review.created_at.desc())
@@ -1,18 +1,36 @@
 """
 Public storefront, cart, checkout, and review routes.
 """
-from flask import Blueprint, current_app, flash, redirect, render_template, request, url_for
+from flask import (
+    Blueprint,
+    after_this_request,
+    current_app,
+    flash,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask_login import current_user, login_required
 from sqlalchemy import func
 
 from project.models import Category, Order, Product, Review, StoreProfile
 from project.services.storefront_service import (
+    GUEST_CART_COOKIE,
     StorefrontError,
     add_item_to_cart,
+    add_item_to_guest_cart,
+    add_items_to_cart,
+    add_items_to_guest_cart,
     checkout_cart,
     create_review,
+    dump_guest_cart,
     get_rating_breakdown,
+    guest_cart_items,
     list_cart_items,
+    load_guest_cart,
+    merge_guest_cart,
     search_products,
 )
 
@@ -72,25 +90,101 @@ def product_review(product_id):
     return redirect(url_for("shop.product_detail", product_id=product_id))
 
 
+def _guest_cart_lines():
+    return load_guest_cart(request.cookies.get(GUEST_CART_COOKIE), current_app.config["SECRET_KEY"])
+
+
+def _store_guest_cart(response, lines):
+    response.set_cookie(
+        GUEST_CART_COOKIE,
+        dump_guest_cart(lines, current_app.config["SECRET_KEY"]),
+        max_age=current_app.config.get("GUEST_CART_MAX_AGE"),
+        httponly=True,
+        samesite="Lax",
+    )
+
+
+def merge_guest_cart_on_login(user):
+    """Fold the request's guest cart cookie into ``user``'s cart and expire the cookie."""
+    lines = _guest_cart_lines()
+    if not lines:
+        return
+    merge_guest_cart(user, lines)
+
+    @after_this_request
+    def _clear_guest_cart(response):
+        response.delete_cookie(GUEST_CART_COOKIE)
+        return response
+
+
 @shop_bp.post("/cart/items")
-@login_required
 def cart_add_item():
+    response = redirect(url_for("shop.cart"))
     try:
         product_id = int(request.form.get("product_id"))
         variant_id = request.form.get("variant_id")
         variant_id = int(variant_id) if variant_id else None
         quantity = int(request.form.get("quantity", 1))
-        add_item_to_cart(current_user, product_id, variant_id, quantity)
+        if current_user.is_authenticated:
+            add_item_to_cart(current_user, product_id, variant_id, quantity)
+        else:
+            lines = add_item_to_guest_cart(_guest_cart_lines(), product_id, variant_id, quantity)
+            _store_guest_cart(response, lines)
         flash("Product added to cart.", "success")
-    except (ValueError, StorefrontError) as exc:
+    except (TypeError, ValueError, StorefrontError) as exc:
         flash(str(exc), "danger")
-    return redirect(url_for("shop.cart"))
+    return response
+
+
+def _parse_cart_lines(entries):
+    if not isinstance(entries, list) or not entries:
+        raise StorefrontError("Provide a non-empty list of items.")
+    lines = []
+    for entry in entries:
+        if not isinstance(entry, dict):
+            raise StorefrontError("Each item must be an object.")
+        variant_id = entry.get("variant_id")
+        lines.append(
+            (
+                int(entry["product_id"]),
+                int(variant_id) if variant_id else None,
+                int(entry.get("quantity", 1)),
+            )
+        )
+    return lines
+
+
+@shop_bp.post("/cart/items/batch")
+def cart_add_items():
+    """Add several items in one request, e.g. bundles and re-orders.
+
+    Expects JSON ``{"items": [{"product_id": 1, "variant_id": null, "quantity": 2}, ...]}``.
+    """
+    payload = request.get_json(silent=True) or {}
+    try:
+        lines = _parse_cart_lines(payload.get("items"))
+        if current_user.is_authenticated:
+            cart = add_items_to_cart(current_user, lines)
+            cart_quantity = sum(item.quantity for item in cart.items)
+            guest_lines = None
+        else:
+            guest_lines = add_items_to_guest_cart(_guest_cart_lines(), lines)
+            cart_quantity = sum(quantity for _, _, quantity in guest_lines)
+    except (KeyError, TypeError, ValueError, StorefrontError) as exc:
+        message = str(exc) if isinstance(exc, StorefrontError) else "Invalid item payload."
+        return jsonify({"error": message}), 400
+    response = jsonify({"added": len(lines), "cart_quantity": cart_quantity})
+    if guest_lines is not None:
+        _store_guest_cart(response, guest_lines)
+    return response
 
 
 @shop_bp.route("/cart")
-@login_required
 def cart():
-    items = list_cart_items(current_user)
+    if current_user.is_authenticated:
+        items = list_cart_items(current_user)
+    else:
+        items = guest_cart_items(_guest_cart_lines())
     total = sum(float(item.unit_price) * item.quantity for item in items)
     return render_template("shop/cart.html", items=items, total=total)
 
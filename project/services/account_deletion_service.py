@@ -0,0 +1,388 @@
+"""
+Account deletion in bounded chunks, off the request path.
+
+``request_user_deletion`` only marks the account deleted and suspended,
+drops it from the user counters and queues a ``user_deletion_job``. The
+deletion worker then claims the job and works through its stages, one
+chunk per transaction:
+
+* ``store_reviews`` - reviews on the account's products, with their media;
+* ``products`` - products with their images, variants and stock rows. Products
+  that appear on orders are deactivated instead, so order history still
+  resolves, and their remaining stock is written off through the ledger;
+* ``reviews`` - reviews the account wrote;
+* ``carts`` - the account's carts;
+* ``orders`` - orders the account placed lose their buyer;
+* ``account`` - OAuth links and the store profile go, and the user row is
+  anonymized. It is kept because orders and stats the account sold still
+  reference it.
+
+Uploaded files are removed from disk, and affected sellers' cached metrics
+dropped, only after the chunk that changed their rows has committed. The worker runs as a background thread
+(``USER_DELETION_BACKGROUND``) or from ``flask process-user-deletions``.
+"""
+import os
+import threading
+from collections import namedtuple
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from flask import current_app
+from sqlalchemy import delete, insert, literal, select, update
+
+from project import db
+from project.models import (
+    Cart,
+    CartItem,
+    InventorySnapshot,
+    InventoryTransaction,
+    LowStockItem,
+    OAuth,
+    Order,
+    OrderItem,
+    Product,
+    ProductImage,
+    ProductVariant,
+    Review,
+    ReviewMedia,
+    ReviewResponse,
+    StoreProfile,
+    User,
+    UserDeletionJob,
+)
+from project.services.admin_service import AdminError
+from project.services.audit_service import record_audit
+from project.services.metrics_cache import invalidate_platform_metrics, invalidate_seller_metrics
+from project.services.platform_service import record_user_change, user_state
+
+# A claimed job is skipped by other workers until this passes, and a crashed
+# worker's job becomes claimable again afterwards.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def request_user_deletion(user: User, requested_by_id: Optional[int] = None) -> UserDeletionJob:
+    """Mark ``user`` deleted and queue the job that clears their data."""
+    if user.deleted_at is not None:
+        raise AdminError(f"{user.username} is already being deleted.")
+    record_user_change(user_state(user), None)
+    user.deleted_at = datetime.utcnow()
+    user.is_suspended = True
+    record_audit("user.delete", "user", user.id, {"role": user.role}, actor_id=requested_by_id)
+    job = UserDeletionJob(
+        user_id=user.id,
+        requested_by_id=requested_by_id,
+        status="pending",
+        stage=UserDeletionJob.STAGES[0],
+        last_id=0,
+    )
+    db.session.add(job)
+    db.session.commit()
+    invalidate_platform_metrics()
+    wake_deletion_worker()
+    return job
+
+
+def deletion_jobs_for(user_ids: Iterable[int]) -> Dict[int, UserDeletionJob]:
+    """Deletion jobs keyed by user id, for showing progress next to a page of users."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return {}
+    jobs = db.session.execute(select(UserDeletionJob).where(UserDeletionJob.user_id.in_(user_ids))).scalars()
+    return {job.user_id: job for job in jobs}
+
+
+def _remove_files(paths: Iterable[str]) -> int:
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    removed = 0
+    for path in paths:
+        if not path:
+            continue
+        full_path = os.path.join(upload_folder, os.path.basename(path))
+        try:
+            os.remove(full_path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+# What a stage handler hands back: upload paths to remove and sellers whose
+# cached metrics to drop, both acted on once the chunk has committed.
+ChunkResult = namedtuple("ChunkResult", "paths seller_ids", defaults=((),))
+
+
+def _delete_reviews(review_ids: List[int]) -> List[str]:
+    """Delete reviews with their media and responses; returns the media paths."""
+    paths = db.session.execute(select(ReviewMedia.path).where(ReviewMedia.review_id.in_(review_ids))).scalars().all()
+    db.session.execute(delete(ReviewMedia).where(ReviewMedia.review_id.in_(review_ids)))
+    db.session.execute(delete(ReviewResponse).where(ReviewResponse.review_id.in_(review_ids)))
+    db.session.execute(delete(Review).where(Review.id.in_(review_ids)))
+    return paths
+
+
+def _store_reviews_chunk(job: UserDeletionJob, limit: int) -> Optional[ChunkResult]:
+    review_ids = (
+        db.session.execute(
+            select(Review.id)
+            .join(Product, Product.id == Review.product_id)
+            .where(Product.seller_id == job.user_id)
+            .order_by(Review.id)
+            .limit(limit)
+        )
+        .scalars()
+        .all()
+    )
+    if not review_ids:
+        return None
+    job.reviews_removed += len(review_ids)
+    return ChunkResult(_delete_reviews(review_ids))
+
+
+def _products_chunk(job: UserDeletionJob, limit: int) -> Optional[ChunkResult]:
+    product_ids = (
+        db.session.execute(
+            select(Product.id)
+            .where(Product.seller_id == job.user_id, Product.id > job.last_id)
+            .order_by(Product.id)
+            .limit(limit)
+        )
+        .scalars()
+        .all()
+    )
+    if not product_ids:
+        return None
+    sold = set(
+        db.session.execute(
+            select(OrderItem.product_id).where(OrderItem.product_id.in_(product_ids)).distinct()
+        ).scalars()
+    )
+    unsold = [product_id for product_id in product_ids if product_id not in sold]
+    paths = db.session.execute(
+        select(ProductImage.path).where(ProductImage.product_id.in_(product_ids))
+    ).scalars().all()
+    db.session.execute(delete(ProductImage).where(ProductImage.product_id.in_(product_ids)))
+    db.session.execute(delete(CartItem).where(CartItem.product_id.in_(product_ids)))
+    db.session.execute(delete(LowStockItem).where(LowStockItem.product_id.in_(product_ids)))
+    db.session.execute(delete(InventorySnapshot).where(InventorySnapshot.product_id.in_(product_ids)))
+    if unsold:
+        db.session.execute(delete(InventoryTransaction).where(InventoryTransaction.product_id.in_(unsold)))
+        db.session.execute(delete(ProductVariant).where(ProductVariant.product_id.in_(unsold)))
+        db.session.execute(delete(Product).where(Product.id.in_(unsold)))
+    if sold:
+        # Zeroing stock goes through the ledger like any other stock change,
+        # so reconciliation still balances for retired products.
+        db.session.execute(
+            insert(InventoryTransaction).from_select(
+                ["product_id", "change", "source", "note"],
+                select(
+                    Product.id,
+                    -Product.stock,
+                    literal("account_deletion"),
+                    literal("Seller account deleted"),
+                ).where(Product.id.in_(sold), Product.stock != 0),
+            )
+        )
+        db.session.execute(
+            update(Product)
+            .where(Product.id.in_(sold))
+            .values(is_active=False, is_featured=False, stock=0)
+        )
+    job.last_id = product_ids[-1]
+    job.products_removed += len(unsold)
+    job.products_retired += len(sold)
+    return ChunkResult(paths)
+
+
+def _own_reviews_chunk(job: UserDeletionJob, limit: int) -> Optional[ChunkResult]:
+    rows = db.session.execute(
+        select(Review.id, StoreProfile.seller_id)
+        .join(StoreProfile, StoreProfile.id == Review.store_id)
+        .where(Review.user_id == job.user_id)
+        .order_by(Review.id)
+        .limit(limit)
+    ).all()
+    if not rows:
+        return None
+    job.reviews_removed += len(rows)
+    return ChunkResult(_delete_reviews([row.id for row in rows]), {row.seller_id for row in rows})
+
+
+def _carts_chunk(job: UserDeletionJob, limit: int) -> Optional[ChunkResult]:
+    cart_ids = (
+        db.session.execute(select(Cart.id).where(Cart.user_id == job.user_id).order_by(Cart.id).limit(limit))
+        .scalars()
+        .all()
+    )
+    if not cart_ids:
+        return None
+    db.session.execute(delete(CartItem).where(CartItem.cart_id.in_(cart_ids)))
+    db.session.execute(delete(Cart).where(Cart.id.in_(cart_ids)))
+    job.carts_removed += len(cart_ids)
+    return ChunkResult([])
+
+
+def _orders_chunk(job: UserDeletionJob, limit: int) -> Optional[ChunkResult]:
+    rows = db.session.execute(
+        select(Order.id, Order.seller_id).where(Order.buyer_id == job.user_id).order_by(Order.id).limit(limit)
+    ).all()
+    if not rows:
+        return None
+    db.session.execute(
+        update(Order)
+        .where(Order.id.in_([row.id for row in rows]))
+        .values(buyer_id=None)
+        .execution_options(synchronize_session=False)
+    )
+    job.orders_anonymized += len(rows)
+    return ChunkResult([], {row.seller_id for row in rows})
+
+
+def _account_chunk(job: UserDeletionJob, limit: int) -> Optional[ChunkResult]:
+    paths = list(
+        db.session.execute(
+            select(StoreProfile.logo_image, StoreProfile.banner_image).where(StoreProfile.seller_id == job.user_id)
+        ).one_or_none()
+        or ()
+    )
+    db.session.execute(delete(StoreProfile).where(StoreProfile.seller_id == job.user_id))
+    db.session.execute(delete(ReviewResponse).where(ReviewResponse.seller_id == job.user_id))
+    db.session.execute(delete(OAuth).where(OAuth.user_id == job.user_id))
+    db.session.execute(
+        update(User)
+        .where(User.id == job.user_id)
+        .values(
+            email=None,
+            password=None,
+            username=f"deleted-user-{job.user_id}",
+            role_request_details=None,
+            role_requested=None,
+            is_suspended=True,
+        )
+        .execution_options(synchronize_session=False)
+    )
+    job.status = "done"
+    job.finished_at = datetime.utcnow()
+    return ChunkResult(paths)
+
+
+_STAGE_HANDLERS = {
+    "store_reviews": _store_reviews_chunk,
+    "products": _products_chunk,
+    "reviews": _own_reviews_chunk,
+    "carts": _carts_chunk,
+    "orders": _orders_chunk,
+    "account": _account_chunk,
+}
+
+
+def _run_chunk(job: UserDeletionJob, limit: int) -> ChunkResult:
+    """Process one chunk of the job's current stage, moving to the next stage when it is empty."""
+    result = _STAGE_HANDLERS[job.stage](job, limit)
+    if result is None:
+        stages = UserDeletionJob.STAGES
+        job.stage = stages[stages.index(job.stage) + 1]
+        job.last_id = 0
+        return ChunkResult([])
+    return result
+
+
+def _claim_job(now: datetime) -> Optional[UserDeletionJob]:
+    job_id = db.session.execute(
+        select(UserDeletionJob.id)
+        .where(
+            UserDeletionJob.status.in_(("pending", "running")),
+            (UserDeletionJob.claimed_until.is_(None)) | (UserDeletionJob.claimed_until <= now),
+        )
+        .order_by(UserDeletionJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    ).scalar()
+    if job_id is not None:
+        db.session.execute(
+            update(UserDeletionJob)
+            .where(UserDeletionJob.id == job_id)
+            .values(status="running", claimed_until=now + CLAIM_LEASE)
+        )
+    db.session.commit()
+    return db.session.get(UserDeletionJob, job_id) if job_id is not None else None
+
+
+def run_deletion_step(chunk_size: Optional[int] = None, now: Optional[datetime] = None) -> Optional[UserDeletionJob]:
+    """Claim a deletion job and process one chunk of it in its own transaction.
+
+    Returns the job, or ``None`` when no job is due. A failed chunk is rolled
+    back and retried once the claim lapses; the job is marked ``failed`` after
+    ``USER_DELETION_MAX_ATTEMPTS``.
+    """
+    now = now or datetime.utcnow()
+    job = _claim_job(now)
+    if job is None:
+        return None
+    limit = chunk_size or current_app.config["USER_DELETION_CHUNK_SIZE"]
+    try:
+        result = _run_chunk(job, limit)
+        job.claimed_until = None
+        db.session.commit()
+    except Exception as exc:
+        db.session.rollback()
+        job = db.session.get(UserDeletionJob, job.id)
+        job.attempts += 1
+        job.last_error = str(exc)[:500]
+        if job.attempts >= current_app.config["USER_DELETION_MAX_ATTEMPTS"]:
+            job.status = "failed"
+            current_app.logger.error("Giving up on deletion of user %s: %s", job.user_id, exc)
+        db.session.commit()
+        return job
+    invalidate_seller_metrics(*result.seller_ids)
+    job.files_removed += _remove_files(result.paths)
+    db.session.commit()
+    if job.status == "done":
+        invalidate_platform_metrics()
+    return job
+
+
+def drain_deletion_jobs(chunk_size: Optional[int] = None) -> int:
+    """Run chunks until no job is due; returns the number of chunks processed."""
+    steps = 0
+    while run_deletion_step(chunk_size) is not None:
+        steps += 1
+    return steps
+
+
+class DeletionWorker:
+    """Daemon thread that works through deletion jobs when woken and on a poll interval."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def wake(self, app):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, args=(app,), name="user-deletion-worker", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self, app):
+        while True:
+            self._wakeup.wait(app.config["USER_DELETION_POLL_SECONDS"])
+            self._wakeup.clear()
+            try:
+                with app.app_context():
+                    try:
+                        drain_deletion_jobs()
+                    finally:
+                        db.session.remove()
+            except Exception:
+                app.logger.exception("User deletion worker failed")
+
+
+def wake_deletion_worker():
+    """Nudge the background worker after queuing a deletion job."""
+    app = current_app._get_current_object()
+    if not app.config["USER_DELETION_BACKGROUND"]:
+        return
+    app.extensions.setdefault("user_deletion_worker", DeletionWorker()).wake(app)
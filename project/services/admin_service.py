@@ -0,0 +1,248 @@
+"""
+User directory, role-request and review moderation queries for the admin panel.
+
+Listings are paged on the server: a count query plus one page of rows.
+User search matches a prefix of the email or username so the ``user``
+indexes on those columns can serve it.
+"""
+import math
+from collections import namedtuple
+from datetime import datetime
+from typing import Iterable, List, Optional
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.orm import joinedload, load_only
+
+from project import db
+from project.models import Product, Review, User
+from project.services.audit_service import record_audit
+from project.services.email_service import enqueue_email, wake_outbox_sender
+from project.services.metrics_cache import invalidate_platform_metrics
+from project.services.platform_service import record_user_changes
+
+
+class AdminError(ValueError):
+    """Raised when an admin action cannot be applied."""
+
+
+USERS_PAGE_SIZE = 25
+
+USER_ROLES = ("buyer", "seller", "rider", "admin")
+USER_STATUSES = ("active", "suspended", "pending", "deleted")
+
+USER_SORTS = {
+    "newest": (User.created_at.desc(), User.id.desc()),
+    "oldest": (User.created_at.asc(), User.id.asc()),
+    "username": (User.username.asc(), User.id.asc()),
+    "email": (User.email.asc(), User.id.asc()),
+}
+
+UserPage = namedtuple("UserPage", "rows page pages total")
+
+
+def _is_pending():
+    return and_(User.role_requested.isnot(None), User.is_approved.is_(False), User.deleted_at.is_(None))
+
+
+def _search_filter(search: str):
+    return or_(
+        User.email.startswith(search, autoescape=True),
+        User.username.startswith(search, autoescape=True),
+    )
+
+
+def _paginate(query, filters, sort: str, page: int, per_page: int) -> UserPage:
+    total = db.session.execute(select(func.count(User.id)).where(*filters)).scalar_one()
+    pages = max(1, math.ceil(total / per_page))
+    page = min(max(page, 1), pages)
+    rows = (
+        db.session.execute(
+            query.where(*filters)
+            .order_by(*USER_SORTS.get(sort, USER_SORTS["newest"]))
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        )
+        .scalars()
+        .all()
+    )
+    return UserPage(rows=rows, page=page, pages=pages, total=total)
+
+
+def list_users(
+    search: Optional[str] = None,
+    role: Optional[str] = None,
+    status: Optional[str] = None,
+    sort: str = "newest",
+    page: int = 1,
+    per_page: int = USERS_PAGE_SIZE,
+) -> UserPage:
+    """Return one page of the user directory.
+
+    ``status`` is ``active``, ``suspended``, ``pending`` or ``deleted``;
+    unknown roles and statuses are ignored. Deleted accounts are listed only
+    under ``deleted``. Password hashes and application details are not
+    loaded.
+    """
+    filters = [User.deleted_at.isnot(None) if status == "deleted" else User.deleted_at.is_(None)]
+    search = (search or "").strip()
+    if search:
+        filters.append(_search_filter(search))
+    if role in USER_ROLES:
+        filters.append(User.role == role)
+    if status == "active":
+        filters.extend([User.is_suspended.is_(False), ~_is_pending()])
+    elif status == "suspended":
+        filters.append(User.is_suspended.is_(True))
+    elif status == "pending":
+        filters.append(_is_pending())
+    query = select(User).options(
+        load_only(
+            User.id,
+            User.username,
+            User.email,
+            User.role,
+            User.role_requested,
+            User.is_approved,
+            User.is_suspended,
+            User.created_at,
+            User.deleted_at,
+        )
+    )
+    return _paginate(query, filters, sort, page, per_page)
+
+
+def list_pending_requests(
+    search: Optional[str] = None,
+    role: Optional[str] = None,
+    sort: str = "newest",
+    page: int = 1,
+    per_page: int = USERS_PAGE_SIZE,
+) -> UserPage:
+    """Return one page of outstanding seller and rider applications.
+
+    ``role`` filters on the requested role.
+    """
+    filters = [_is_pending()]
+    search = (search or "").strip()
+    if search:
+        filters.append(_search_filter(search))
+    if role in USER_ROLES:
+        filters.append(User.role_requested == role)
+    return _paginate(select(User), filters, sort, page, per_page)
+
+
+# Upper bound on users moderated by one bulk action.
+BULK_REVIEW_LIMIT = 500
+
+ReviewedRequest = namedtuple("ReviewedRequest", "id username email role")
+
+
+def _decision_email(request: ReviewedRequest, approved: bool):
+    if approved:
+        return (
+            f"Your {request.role} request has been approved",
+            f"Hi {request.username},\n\n"
+            f"Good news! Your request to become a {request.role} has been approved. "
+            "You may now log in and use the new dashboard.\n\n"
+            "Thanks,\nDione Admin Team",
+        )
+    return (
+        f"Your {request.role} request was declined",
+        f"Hi {request.username},\n\n"
+        f"We reviewed your request to become a {request.role} but had to decline it at this time. "
+        "Feel free to update your profile and try again.\n\n"
+        "Thanks,\nDione Admin Team",
+    )
+
+
+def review_role_requests(
+    user_ids: Iterable[int], approve: bool, reviewer_id: int, now: Optional[datetime] = None
+) -> List[ReviewedRequest]:
+    """Approve or decline the pending role requests of ``user_ids`` in one transaction.
+
+    The requests are read once, changed with a single UPDATE, the platform
+    counters are adjusted in one upsert and the notification emails are
+    queued in the outbox. Users without a pending request are skipped; the
+    requests actually reviewed are returned.
+    """
+    user_ids = sorted(set(user_ids))
+    if len(user_ids) > BULK_REVIEW_LIMIT:
+        raise AdminError(f"Select at most {BULK_REVIEW_LIMIT} requests at a time.")
+    if not user_ids:
+        return []
+    rows = db.session.execute(
+        select(User.id, User.username, User.email, User.role, User.role_requested)
+        .where(User.id.in_(user_ids), _is_pending())
+        .with_for_update()
+    ).all()
+    if not rows:
+        return []
+    reviewed = [ReviewedRequest(row.id, row.username, row.email, row.role_requested) for row in rows]
+    changes = []
+    for row in rows:
+        role = (row.role or "buyer").lower()
+        changes.append(((role, True), (row.role_requested.lower() if approve else role, False)))
+    if approve:
+        values = {
+            "role": User.role_requested,
+            "role_requested": None,
+            "is_approved": True,
+            "approved_by_id": reviewer_id,
+            "approved_at": now or datetime.utcnow(),
+        }
+    else:
+        values = {"role_requested": None, "is_approved": False}
+    # Loaded instances are refreshed by the commit below.
+    db.session.execute(
+        update(User)
+        .where(User.id.in_([request.id for request in reviewed]))
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    record_user_changes(changes)
+    action = "role_request.approve" if approve else "role_request.reject"
+    for request in reviewed:
+        subject, body = _decision_email(request, approve)
+        enqueue_email([request.email], subject=subject, body=body)
+        record_audit(action, "user", request.id, {"role": request.role}, actor_id=reviewer_id)
+    db.session.commit()
+    invalidate_platform_metrics()
+    wake_outbox_sender()
+    return reviewed
+
+
+REVIEWS_PAGE_SIZE = 25
+REVIEW_STATUSES = ("published", "hidden")
+
+ReviewPage = namedtuple("ReviewPage", "rows page pages total")
+
+
+def list_reviews(status: Optional[str] = None, page: int = 1, per_page: int = REVIEWS_PAGE_SIZE) -> ReviewPage:
+    """Return one page of reviews, newest first, for the content center.
+
+    ``status`` is ``published`` or ``hidden`` and is served by
+    ``ix_review_published_created``. The product name and author are joined
+    into the same query; media are shown from the stored ``media_count``.
+    """
+    filters = []
+    if status in REVIEW_STATUSES:
+        filters.append(Review.is_published.is_(status == "published"))
+    total = db.session.execute(select(func.count(Review.id)).where(*filters)).scalar_one()
+    pages = max(1, math.ceil(total / per_page))
+    page = min(max(page, 1), pages)
+    rows = (
+        db.session.execute(
+            select(Review)
+            .options(
+                joinedload(Review.product).load_only(Product.id, Product.name),
+                joinedload(Review.user).load_only(User.id, User.username, User.email),
+            )
+            .where(*filters)
+            .order_by(Review.created_at.desc(), Review.id.desc())
+            .limit(per_page)
+            .offset((page - 1) * per_page)
+        )
+        .scalars()
+        .all()
+    )
+    return ReviewPage(rows=rows, page=page, pages=pages, total=total)
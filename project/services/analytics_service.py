@@ -0,0 +1,131 @@
+"""
+Time-series sales analytics for sellers, built on the ``seller_daily_stats`` rollup.
+
+One range query fetches the compact per-day rows for the requested period and
+the preceding period of equal length; gap filling, bucketing into weeks or
+months, moving averages and period-over-period deltas are then vectorized
+NumPy operations rather than Python loops.
+"""
+from datetime import date, timedelta
+from typing import Dict, Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from project import db
+from project.models import SellerDailyStats
+
+GRANULARITIES = ("day", "week", "month")
+MAX_RANGE_DAYS = 3660
+MAX_WINDOW = 90
+SERIES = ("orders", "units", "revenue")
+
+
+class AnalyticsError(ValueError):
+    """Raised when an analytics request has invalid parameters."""
+
+
+def parse_range(start: Optional[str], end: Optional[str], today: Optional[date] = None):
+    """Parse ISO ``start``/``end`` strings, defaulting to the last 30 days."""
+    try:
+        end_date = date.fromisoformat(end) if end else (today or date.today())
+        start_date = date.fromisoformat(start) if start else end_date - timedelta(days=29)
+    except ValueError:
+        raise AnalyticsError("Dates must use the YYYY-MM-DD format.")
+    if start_date > end_date:
+        raise AnalyticsError("Start date must not be after end date.")
+    if (end_date - start_date).days + 1 > MAX_RANGE_DAYS:
+        raise AnalyticsError(f"Ranges are limited to {MAX_RANGE_DAYS} days.")
+    return start_date, end_date
+
+
+def _daily_arrays(seller_id: int, start: date, end: date) -> Dict[str, np.ndarray]:
+    """Return gap-filled per-day arrays for ``[start, end]`` from one query."""
+    rows = db.session.execute(
+        select(
+            SellerDailyStats.day,
+            SellerDailyStats.orders,
+            SellerDailyStats.units,
+            SellerDailyStats.recognized_revenue,
+        )
+        .where(
+            SellerDailyStats.seller_id == seller_id,
+            SellerDailyStats.day >= start,
+            SellerDailyStats.day <= end,
+        )
+    ).all()
+    length = (end - start).days + 1
+    arrays = {
+        "orders": np.zeros(length, dtype=np.int64),
+        "units": np.zeros(length, dtype=np.int64),
+        "revenue": np.zeros(length, dtype=np.float64),
+    }
+    if rows:
+        days, orders, units, revenue = zip(*rows)
+        offsets = (np.array(days, dtype="datetime64[D]") - np.datetime64(start, "D")).astype(np.int64)
+        np.add.at(arrays["orders"], offsets, np.array(orders, dtype=np.int64))
+        np.add.at(arrays["units"], offsets, np.array(units, dtype=np.int64))
+        np.add.at(arrays["revenue"], offsets, np.array(revenue, dtype=np.float64))
+    return arrays
+
+
+def _bucket_starts(dates: np.ndarray, granularity: str) -> np.ndarray:
+    """Indices into ``dates`` where a new day, ISO week or month begins."""
+    if granularity == "day":
+        return np.arange(dates.size)
+    if granularity == "week":
+        # 1970-01-01 was a Thursday, so shifting by 3 makes Monday weekday 0.
+        keys = (dates.astype(np.int64) + 3) // 7
+    else:
+        keys = dates.astype("datetime64[M]").astype(np.int64)
+    return np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+
+
+def _moving_average(values: np.ndarray, window: int) -> np.ndarray:
+    """Trailing mean over ``window`` buckets, using shorter windows at the start."""
+    cumulative = np.concatenate(([0.0], np.cumsum(values, dtype=np.float64)))
+    index = np.arange(values.size)
+    lower = np.maximum(index + 1 - window, 0)
+    return (cumulative[index + 1] - cumulative[lower]) / (index + 1 - lower)
+
+
+def _delta(current: float, previous: float) -> Optional[float]:
+    if not previous:
+        return None
+    return round((current - previous) / previous * 100, 2)
+
+
+def sales_series(seller_id: int, start: date, end: date, granularity: str = "day", window: int = 7) -> Dict:
+    """Build chart-ready revenue, unit and order series for a seller."""
+    if granularity not in GRANULARITIES:
+        raise AnalyticsError(f"Granularity must be one of: {', '.join(GRANULARITIES)}.")
+    if not 1 <= window <= MAX_WINDOW:
+        raise AnalyticsError(f"Window must be between 1 and {MAX_WINDOW}.")
+
+    length = (end - start).days + 1
+    previous_start = start - timedelta(days=length)
+    daily = _daily_arrays(seller_id, previous_start, end)
+    previous = {name: values[:length] for name, values in daily.items()}
+    current = {name: values[length:] for name, values in daily.items()}
+
+    dates = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    starts = _bucket_starts(dates, granularity)
+    buckets = {name: np.add.reduceat(values, starts) for name, values in current.items()}
+
+    totals = {name: values.sum().item() for name, values in current.items()}
+    previous_totals = {name: values.sum().item() for name, values in previous.items()}
+    return {
+        "seller_id": seller_id,
+        "granularity": granularity,
+        "window": window,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "labels": [str(label) for label in dates[starts]],
+        "series": {name: values.tolist() for name, values in buckets.items()},
+        "moving_average": {
+            name: np.round(_moving_average(values, window), 2).tolist() for name, values in buckets.items()
+        },
+        "totals": totals,
+        "previous_totals": previous_totals,
+        "deltas": {name: _delta(totals[name], previous_totals[name]) for name in SERIES},
+    }
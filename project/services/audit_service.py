@@ -0,0 +1,253 @@
+"""
+Append-only audit log of admin actions, written behind the request.
+
+``record_audit`` stages an event on the current session and costs no query.
+Staged events are handed to a per-process buffer when that session commits,
+and dropped if it rolls back, so the log only holds changes that happened.
+A background thread (``AUDIT_BACKGROUND``) writes the buffer as multi-row
+inserts every ``AUDIT_FLUSH_SECONDS``, or sooner once ``AUDIT_BATCH_SIZE``
+events are waiting; without it the buffer is written when the app context
+ends. Events buffered when the process exits are written by an ``atexit`` hook.
+
+Event ids come from ``project.utils.timeids`` and grow with time, so date
+ranges and newest-first pages are primary-key range scans.
+"""
+import atexit
+import json
+import threading
+from collections import namedtuple
+from datetime import datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from flask import current_app, has_request_context
+from flask_login import current_user
+from sqlalchemy import event, insert, select
+from sqlalchemy.orm import Session, joinedload
+
+from project import db
+from project.models import AuditEvent
+from project.utils.query_args import parse_date_arg, parse_int_arg, resolve_user_arg
+from project.utils.timeids import id_floor, next_id
+
+
+class AuditError(ValueError):
+    """Raised when audit log filters cannot be applied."""
+
+
+AUDIT_PAGE_SIZE = 50
+
+AUDIT_ACTIONS = (
+    "role_request.approve",
+    "role_request.reject",
+    "user.suspend",
+    "user.reactivate",
+    "user.delete",
+    "settings.update",
+    "review.publish",
+    "review.hide",
+)
+
+AuditFilters = namedtuple("AuditFilters", "action actor_id target_type target_id start end", defaults=(None,) * 6)
+
+# Query-string arguments understood by ``parse_audit_filters``.
+AUDIT_FILTER_ARGS = ("action", "actor", "target_type", "target_id", "start", "end")
+
+# Key in ``Session.info`` holding events staged by the open transaction.
+_STAGED = "audit_events"
+
+
+def _current_actor_id() -> Optional[int]:
+    if has_request_context() and current_user.is_authenticated:
+        return current_user.id
+    return None
+
+
+def record_audit(
+    action: str,
+    target_type: Optional[str] = None,
+    target_id: Optional[int] = None,
+    details: Optional[Dict] = None,
+    actor_id: Optional[int] = None,
+):
+    """Stage an event on the current session; it is logged only if the session commits.
+
+    ``actor_id`` defaults to the signed-in user.
+    """
+    session = db.session()
+    if not session.in_transaction():
+        # Tie the event to a transaction even before any SQL has run.
+        session.begin()
+    session.info.setdefault(_STAGED, []).append(
+        {
+            "id": next_id(),
+            "actor_id": actor_id if actor_id is not None else _current_actor_id(),
+            "action": action,
+            "target_type": target_type,
+            "target_id": target_id,
+            "details": json.dumps(details, default=str, sort_keys=True) if details else None,
+        }
+    )
+
+
+@event.listens_for(Session, "after_commit")
+def _buffer_committed_events(session):
+    events = session.info.pop(_STAGED, None)
+    if events:
+        _buffer().add(current_app._get_current_object(), events)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_rolled_back_events(session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop(_STAGED, None)
+
+
+class AuditBuffer:
+    """Committed events waiting to be written, and the thread that writes them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: List[Dict] = []
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._exit_hook = False
+
+    def __len__(self):
+        with self._lock:
+            return len(self._events)
+
+    def add(self, app, events: List[Dict]):
+        with self._lock:
+            self._events.extend(events)
+            waiting = len(self._events)
+        if not app.config["AUDIT_BACKGROUND"]:
+            return
+        self._ensure_thread(app)
+        if waiting >= app.config["AUDIT_BATCH_SIZE"]:
+            self._wakeup.set()
+
+    def take(self, limit: int) -> List[Dict]:
+        with self._lock:
+            batch, self._events = self._events[:limit], self._events[limit:]
+        return batch
+
+    def put_back(self, events: List[Dict]):
+        with self._lock:
+            self._events[:0] = events
+
+    def _ensure_thread(self, app):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, args=(app,), name="audit-log-writer", daemon=True)
+            self._thread.start()
+            if not self._exit_hook:
+                atexit.register(self._flush_in_context, app)
+                self._exit_hook = True
+
+    def _flush_in_context(self, app):
+        try:
+            with app.app_context():
+                try:
+                    flush_audit_log()
+                finally:
+                    db.session.remove()
+        except Exception:
+            app.logger.exception("Writing the audit log failed")
+
+    def _run(self, app):
+        while True:
+            self._wakeup.wait(app.config["AUDIT_FLUSH_SECONDS"])
+            self._wakeup.clear()
+            self._flush_in_context(app)
+
+
+def _buffer() -> AuditBuffer:
+    return current_app.extensions.setdefault("audit_buffer", AuditBuffer())
+
+
+def flush_audit_log() -> int:
+    """Write every buffered event, ``AUDIT_BATCH_SIZE`` rows per insert; returns rows written.
+
+    A failed batch goes back to the front of the buffer and the error is raised.
+    """
+    buffer = _buffer()
+    batch_size = current_app.config["AUDIT_BATCH_SIZE"]
+    written = 0
+    while True:
+        batch = buffer.take(batch_size)
+        if not batch:
+            return written
+        try:
+            # render_nulls keeps rows with and without optional values in one executemany.
+            db.session.execute(insert(AuditEvent).execution_options(render_nulls=True), batch)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            buffer.put_back(batch)
+            raise
+        written += len(batch)
+
+
+def flush_audit_log_on_teardown(exc=None):
+    """``teardown_appcontext`` hook writing the buffer when there is no background writer."""
+    if current_app.config["AUDIT_BACKGROUND"] or not len(_buffer()):
+        return
+    try:
+        # Anything the context left uncommitted is discarded by the session teardown anyway.
+        db.session.rollback()
+        flush_audit_log()
+    except Exception:
+        current_app.logger.exception("Writing the audit log failed")
+
+
+def parse_audit_filters(args) -> AuditFilters:
+    """Build filters from query-string arguments; the actor may be given by email or id."""
+    action = args.get("action") or None
+    if action and action not in AUDIT_ACTIONS:
+        raise AuditError("Invalid action.")
+    return AuditFilters(
+        action=action,
+        actor_id=resolve_user_arg(args.get("actor"), AuditError),
+        target_type=args.get("target_type") or None,
+        target_id=parse_int_arg(args.get("target_id"), "Target id", AuditError),
+        start=parse_date_arg(args.get("start"), "Start date", AuditError),
+        end=parse_date_arg(args.get("end"), "End date", AuditError),
+    )
+
+
+def list_audit_events(
+    filters: AuditFilters, before: Optional[int] = None, limit: int = AUDIT_PAGE_SIZE
+) -> Tuple[List[AuditEvent], Optional[int]]:
+    """Return one page of events, newest first, and the cursor for the next page.
+
+    Dates become bounds on the time-ordered id, and the cursor is the last id shown.
+    """
+    clauses = []
+    if filters.action:
+        clauses.append(AuditEvent.action == filters.action)
+    if filters.actor_id:
+        clauses.append(AuditEvent.actor_id == filters.actor_id)
+    if filters.target_type:
+        clauses.append(AuditEvent.target_type == filters.target_type)
+    if filters.target_id:
+        clauses.append(AuditEvent.target_id == filters.target_id)
+    if filters.start:
+        clauses.append(AuditEvent.id >= id_floor(datetime.combine(filters.start, time.min)))
+    if filters.end:
+        clauses.append(AuditEvent.id < id_floor(datetime.combine(filters.end + timedelta(days=1), time.min)))
+    if before:
+        clauses.append(AuditEvent.id < before)
+    rows = (
+        db.session.execute(
+            select(AuditEvent)
+            .options(joinedload(AuditEvent.actor))
+            .where(*clauses)
+            .order_by(AuditEvent.id.desc())
+            .limit(limit + 1)
+        )
+        .scalars()
+        .all()
+    )
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
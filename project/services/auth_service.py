@@ -2,11 +2,14 @@
 Authentication service for Dione Ecommerce
 """
 from werkzeug.security import generate_password_hash, check_password_hash
-from flask_mail import Message
 from flask import render_template
 import json
 from project.models import User
-from project import db, mail
+from project import db
+from project.services.email_service import enqueue_email, wake_outbox_sender
+from project.services.metrics_cache import invalidate_platform_metrics
+from project.services.platform_service import record_user_change, user_state
+from project.services.settings_service import setting_enabled
 
 class AuthService:
     """Service class for authentication operations"""
@@ -26,8 +29,19 @@ class AuthService:
         desired_role = (role or 'buyer').lower()
         hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
 
-        # If user applies for seller/rider, create a pending request, otherwise normal creation
-        if desired_role in {'seller', 'rider'}:
+        # Seller/rider applications become pending requests unless the admin
+        # settings approve that role automatically.
+        if desired_role in {'seller', 'rider'} and setting_enabled(f'auto_approve_{desired_role}s'):
+            new_user = User(
+                username=username,
+                email=email,
+                password=hashed_password,
+                role=desired_role,
+                role_requested=None,
+                is_approved=True,
+                role_request_details=json.dumps(role_details) if role_details else None
+            )
+        elif desired_role in {'seller', 'rider'}:
             new_user = User(
                 username=username,
                 email=email,
@@ -51,7 +65,9 @@ class AuthService:
 
         try:
             db.session.add(new_user)
+            record_user_change(None, user_state(new_user))
             db.session.commit()
+            invalidate_platform_metrics()
             return new_user, None
         except Exception as e:
             db.session.rollback()
@@ -77,19 +93,20 @@ class AuthService:
 
     @staticmethod
     def send_password_reset_email(user):
-        """Send password reset email to user"""
+        """Queue the password reset email for the user"""
         try:
             token = user.get_reset_token()
 
-            msg = Message()
-            msg.subject = "Login System: Password Reset Request"
-            msg.sender = 'dnxncpcx@gmail.com'
-            msg.recipients = [user.email]
-            msg.html = render_template('auth/reset_pwd.html', user=user, token=token)
-
-            mail.send(msg)
+            enqueue_email(
+                [user.email],
+                subject="Login System: Password Reset Request",
+                html=render_template('auth/reset_pwd.html', user=user, token=token),
+            )
+            db.session.commit()
+            wake_outbox_sender()
             return True, None
         except Exception as e:
+            db.session.rollback()
             return False, f"Error sending email: {str(e)}"
 
     @staticmethod
@@ -0,0 +1,195 @@
+"""
+Outgoing email through a durable outbox.
+
+Callers queue messages with ``enqueue_email`` inside the transaction that
+makes the change being announced, commit, then call ``wake_outbox_sender``.
+Requests never talk to SMTP. ``deliver_outbox`` claims a batch of due rows,
+sends them over one SMTP connection, and reschedules failures with
+exponential backoff. It runs in a background thread (``EMAIL_OUTBOX_BACKGROUND``)
+or from ``flask send-outbox``.
+"""
+import smtplib
+import threading
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from flask import current_app
+from flask_mail import Message
+from sqlalchemy import select, update
+
+from project import db, mail
+from project.models import EmailOutbox
+
+# Claimed rows are pushed this far into the future so that a crashed sender
+# releases them, and another sender skips them meanwhile.
+CLAIM_LEASE = timedelta(minutes=5)
+
+
+def default_sender() -> Optional[str]:
+    config = current_app.config
+    return config.get("MAIL_USERNAME") or config.get("MAIL_DEFAULT_SENDER")
+
+
+def enqueue_email(
+    recipients: Iterable[str],
+    subject: str,
+    body: Optional[str] = None,
+    html: Optional[str] = None,
+    sender: Optional[str] = None,
+) -> Optional[EmailOutbox]:
+    """Add a message to the outbox in the current session; the caller commits.
+
+    Returns ``None`` when there is no address to send to.
+    """
+    recipients = [address for address in recipients if address]
+    if not recipients:
+        return None
+    entry = EmailOutbox(
+        recipients=",".join(recipients),
+        sender=sender or default_sender(),
+        subject=subject,
+        body=body,
+        html=html,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.session.add(entry)
+    return entry
+
+
+def _retry_delay(attempts: int) -> timedelta:
+    config = current_app.config
+    seconds = config["EMAIL_OUTBOX_RETRY_BASE"] * 2 ** (attempts - 1)
+    return timedelta(seconds=min(seconds, config["EMAIL_OUTBOX_RETRY_MAX"]))
+
+
+def _record_failure(entry: EmailOutbox, error: Exception, now: datetime):
+    entry.attempts += 1
+    entry.last_error = str(error)[:500]
+    if entry.attempts >= current_app.config["EMAIL_OUTBOX_MAX_ATTEMPTS"]:
+        entry.status = "failed"
+        current_app.logger.error("Giving up on outbox email %s: %s", entry.id, error)
+    else:
+        entry.next_attempt_at = now + _retry_delay(entry.attempts)
+
+
+def _claim_due(batch_size: int, now: datetime):
+    ids = (
+        db.session.execute(
+            select(EmailOutbox.id)
+            .where(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now)
+            .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    if ids:
+        db.session.execute(
+            update(EmailOutbox).where(EmailOutbox.id.in_(ids)).values(next_attempt_at=now + CLAIM_LEASE)
+        )
+    db.session.commit()
+    if not ids:
+        return []
+    return db.session.execute(select(EmailOutbox).where(EmailOutbox.id.in_(ids)).order_by(EmailOutbox.id)).scalars().all()
+
+
+def deliver_outbox(batch_size: Optional[int] = None, now: Optional[datetime] = None) -> int:
+    """Send one batch of due messages over a single SMTP connection; returns rows claimed.
+
+    A failed message is retried later with exponential backoff and marked
+    ``failed`` after ``EMAIL_OUTBOX_MAX_ATTEMPTS``. If the connection itself
+    drops or errors at the socket level, every message not yet sent counts one
+    failed attempt.
+    """
+    now = now or datetime.utcnow()
+    entries = _claim_due(batch_size or current_app.config["EMAIL_OUTBOX_BATCH_SIZE"], now)
+    if not entries:
+        return 0
+    unsent = list(entries)
+    try:
+        with mail.connect() as connection:
+            while unsent:
+                entry = unsent[0]
+                message = Message(
+                    subject=entry.subject,
+                    recipients=entry.recipients.split(","),
+                    body=entry.body,
+                    html=entry.html,
+                    sender=entry.sender or default_sender(),
+                )
+                try:
+                    connection.send(message)
+                except smtplib.SMTPServerDisconnected:
+                    raise
+                except smtplib.SMTPException as exc:
+                    # Refused recipients and other SMTP replies leave the connection usable.
+                    _record_failure(entry, exc, now)
+                except OSError:
+                    raise
+                except Exception as exc:
+                    _record_failure(entry, exc, now)
+                else:
+                    entry.status = "sent"
+                    entry.sent_at = datetime.utcnow()
+                    entry.attempts += 1
+                db.session.commit()
+                unsent.pop(0)
+    except Exception as exc:
+        current_app.logger.warning("Outbox SMTP connection failed: %s", exc)
+        for entry in unsent:
+            _record_failure(entry, exc, now)
+        db.session.commit()
+    return len(entries)
+
+
+def drain_outbox(now: Optional[datetime] = None) -> int:
+    """Deliver batches until no due message is left; returns rows processed."""
+    batch_size = current_app.config["EMAIL_OUTBOX_BATCH_SIZE"]
+    processed = 0
+    while True:
+        claimed = deliver_outbox(batch_size, now=now)
+        processed += claimed
+        if claimed < batch_size:
+            return processed
+
+
+class OutboxSender:
+    """Daemon thread that drains the outbox when woken and on a poll interval."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def wake(self, app):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, args=(app,), name="email-outbox-sender", daemon=True
+                )
+                self._thread.start()
+        self._wakeup.set()
+
+    def _run(self, app):
+        while True:
+            self._wakeup.wait(app.config["EMAIL_OUTBOX_POLL_SECONDS"])
+            self._wakeup.clear()
+            try:
+                with app.app_context():
+                    try:
+                        drain_outbox()
+                    finally:
+                        db.session.remove()
+            except Exception:
+                app.logger.exception("Email outbox delivery failed")
+
+
+def wake_outbox_sender():
+    """Nudge the background sender after committing queued messages."""
+    app = current_app._get_current_object()
+    if not app.config["EMAIL_OUTBOX_BACKGROUND"]:
+        return
+    app.extensions.setdefault("email_outbox_sender", OutboxSender()).wake(app)
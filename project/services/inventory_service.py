@@ -0,0 +1,292 @@
+"""
+Inventory ledger balances, snapshots, reconciliation and low-stock alerts.
+
+Every change to ``Product.stock`` writes an ``InventoryTransaction`` row.
+``inventory_snapshot`` keeps the latest ledger balance per product, so a
+balance is the snapshot plus only the rows written since it was taken.
+The same writes keep ``low_stock_item`` in step with each product's reorder
+threshold, and sellers are alerted about new crossings in batched digests.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+
+from project import db
+from project.models import InventorySnapshot, InventoryTransaction, LowStockItem, Product, User
+from project.services.email_service import enqueue_email, wake_outbox_sender
+from project.utils.sql import upsert_replace
+
+SNAPSHOT_BATCH_SIZE = 1000
+# Ledger rows younger than this are left out of snapshots, so a transaction
+# that was assigned a lower id but commits late is never skipped.
+SNAPSHOT_SETTLE_SECONDS = 300
+
+
+def _ledger_balance_expr():
+    """Snapshot balance plus the changes recorded after it, correlated to ``Product``."""
+    replay = (
+        select(func.coalesce(func.sum(InventoryTransaction.change), 0))
+        .where(
+            InventoryTransaction.product_id == Product.id,
+            InventoryTransaction.id > func.coalesce(InventorySnapshot.last_transaction_id, 0),
+        )
+        .correlate(Product, InventorySnapshot)
+        .scalar_subquery()
+    )
+    return func.coalesce(InventorySnapshot.balance, 0) + replay
+
+
+def ledger_balance(product_id: int) -> int:
+    """Reconstruct a product's stock from its latest snapshot and the ledger."""
+    return db.session.execute(
+        select(_ledger_balance_expr())
+        .select_from(Product)
+        .outerjoin(InventorySnapshot, InventorySnapshot.product_id == Product.id)
+        .where(Product.id == product_id)
+    ).scalar_one()
+
+
+def take_inventory_snapshots(
+    batch_size: int = SNAPSHOT_BATCH_SIZE,
+    settle_seconds: int = SNAPSHOT_SETTLE_SECONDS,
+    now: Optional[datetime] = None,
+) -> int:
+    """Roll ledger rows into per-product snapshots and return how many products advanced.
+
+    Products are walked in primary-key batches, each in its own transaction;
+    a batch aggregates only the ledger rows after each product's previous
+    snapshot with one grouped query.
+    """
+    cutoff = (now or datetime.utcnow()) - timedelta(seconds=settle_seconds)
+    advanced = 0
+    last_id = 0
+    while True:
+        product_ids = db.session.execute(
+            select(Product.id).where(Product.id > last_id).order_by(Product.id).limit(batch_size)
+        ).scalars().all()
+        if not product_ids:
+            break
+        last_id = product_ids[-1]
+
+        previous = {
+            row.product_id: row
+            for row in db.session.execute(
+                select(InventorySnapshot.product_id, InventorySnapshot.balance, InventorySnapshot.last_transaction_id)
+                .where(InventorySnapshot.product_id.in_(product_ids))
+            )
+        }
+        pending = db.session.execute(
+            select(
+                InventoryTransaction.product_id,
+                func.sum(InventoryTransaction.change).label("change"),
+                func.max(InventoryTransaction.id).label("last_transaction_id"),
+            )
+            .outerjoin(InventorySnapshot, InventorySnapshot.product_id == InventoryTransaction.product_id)
+            .where(
+                InventoryTransaction.product_id.in_(product_ids),
+                InventoryTransaction.id > func.coalesce(InventorySnapshot.last_transaction_id, 0),
+                InventoryTransaction.created_at <= cutoff,
+            )
+            .group_by(InventoryTransaction.product_id)
+        )
+        rows = [
+            {
+                "product_id": row.product_id,
+                "balance": (previous[row.product_id].balance if row.product_id in previous else 0) + row.change,
+                "last_transaction_id": row.last_transaction_id,
+            }
+            for row in pending
+        ]
+
+        if rows:
+            db.session.execute(
+                delete(InventorySnapshot).where(InventorySnapshot.product_id.in_([row["product_id"] for row in rows]))
+            )
+            db.session.execute(insert(InventorySnapshot), rows)
+            advanced += len(rows)
+        db.session.commit()
+    return advanced
+
+
+def iter_inventory_drift_batches(batch_size: int = SNAPSHOT_BATCH_SIZE) -> Iterator[List[Dict]]:
+    """Yield lists of at most ``batch_size`` products whose ``stock`` disagrees with the ledger.
+
+    The comparison happens in SQL, and each batch is its own query keyed on
+    product id, so memory stays flat regardless of catalog size and callers
+    may write and commit between batches.
+    """
+    ledger = _ledger_balance_expr().label("ledger_balance")
+    query = (
+        select(Product.id, Product.seller_id, Product.stock, ledger)
+        .outerjoin(InventorySnapshot, InventorySnapshot.product_id == Product.id)
+        .where(Product.stock != ledger)
+        .order_by(Product.id)
+        .limit(batch_size)
+    )
+    last_id = 0
+    while True:
+        rows = db.session.execute(query.where(Product.id > last_id)).all()
+        if not rows:
+            return
+        yield [
+            {
+                "product_id": row.id,
+                "seller_id": row.seller_id,
+                "stock": row.stock,
+                "ledger_balance": row.ledger_balance,
+                "drift": row.stock - row.ledger_balance,
+            }
+            for row in rows
+        ]
+        last_id = rows[-1].id
+
+
+def iter_inventory_drift(batch_size: int = SNAPSHOT_BATCH_SIZE) -> Iterator[Dict]:
+    """Stream products whose ``stock`` disagrees with the ledger, one batch in memory at a time."""
+    for batch in iter_inventory_drift_batches(batch_size):
+        yield from batch
+
+
+def repair_inventory_drift(drifts: List[Dict]) -> int:
+    """Write one ``reconciliation`` ledger row per drifted product so the ledger matches stock."""
+    if not drifts:
+        return 0
+    db.session.execute(
+        insert(InventoryTransaction),
+        [
+            {
+                "product_id": drift["product_id"],
+                "change": drift["drift"],
+                "source": "reconciliation",
+                "note": "Ledger reconciled to stock",
+            }
+            for drift in drifts
+        ],
+    )
+    db.session.commit()
+    return len(drifts)
+
+
+def track_low_stock(products: Iterable[Product]):
+    """Record threshold crossings for products whose stock was just written.
+
+    A product that drops to or below its ``reorder_threshold`` gains a
+    ``low_stock_item`` row with ``alerted_at`` unset, which queues it for the
+    seller's next digest; one that recovers above the threshold loses its row.
+    Products that stay low only have their figures refreshed. Costs one
+    SELECT plus at most one write per kind, whatever the batch size; the
+    caller owns the transaction.
+    """
+    by_id = {product.id: product for product in products}
+    if not by_id:
+        return
+    tracked = set(
+        db.session.execute(select(LowStockItem.product_id).where(LowStockItem.product_id.in_(list(by_id)))).scalars()
+    )
+    low = {pid for pid, product in by_id.items() if product.stock <= product.reorder_threshold}
+
+    recovered = tracked - low
+    if recovered:
+        db.session.execute(delete(LowStockItem).where(LowStockItem.product_id.in_(list(recovered))))
+    crossed = low - tracked
+    if crossed:
+        # A concurrent write may have recorded the same crossing since the
+        # SELECT above, so take over its row instead of failing the caller.
+        upsert_replace(
+            LowStockItem,
+            [
+                {
+                    "product_id": pid,
+                    "seller_id": by_id[pid].seller_id,
+                    "stock": by_id[pid].stock,
+                    "threshold": by_id[pid].reorder_threshold,
+                }
+                for pid in crossed
+            ],
+            ("product_id",),
+            ("stock", "threshold"),
+        )
+    still_low = low & tracked
+    if still_low:
+        table = LowStockItem.__table__
+        db.session.execute(
+            update(table)
+            .where(table.c.product_id == bindparam("pid"))
+            .values(stock=bindparam("new_stock"), threshold=bindparam("new_threshold")),
+            [
+                {"pid": pid, "new_stock": by_id[pid].stock, "new_threshold": by_id[pid].reorder_threshold}
+                for pid in still_low
+            ],
+        )
+
+
+def rebuild_low_stock(seller_id: Optional[int] = None, batch_size: int = SNAPSHOT_BATCH_SIZE) -> int:
+    """Re-derive ``low_stock_item`` from current stock in product-id batches; returns products scanned.
+
+    Used to backfill, or to repair rows after stock was changed outside the
+    services. Newly found crossings are queued for the next digest.
+    """
+    scanned = 0
+    last_id = 0
+    while True:
+        query = Product.query.filter(Product.id > last_id)
+        if seller_id is not None:
+            query = query.filter(Product.seller_id == seller_id)
+        batch = query.order_by(Product.id).limit(batch_size).all()
+        if not batch:
+            break
+        track_low_stock(batch)
+        db.session.commit()
+        scanned += len(batch)
+        last_id = batch[-1].id
+    return scanned
+
+
+def send_low_stock_digests(now: Optional[datetime] = None) -> int:
+    """Queue one digest email per seller for their unalerted low-stock products; returns digests queued.
+
+    The digests and the ``alerted_at`` stamps are committed together, so a
+    product is never alerted without its email being in the outbox.
+    """
+    pending = db.session.execute(
+        select(
+            LowStockItem.product_id,
+            LowStockItem.seller_id,
+            LowStockItem.stock,
+            LowStockItem.threshold,
+            Product.name,
+            User.email,
+        )
+        .join(Product, Product.id == LowStockItem.product_id)
+        .join(User, User.id == LowStockItem.seller_id)
+        .where(LowStockItem.alerted_at.is_(None))
+        .order_by(LowStockItem.seller_id, LowStockItem.stock)
+    ).all()
+    by_seller = defaultdict(list)
+    for row in pending:
+        by_seller[(row.seller_id, row.email)].append(row)
+
+    alerted = []
+    digests = 0
+    for (seller_id, email), rows in by_seller.items():
+        lines = [f"- {row.name}: {row.stock} left (reorder at {row.threshold})" for row in rows]
+        queued = enqueue_email(
+            [email],
+            subject=f"{len(rows)} product(s) running low on stock",
+            body="These products reached their reorder threshold:\n\n" + "\n".join(lines),
+        )
+        if queued is not None:
+            alerted.extend(row.product_id for row in rows)
+            digests += 1
+    if not alerted:
+        return 0
+    db.session.execute(
+        update(LowStockItem)
+        .where(LowStockItem.product_id.in_(alerted), LowStockItem.alerted_at.is_(None))
+        .values(alerted_at=now or datetime.utcnow())
+    )
+    db.session.commit()
+    wake_outbox_sender()
+    return digests
@@ -0,0 +1,119 @@
+"""
+Per-seller, stale-while-revalidate cache for dashboard and analytics metrics.
+Platform-wide admin figures share it under the ``PLATFORM_SCOPE`` key, with
+their own ``PLATFORM_METRICS_*`` settings in place of ``SELLER_METRICS_*``.
+
+Fresh entries (younger than the soft TTL) are served as-is. Stale entries are
+still served immediately while a single background refresh recomputes them;
+entries past the hard TTL, or dropped by ``invalidate_seller_metrics`` after
+an order or product write, are recomputed inline. Cached values must be
+plain data, never ORM instances, since they outlive the session that built
+them.
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from flask import current_app
+
+from project import db
+
+
+class MetricsCache:
+    """Thread-safe in-process cache keyed by ``(kind, seller_id)``."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._refreshing = set()
+        self._generations: Dict[int, int] = {}
+
+    def get(self, kind: str, seller_id: int, compute: Callable[[], Any]) -> Tuple[Any, float]:
+        """Return ``(value, age_in_seconds)`` for the entry, computing it if needed."""
+        config = current_app.config
+        prefix = "PLATFORM_METRICS" if seller_id is PLATFORM_SCOPE else "SELLER_METRICS"
+        soft_ttl = config[f"{prefix}_SOFT_TTL"]
+        hard_ttl = config[f"{prefix}_HARD_TTL"]
+        key = (kind, seller_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generations.get(seller_id, 0)
+        if entry:
+            value, computed_at = entry
+            age = now - computed_at
+            if age < soft_ttl:
+                return value, age
+            if age < hard_ttl and config[f"{prefix}_ASYNC_REFRESH"]:
+                self._schedule_refresh(key, generation, compute)
+                return value, age
+        value = compute()
+        self._store(key, generation, value)
+        return value, 0.0
+
+    def invalidate(self, seller_id: int):
+        with self._lock:
+            self._generations[seller_id] = self._generations.get(seller_id, 0) + 1
+            for key in [key for key in self._entries if key[1] == seller_id]:
+                del self._entries[key]
+
+    def _store(self, key, generation: int, value):
+        with self._lock:
+            # A write that invalidated the seller mid-computation wins.
+            if self._generations.get(key[1], 0) == generation:
+                self._entries[key] = (value, time.monotonic())
+
+    def _schedule_refresh(self, key, generation: int, compute: Callable[[], Any]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        app = current_app._get_current_object()
+        thread = threading.Thread(
+            target=self._refresh,
+            args=(app, key, generation, compute),
+            name=f"metrics-refresh-{key[0]}-{key[1]}",
+            daemon=True,
+        )
+        thread.start()
+
+    def _refresh(self, app, key, generation: int, compute: Callable[[], Any]):
+        try:
+            with app.app_context():
+                try:
+                    self._store(key, generation, compute())
+                finally:
+                    db.session.remove()
+        except Exception:
+            app.logger.exception("Background refresh of %s metrics for seller %s failed", *key)
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+# Cache scope used for platform-wide admin figures instead of a seller id.
+PLATFORM_SCOPE = None
+
+
+def _cache() -> MetricsCache:
+    return current_app.extensions.setdefault("seller_metrics_cache", MetricsCache())
+
+
+def cached_seller_metrics(kind: str, seller_id: int, compute: Callable[[], Any]) -> Tuple[Any, float]:
+    return _cache().get(kind, seller_id, compute)
+
+
+def invalidate_seller_metrics(*seller_ids: int):
+    """Drop cached metrics for sellers whose orders or products just changed."""
+    cache = _cache()
+    for seller_id in set(seller_ids):
+        cache.invalidate(seller_id)
+
+
+def cached_platform_metrics(kind: str, compute: Callable[[], Any]) -> Tuple[Any, float]:
+    return _cache().get(kind, PLATFORM_SCOPE, compute)
+
+
+def invalidate_platform_metrics():
+    """Drop cached admin figures after a user signup, approval or deletion."""
+    _cache().invalidate(PLATFORM_SCOPE)
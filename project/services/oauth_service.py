@@ -3,6 +3,8 @@ OAuth service for social login integration
 """
 from project.models import User, OAuth
 from project import db
+from project.services.metrics_cache import invalidate_platform_metrics
+from project.services.platform_service import record_user_change, user_state
 from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 
@@ -33,6 +35,7 @@ class OAuthService:
             db.session.add(user)
             try:
                 db.session.flush()  # Get the user.id
+                record_user_change(None, user_state(user))
             except IntegrityError:
                 # Another process created this user first; fetch and reuse
                 db.session.rollback()
@@ -55,6 +58,7 @@ class OAuthService:
 
         try:
             db.session.commit()
+            invalidate_platform_metrics()
             return user, True  # New user created
         except Exception as e:
             db.session.rollback()
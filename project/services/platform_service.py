@@ -0,0 +1,137 @@
+"""
+Platform-wide figures for the admin overview and monitoring pages.
+
+User counts come from one ``GROUP BY role`` query with a conditional
+aggregate for pending requests, or, when ``ADMIN_COUNTS_FROM_COUNTERS`` is
+set, from ``platform_counter`` rows maintained on signup, approval and
+deletion. Accounts marked deleted are not counted. Both pages are served
+through the shared metrics cache.
+"""
+from collections import Counter
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import current_app
+from sqlalchemy import and_, case, delete, func, insert, or_, select
+
+from project import db
+from project.models import Order, PlatformCounter, Review, StoreProfile, User
+from project.services.metrics_cache import cached_platform_metrics, invalidate_platform_metrics
+from project.utils.sql import upsert_increment
+
+UserState = Tuple[str, bool]
+OVERVIEW_ROLES = ("buyer", "seller", "rider")
+
+
+def _pending_flag():
+    return case((and_(User.role_requested.isnot(None), User.is_approved.is_(False)), 1), else_=0)
+
+
+def user_state(user: User) -> UserState:
+    """The (role, pending) pair that decides which counters a user contributes to."""
+    return (user.role or "buyer").lower(), bool(user.role_requested and not user.is_approved)
+
+
+def _counter_names(state: Optional[UserState]):
+    if state is None:
+        return []
+    role, pending = state
+    names = ["users", f"role:{role}"]
+    if pending:
+        names.append("pending")
+    return names
+
+
+def record_user_change(before: Optional[UserState], after: Optional[UserState]):
+    """Move a user's contribution from ``before`` to ``after``; ``None`` means absent.
+
+    Call with ``(None, state)`` on signup and ``(state, None)`` on deletion,
+    in the same transaction as the user write, and call
+    ``invalidate_platform_metrics`` once that transaction has committed.
+    """
+    record_user_changes([(before, after)])
+
+
+def record_user_changes(changes: Iterable[Tuple[Optional[UserState], Optional[UserState]]]):
+    """Apply many ``(before, after)`` moves with a single counter upsert."""
+    deltas = Counter()
+    for before, after in changes:
+        for name in _counter_names(before):
+            deltas[name] -= 1
+        for name in _counter_names(after):
+            deltas[name] += 1
+    rows = [{"name": name, "value": delta} for name, delta in deltas.items() if delta]
+    if rows:
+        upsert_increment(PlatformCounter, rows, ("name",), ("value",))
+
+
+def _grouped_user_counts() -> Counter:
+    counts = Counter()
+    rows = db.session.execute(
+        select(User.role, func.count(User.id), func.sum(_pending_flag()))
+        .where(User.deleted_at.is_(None))
+        .group_by(User.role)
+    )
+    for role, total, pending in rows:
+        counts["users"] += total
+        counts[f"role:{(role or 'buyer').lower()}"] += total
+        counts["pending"] += pending or 0
+    return counts
+
+
+def _user_counters():
+    """Rows of ``platform_counter`` owned by the user counts; other features keep theirs alongside."""
+    return or_(PlatformCounter.name.in_(("users", "pending")), PlatformCounter.name.startswith("role:"))
+
+
+def _stored_user_counts() -> Counter:
+    return Counter(
+        dict(db.session.execute(select(PlatformCounter.name, PlatformCounter.value).where(_user_counters())).all())
+    )
+
+
+def user_overview_counts() -> Tuple[Dict[str, int], float]:
+    """Return ``(counts, age)`` with total, per-role and pending user counts."""
+
+    def compute():
+        counts = _stored_user_counts() if current_app.config["ADMIN_COUNTS_FROM_COUNTERS"] else _grouped_user_counts()
+        figures = {"total_users": counts["users"], "total_pending": counts["pending"]}
+        figures.update({f"total_{role}s": counts[f"role:{role}"] for role in OVERVIEW_ROLES})
+        return figures
+
+    return cached_platform_metrics("user_counts", compute)
+
+
+def monitoring_metrics() -> Tuple[Dict[str, float], float]:
+    """Return ``(metrics, age)`` for the monitoring page, gathered in one statement."""
+
+    def compute():
+        row = db.session.execute(
+            select(
+                select(func.count(Order.id)).scalar_subquery().label("orders"),
+                select(func.coalesce(func.sum(Order.total_amount), 0)).scalar_subquery().label("revenue"),
+                select(func.count(StoreProfile.id)).scalar_subquery().label("stores"),
+                select(func.count(Review.id))
+                .where(Review.is_published.is_(False))
+                .scalar_subquery()
+                .label("pending_reviews"),
+            )
+        ).one()
+        return {
+            "orders": row.orders,
+            "revenue": float(row.revenue or 0),
+            "stores": row.stores,
+            "pending_reviews": row.pending_reviews,
+        }
+
+    return cached_platform_metrics("monitoring", compute)
+
+
+def rebuild_platform_counters() -> Dict[str, int]:
+    """Overwrite the user rows of ``platform_counter`` with exact counts from the user table."""
+    counts = _grouped_user_counts()
+    db.session.execute(delete(PlatformCounter).where(_user_counters()))
+    if counts:
+        db.session.execute(insert(PlatformCounter), [{"name": name, "value": value} for name, value in counts.items()])
+    db.session.commit()
+    invalidate_platform_metrics()
+    return dict(counts)
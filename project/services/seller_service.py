@@ -1,23 +1,37 @@
 """
 Utility functions backing the seller dashboard and product management flows.
 """
+import math
 import os
 import uuid
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
 from decimal import Decimal, InvalidOperation
-from typing import Iterable, List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import func, desc
+from sqlalchemy import and_, case, func, literal, or_, select, union_all
+from sqlalchemy.orm import aliased, selectinload
 
 from project import db
 from project.models import (
     Category,
     InventoryTransaction,
+    LowStockItem,
     Order,
     OrderItem,
     Product,
     ProductImage,
     User,
 )
+from project.services.inventory_service import track_low_stock
+from project.services.metrics_cache import invalidate_seller_metrics
+from project.services.stats_service import (
+    record_new_orders,
+    record_product_sales,
+    record_status_change,
+    seller_order_totals,
+)
+from project.utils.slugs import flush_with_unique_slug, slugify
 from werkzeug.utils import secure_filename
 
 
@@ -25,15 +39,6 @@ class ProductValidationError(ValueError):
     """Raised when seller input fails validation."""
 
 
-def _slugify(value: str) -> str:
-    return (
-        value.lower()
-        .strip()
-        .replace(" ", "-")
-        .replace("_", "-")
-    )
-
-
 def list_categories() -> List[Category]:
     return Category.query.filter_by(is_active=True).order_by(Category.name.asc()).all()
 
@@ -42,14 +47,15 @@ def upsert_category(name: str) -> Optional[Category]:
     cleaned = (name or "").strip()
     if not cleaned:
         return None
-    slug = _slugify(cleaned)
-    category = Category.query.filter(
-        func.lower(Category.slug) == slug.lower()
-    ).first()
+    slug = slugify(cleaned)
+
+    def find_existing():
+        return Category.query.filter(func.lower(Category.slug) == slug).first()
+
+    category = find_existing()
     if not category:
-        category = Category(name=cleaned, slug=slug, is_active=True)
-        db.session.add(category)
-        db.session.flush()
+        # Two sellers adding the same new category at once resolve to one row.
+        category = flush_with_unique_slug(Category(name=cleaned, is_active=True), slug, on_conflict=find_existing)
     return category
 
 
@@ -125,6 +131,12 @@ def save_product_from_form(
     description = (form_data.get("description") or "").strip()
     price = _parse_decimal(form_data.get("price", "0"), "price")
     stock = _parse_int(form_data.get("stock", "0"), "inventory")
+    reorder_threshold = form_data.get("reorder_threshold")
+    reorder_threshold = (
+        _parse_int(reorder_threshold, "reorder threshold")
+        if reorder_threshold not in (None, "")
+        else (product.reorder_threshold if product else LOW_STOCK_THRESHOLD)
+    )
 
     if not name:
         raise ProductValidationError("Product name is required.")
@@ -148,6 +160,7 @@ def save_product_from_form(
             description=description,
             price=price,
             stock=stock,
+            reorder_threshold=reorder_threshold,
             category=category,
             is_featured=is_featured,
         )
@@ -164,6 +177,7 @@ def save_product_from_form(
         product.category = category
         product.is_featured = is_featured
         product.is_active = bool(form_data.get("is_active"))
+        product.reorder_threshold = reorder_threshold
         if stock != previous_stock:
             delta = stock - previous_stock
             product.stock = stock
@@ -180,58 +194,183 @@ def save_product_from_form(
         _reset_images(product, upload_folder)
     validated = _validate_images(uploads, len(product.images), allowed_ext)
     _persist_images(product, validated, upload_folder)
+    track_low_stock([product])
     db.session.commit()
+    invalidate_seller_metrics(product.seller_id)
     return product
 
 
 def toggle_featured(product: Product) -> Product:
     product.is_featured = not product.is_featured
     db.session.commit()
+    invalidate_seller_metrics(product.seller_id)
     return product
 
 
-def gather_dashboard_metrics(seller_id: int) -> dict:
-    total_products = Product.query.filter_by(seller_id=seller_id).count()
-    featured_products = Product.query.filter_by(seller_id=seller_id, is_featured=True).count()
-    total_stock = db.session.query(func.coalesce(func.sum(Product.stock), 0)).filter(Product.seller_id == seller_id).scalar() or 0
-
-    orders_query = Order.query.filter(Order.seller_id == seller_id)
-    total_orders = orders_query.count()
-    revenue = db.session.query(func.coalesce(func.sum(Order.total_amount), 0)).filter(Order.seller_id == seller_id, Order.status.in_(("processing", "shipped", "completed"))).scalar() or 0
-    open_orders = orders_query.filter(Order.status.in_(("pending", "processing"))).count()
-
-    product_performance = (
-        db.session.query(
+PRODUCTS_PAGE_SIZE = 20
+PRODUCT_SORTS = {
+    "newest": (Product.created_at.desc(), Product.id.desc()),
+    "name": (Product.name.asc(), Product.id.asc()),
+    "price": (Product.price.asc(), Product.id.asc()),
+    "price_desc": (Product.price.desc(), Product.id.desc()),
+    "stock": (Product.stock.asc(), Product.id.asc()),
+}
+
+ProductPage = namedtuple("ProductPage", "rows page pages total")
+
+
+def list_seller_products(
+    seller_id: int,
+    search: Optional[str] = None,
+    sort: str = "newest",
+    page: int = 1,
+    per_page: int = PRODUCTS_PAGE_SIZE,
+) -> ProductPage:
+    """Return one page of the seller's catalog as lightweight rows.
+
+    Only the columns the catalog table shows are selected, so ``description``
+    is never read; the category name comes from a join and the first image
+    path from a correlated subquery, keeping the page to a count query plus
+    one row query.
+    """
+    filters = [Product.seller_id == seller_id]
+    search = (search or "").strip()
+    if search:
+        filters.append(func.lower(Product.name).contains(search.lower(), autoescape=True))
+    total = db.session.execute(select(func.count(Product.id)).where(*filters)).scalar_one()
+    pages = max(1, math.ceil(total / per_page))
+    page = min(max(page, 1), pages)
+
+    first_image = (
+        select(ProductImage.path)
+        .where(ProductImage.product_id == Product.id)
+        .order_by(ProductImage.position.asc(), ProductImage.id.asc())
+        .limit(1)
+        .correlate(Product)
+        .scalar_subquery()
+    )
+    rows = db.session.execute(
+        select(
             Product.id,
             Product.name,
-            func.coalesce(func.sum(OrderItem.quantity), 0).label("units_sold"),
-            func.coalesce(func.sum(OrderItem.quantity * OrderItem.unit_price), 0).label("revenue"),
+            Product.price,
+            Product.stock,
+            Product.reorder_threshold,
+            Product.is_featured,
+            Product.updated_at,
+            Category.name.label("category_name"),
+            first_image.label("image_path"),
         )
-        .outerjoin(OrderItem, OrderItem.product_id == Product.id)
-        .outerjoin(Order, OrderItem.order_id == Order.id)
-        .filter(Product.seller_id == seller_id)
-        .group_by(Product.id)
-        .order_by(desc("revenue"))
-        .limit(5)
-        .all()
+        .outerjoin(Category, Category.id == Product.category_id)
+        .where(*filters)
+        .order_by(*PRODUCT_SORTS.get(sort, PRODUCT_SORTS["newest"]))
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+    ).all()
+    return ProductPage(rows=rows, page=page, pages=pages, total=total)
+
+
+# Reorder threshold for products created without one.
+LOW_STOCK_THRESHOLD = 5
+DASHBOARD_LIST_LIMIT = 5
+
+
+def _dashboard_product_lists(seller_id: int):
+    """Fetch the low-inventory and featured product lists in one UNION ALL round trip."""
+    low = (
+        select(Product, literal("low").label("bucket"))
+        .join(LowStockItem, LowStockItem.product_id == Product.id)
+        .where(LowStockItem.seller_id == seller_id)
+        .order_by(LowStockItem.stock.asc())
+        .limit(DASHBOARD_LIST_LIMIT)
+        .subquery()
     )
-
-    low_inventory = (
-        Product.query.filter(Product.seller_id == seller_id, Product.stock <= 5)
-        .order_by(Product.stock.asc())
-        .limit(5)
-        .all()
+    featured = (
+        select(Product, literal("featured").label("bucket"))
+        .where(Product.seller_id == seller_id, Product.is_featured.is_(True))
+        .order_by(Product.updated_at.desc())
+        .limit(DASHBOARD_LIST_LIMIT)
+        .subquery()
     )
+    combined = union_all(low.select(), featured.select()).subquery()
+    listed = aliased(Product, combined)
+    rows = db.session.execute(
+        select(listed, combined.c.bucket).options(
+            selectinload(listed.category),
+            selectinload(listed.images),
+        )
+    ).all()
+    low_inventory = [
+        {
+            "id": p.id,
+            "name": p.name,
+            "stock": p.stock,
+            "reorder_threshold": p.reorder_threshold,
+            "category_name": p.category.name if p.category else None,
+        }
+        for p in sorted((p for p, bucket in rows if bucket == "low"), key=lambda p: p.stock)
+    ]
+    featured_products = [
+        {
+            "id": p.id,
+            "name": p.name,
+            "price": p.price,
+            "image_path": p.images[0].path if p.images else None,
+        }
+        for p in sorted((p for p, bucket in rows if bucket == "featured"), key=lambda p: p.updated_at, reverse=True)
+    ]
+    return low_inventory, featured_products
+
+
+def gather_dashboard_metrics(seller_id: int) -> dict:
+    """Collect every figure shown on the seller dashboard.
+
+    Product KPIs come from one conditional-aggregation query, order KPIs from
+    the ``seller_daily_stats`` rollup, and the two product lists share a
+    single UNION ALL query. Everything returned is plain data so the result
+    can be cached across requests.
+    """
+    total_products, featured_count, total_stock = db.session.execute(
+        select(
+            func.count(Product.id),
+            func.coalesce(func.sum(case((Product.is_featured.is_(True), 1), else_=0)), 0),
+            func.coalesce(func.sum(Product.stock), 0),
+        ).where(Product.seller_id == seller_id)
+    ).one()
+
+    order_totals = seller_order_totals(seller_id)
+
+    # Served from ix_product_seller_revenue using the maintained counters.
+    product_performance = db.session.execute(
+        select(Product.id, Product.name, Product.units_sold, Product.revenue)
+        .where(Product.seller_id == seller_id)
+        .order_by(Product.revenue.desc())
+        .limit(DASHBOARD_LIST_LIMIT)
+    ).all()
+
+    low_inventory, featured_products = _dashboard_product_lists(seller_id)
+
+    recent_orders = [
+        row._asdict()
+        for row in db.session.execute(
+            select(Order.id, Order.status, Order.total_amount, Order.placed_at)
+            .where(Order.seller_id == seller_id)
+            .order_by(Order.placed_at.desc())
+            .limit(DASHBOARD_LIST_LIMIT)
+        )
+    ]
 
     return {
         "total_products": total_products,
-        "featured_products": featured_products,
+        "featured_products": int(featured_count),
         "total_stock": int(total_stock),
-        "total_orders": total_orders,
-        "total_revenue": float(revenue),
-        "open_orders": open_orders,
-        "product_performance": product_performance,
+        "total_orders": order_totals["orders"],
+        "total_revenue": order_totals["recognized_revenue"],
+        "open_orders": order_totals["open_orders"],
+        "product_performance": [row._asdict() for row in product_performance],
         "low_inventory": low_inventory,
+        "featured_list": featured_products,
+        "recent_orders": recent_orders,
     }
 
 
@@ -267,15 +406,90 @@ def log_manual_order(
     product.stock -= quantity
     txn = InventoryTransaction(product=product, change=-quantity, source="order", note=f"Manual order #{order.id}")
     db.session.add(txn)
+    record_new_orders([(order, quantity)])
+    record_product_sales([(product.id, quantity, order.total_amount)])
+    track_low_stock([product])
     db.session.commit()
+    invalidate_seller_metrics(seller.id)
     return order
 
 
+ORDERS_PAGE_SIZE = 25
+PRODUCT_SEARCH_LIMIT = 10
+
+
+def _encode_order_cursor(order: Order) -> str:
+    return f"{order.placed_at.isoformat()}_{order.id}"
+
+
+def _decode_order_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        placed_at, order_id = cursor.rsplit("_", 1)
+        return datetime.fromisoformat(placed_at), int(order_id)
+    except ValueError:
+        raise ProductValidationError("Invalid page cursor.")
+
+
+def list_seller_orders(
+    seller_id: int,
+    status: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    after: Optional[str] = None,
+    limit: int = ORDERS_PAGE_SIZE,
+) -> Tuple[List[Order], Optional[str]]:
+    """Return one page of a seller's orders, newest first, and the cursor for the next page.
+
+    Pages are keyed on ``(placed_at, id)`` so deep pages cost the same as the
+    first, and status/date filters are served by ``ix_order_seller_status_placed``.
+    Items and their product names are loaded with one extra query per page.
+    """
+    query = Order.query.options(
+        selectinload(Order.items).joinedload(OrderItem.product).load_only(Product.name)
+    ).filter(Order.seller_id == seller_id)
+    if status:
+        if status not in Order.STATUS_CHOICES:
+            raise ProductValidationError("Invalid status.")
+        query = query.filter(Order.status == status)
+    if start:
+        query = query.filter(Order.placed_at >= datetime.combine(start, time.min))
+    if end:
+        query = query.filter(Order.placed_at < datetime.combine(end + timedelta(days=1), time.min))
+    if after:
+        placed_at, order_id = _decode_order_cursor(after)
+        query = query.filter(
+            or_(Order.placed_at < placed_at, and_(Order.placed_at == placed_at, Order.id < order_id))
+        )
+    rows = query.order_by(Order.placed_at.desc(), Order.id.desc()).limit(limit + 1).all()
+    next_cursor = _encode_order_cursor(rows[limit - 1]) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def search_seller_products(seller_id: int, term: str, limit: int = PRODUCT_SEARCH_LIMIT) -> List[Dict]:
+    """Match a seller's products by name for the manual-order typeahead."""
+    term = (term or "").strip()
+    if not term:
+        return []
+    rows = db.session.execute(
+        select(Product.id, Product.name, Product.stock)
+        .where(
+            Product.seller_id == seller_id,
+            func.lower(Product.name).contains(term.lower(), autoescape=True),
+        )
+        .order_by(Product.name.asc())
+        .limit(limit)
+    )
+    return [row._asdict() for row in rows]
+
+
 def update_order_status(order: Order, status: str):
     if status not in Order.STATUS_CHOICES:
         raise ProductValidationError("Invalid status.")
+    previous_status = order.status
     order.status = status
+    record_status_change(order, previous_status, status)
     db.session.commit()
+    invalidate_seller_metrics(order.seller_id)
 
 
 def recent_inventory_transactions(product_ids: Iterable[int]) -> List[InventoryTransaction]:
@@ -283,7 +497,7 @@ def recent_inventory_transactions(product_ids: Iterable[int]) -> List[InventoryT
         return []
     return (
         InventoryTransaction.query.filter(InventoryTransaction.product_id.in_(product_ids))
-        .order_by(InventoryTransaction.created_at.desc())
+        .order_by(InventoryTransaction.id.desc())
         .limit(20)
         .all()
     )
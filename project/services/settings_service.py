@@ -0,0 +1,149 @@
+"""
+Site settings served from an immutable in-process snapshot.
+
+All ``site_setting`` rows are loaded with one query into a read-only mapping
+that is shared by every request. Writes bump the ``settings_version`` row in
+``platform_counter``. Each process compares that version against its snapshot
+at most once every ``SITE_SETTINGS_CHECK_SECONDS``, so most requests, the
+maintenance-mode gate included, read settings without touching the database.
+"""
+import threading
+import time
+from collections import namedtuple
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
+
+from flask import current_app, render_template, request
+from flask_login import current_user
+from sqlalchemy import select
+
+from project import db
+from project.models import PlatformCounter, SiteSetting
+from project.services.audit_service import record_audit
+from project.utils.sql import upsert_increment
+
+DEFAULT_SETTINGS = {
+    "support_email": "support@example.com",
+    "support_phone": "+63 900 000 0000",
+    "auto_approve_sellers": "false",
+    "auto_approve_riders": "false",
+    "maintenance_mode": "false",
+}
+
+SETTINGS_VERSION_COUNTER = "settings_version"
+
+# Endpoints that stay reachable while the site is in maintenance mode, so
+# administrators can still sign in and switch it off.
+MAINTENANCE_EXEMPT_BLUEPRINTS = {"admin"}
+MAINTENANCE_EXEMPT_ENDPOINTS = {"static"}
+
+SettingsSnapshot = namedtuple("SettingsSnapshot", "version values")
+
+
+def to_bool(value) -> bool:
+    return str(value).lower() in ("1", "true", "yes", "on")
+
+
+class SettingsCache:
+    """Holds the current snapshot and when its version was last checked."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.snapshot: Optional[SettingsSnapshot] = None
+        self.checked_at = 0.0
+
+    def clear(self):
+        with self.lock:
+            self.snapshot = None
+            self.checked_at = 0.0
+
+
+def _cache() -> SettingsCache:
+    return current_app.extensions.setdefault("site_settings", SettingsCache())
+
+
+def _stored_version() -> int:
+    version = db.session.execute(
+        select(PlatformCounter.value).where(PlatformCounter.name == SETTINGS_VERSION_COUNTER)
+    ).scalar()
+    return version or 0
+
+
+def _load_snapshot(version: int) -> SettingsSnapshot:
+    values = dict(DEFAULT_SETTINGS)
+    values.update(db.session.execute(select(SiteSetting.key, SiteSetting.value)).tuples().all())
+    return SettingsSnapshot(version=version, values=MappingProxyType(values))
+
+
+def get_settings() -> Mapping[str, str]:
+    """Return the read-only mapping of every setting, defaults filled in."""
+    cache = _cache()
+    now = time.monotonic()
+    snapshot = cache.snapshot
+    if snapshot is not None and now - cache.checked_at < current_app.config["SITE_SETTINGS_CHECK_SECONDS"]:
+        return snapshot.values
+    version = _stored_version()
+    if snapshot is None or snapshot.version != version:
+        snapshot = _load_snapshot(version)
+    with cache.lock:
+        cache.snapshot = snapshot
+        cache.checked_at = now
+    return snapshot.values
+
+
+def setting_enabled(key: str) -> bool:
+    return to_bool(get_settings().get(key))
+
+
+def ensure_default_settings() -> Mapping[str, str]:
+    """Insert any missing default rows and return the current settings."""
+    existing = set(db.session.execute(select(SiteSetting.key)).scalars())
+    missing = [key for key in DEFAULT_SETTINGS if key not in existing]
+    if missing:
+        db.session.add_all(SiteSetting(key=key, value=DEFAULT_SETTINGS[key]) for key in missing)
+        db.session.commit()
+    return get_settings()
+
+
+def save_settings(updates: Dict[str, str]) -> bool:
+    """Write changed settings, bump the version and drop this process's snapshot.
+
+    Returns whether anything changed.
+    """
+    rows = {
+        setting.key: setting
+        for setting in db.session.execute(
+            select(SiteSetting).where(SiteSetting.key.in_(list(updates)))
+        ).scalars()
+    }
+    changed = {}
+    for key, value in updates.items():
+        setting = rows.get(key)
+        if setting is None:
+            db.session.add(SiteSetting(key=key, value=value))
+            changed[key] = value
+        elif setting.value != value:
+            setting.value = value
+            changed[key] = value
+    if not changed:
+        return False
+    record_audit("settings.update", "settings", details=changed)
+    upsert_increment(PlatformCounter, [{"name": SETTINGS_VERSION_COUNTER, "value": 1}], ("name",), ("value",))
+    db.session.commit()
+    _cache().clear()
+    return True
+
+
+def maintenance_gate():
+    """``before_request`` hook that answers 503 while maintenance mode is on.
+
+    Reads only the cached snapshot; the current user is loaded only when the
+    site is actually in maintenance, to let administrators through.
+    """
+    if request.endpoint in MAINTENANCE_EXEMPT_ENDPOINTS or request.blueprint in MAINTENANCE_EXEMPT_BLUEPRINTS:
+        return None
+    if not setting_enabled("maintenance_mode"):
+        return None
+    if current_user.is_authenticated and (current_user.role or "").lower() == "admin":
+        return None
+    return render_template("main/maintenance.html", settings=get_settings()), 503
@@ -0,0 +1,219 @@
+"""
+Maintenance and reads of the ``seller_daily_stats`` rollup and the per-product
+sales counters.
+
+Every order write adjusts the seller's row for the order's day, and the
+``units_sold``/``revenue`` counters of the products sold, in the same
+transaction, so dashboards read a handful of pre-aggregated rows instead of
+scanning the seller's whole order history.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import bindparam, case, delete, func, insert, literal, select, update
+
+from project import db
+from project.models import Order, OrderItem, Product, SellerDailyStats
+from project.utils.sql import upsert_increment
+
+REVENUE_STATUSES = ("processing", "shipped", "completed")
+OPEN_STATUSES = ("pending", "processing")
+
+STATUS_COLUMNS = {status: f"{status}_count" for status in Order.STATUS_CHOICES}
+COUNTER_COLUMNS = (
+    "orders",
+    "units",
+    "gross_revenue",
+    "recognized_revenue",
+    *STATUS_COLUMNS.values(),
+)
+_KEY_COLUMNS = ("seller_id", "day")
+
+
+def _order_day(order: Order) -> date:
+    return order.placed_at.date()
+
+
+def _empty_row(seller_id: int, day: date) -> Dict:
+    row = {column: 0 for column in COUNTER_COLUMNS}
+    row.update(seller_id=seller_id, day=day)
+    return row
+
+
+def _recognized(status: str, amount: Decimal) -> Decimal:
+    return Decimal(amount) if status in REVENUE_STATUSES else Decimal("0")
+
+
+def record_new_orders(orders: Iterable[Tuple[Order, int]]):
+    """Add freshly placed ``(order, units)`` pairs to the rollup in one executemany."""
+    rows = []
+    for order, units in orders:
+        row = _empty_row(order.seller_id, _order_day(order))
+        row["orders"] = 1
+        row["units"] = units
+        row["gross_revenue"] = Decimal(order.total_amount)
+        row["recognized_revenue"] = _recognized(order.status, order.total_amount)
+        row[STATUS_COLUMNS[order.status]] = 1
+        rows.append(row)
+    upsert_increment(SellerDailyStats, rows, _KEY_COLUMNS, COUNTER_COLUMNS)
+
+
+def record_status_change(order: Order, old_status: str, new_status: str):
+    """Move an order between status buckets on its day's rollup row."""
+    if old_status == new_status:
+        return
+    row = _empty_row(order.seller_id, _order_day(order))
+    if old_status in STATUS_COLUMNS:
+        row[STATUS_COLUMNS[old_status]] -= 1
+    row[STATUS_COLUMNS[new_status]] += 1
+    row["recognized_revenue"] = _recognized(new_status, order.total_amount) - _recognized(
+        old_status, order.total_amount
+    )
+    upsert_increment(SellerDailyStats, [row], _KEY_COLUMNS, COUNTER_COLUMNS)
+
+
+def seller_order_totals(seller_id: int, start: Optional[date] = None, end: Optional[date] = None) -> Dict:
+    """Sum a seller's rollup rows, optionally restricted to ``[start, end]``."""
+    query = select(
+        func.coalesce(func.sum(SellerDailyStats.orders), 0),
+        func.coalesce(func.sum(SellerDailyStats.units), 0),
+        func.coalesce(func.sum(SellerDailyStats.gross_revenue), 0),
+        func.coalesce(func.sum(SellerDailyStats.recognized_revenue), 0),
+        *[
+            func.coalesce(func.sum(getattr(SellerDailyStats, STATUS_COLUMNS[status])), 0)
+            for status in OPEN_STATUSES
+        ],
+    ).where(SellerDailyStats.seller_id == seller_id)
+    if start:
+        query = query.where(SellerDailyStats.day >= start)
+    if end:
+        query = query.where(SellerDailyStats.day <= end)
+    orders, units, gross, recognized, *open_counts = db.session.execute(query).one()
+    return {
+        "orders": int(orders),
+        "units": int(units),
+        "gross_revenue": float(gross),
+        "recognized_revenue": float(recognized),
+        "open_orders": int(sum(open_counts)),
+    }
+
+
+def _rebuild_select(seller_id: int):
+    # Only this seller's order items are grouped, so rebuilding every seller
+    # reads each order item once overall.
+    units_per_order = (
+        select(OrderItem.order_id, func.sum(OrderItem.quantity).label("units"))
+        .join(Order, Order.id == OrderItem.order_id)
+        .where(Order.seller_id == seller_id)
+        .group_by(OrderItem.order_id)
+        .subquery()
+    )
+    day = func.date(Order.placed_at)
+    return (
+        select(
+            Order.seller_id,
+            day,
+            func.count(Order.id),
+            func.coalesce(func.sum(units_per_order.c.units), 0),
+            func.coalesce(func.sum(Order.total_amount), 0),
+            func.coalesce(
+                func.sum(case((Order.status.in_(REVENUE_STATUSES), Order.total_amount), else_=literal(0))), 0
+            ),
+            *[func.sum(case((Order.status == status, 1), else_=0)) for status in STATUS_COLUMNS],
+        )
+        .outerjoin(units_per_order, units_per_order.c.order_id == Order.id)
+        .where(Order.seller_id == seller_id)
+        .group_by(Order.seller_id, day)
+    )
+
+
+def rebuild_seller_daily_stats(seller_id: Optional[int] = None) -> int:
+    """Recompute rollup rows from the ``order`` table and return the sellers processed.
+
+    Each seller is rebuilt with one DELETE plus one INSERT ... SELECT in its
+    own transaction, so a full backfill never holds a long-running lock.
+    """
+    if seller_id is not None:
+        seller_ids = [seller_id]
+    else:
+        seller_ids = db.session.execute(select(Order.seller_id).distinct().order_by(Order.seller_id)).scalars().all()
+        db.session.execute(
+            delete(SellerDailyStats).where(SellerDailyStats.seller_id.not_in(select(Order.seller_id).distinct()))
+        )
+        db.session.commit()
+    columns = [
+        "seller_id",
+        "day",
+        "orders",
+        "units",
+        "gross_revenue",
+        "recognized_revenue",
+        *STATUS_COLUMNS.values(),
+    ]
+    for current in seller_ids:
+        db.session.execute(delete(SellerDailyStats).where(SellerDailyStats.seller_id == current))
+        db.session.execute(insert(SellerDailyStats.__table__).from_select(columns, _rebuild_select(current)))
+        db.session.commit()
+    return len(seller_ids)
+
+
+def record_product_sales(sales: Iterable[Tuple[int, int, Decimal]]):
+    """Add sold ``(product_id, units, revenue)`` lines onto the product counters.
+
+    Lines are summed per product and applied with one executemany of
+    ``units_sold = units_sold + :units``, so concurrent orders cannot
+    overwrite each other's increments. The caller owns the transaction.
+    """
+    totals: Dict[int, list] = {}
+    for product_id, units, revenue in sales:
+        entry = totals.setdefault(product_id, [0, Decimal("0")])
+        entry[0] += units
+        entry[1] += revenue
+    if not totals:
+        return
+    table = Product.__table__
+    db.session.execute(
+        update(table)
+        .where(table.c.id == bindparam("product_id"))
+        .values(
+            units_sold=table.c.units_sold + bindparam("units"),
+            revenue=table.c.revenue + bindparam("amount"),
+        ),
+        [
+            {"product_id": product_id, "units": units, "amount": revenue}
+            for product_id, (units, revenue) in totals.items()
+        ],
+    )
+
+
+def reconcile_product_sales(seller_id: Optional[int] = None) -> int:
+    """Recompute product sales counters from ``order_item`` and return how many were corrected."""
+    sold = (
+        select(
+            OrderItem.product_id,
+            func.sum(OrderItem.quantity).label("units"),
+            func.sum(OrderItem.quantity * OrderItem.unit_price).label("revenue"),
+        )
+        .group_by(OrderItem.product_id)
+        .subquery()
+    )
+    query = select(
+        Product.id,
+        Product.units_sold,
+        Product.revenue,
+        func.coalesce(sold.c.units, 0),
+        func.coalesce(sold.c.revenue, 0),
+    ).outerjoin(sold, sold.c.product_id == Product.id)
+    if seller_id is not None:
+        query = query.where(Product.seller_id == seller_id)
+
+    corrections = [
+        {"id": product_id, "units_sold": int(units), "revenue": Decimal(revenue)}
+        for product_id, units_sold, revenue_total, units, revenue in db.session.execute(query)
+        if units_sold != units or Decimal(revenue_total) != Decimal(revenue)
+    ]
+    if corrections:
+        db.session.execute(update(Product), corrections)
+    db.session.commit()
+    return len(corrections)
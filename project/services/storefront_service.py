@@ -4,17 +4,23 @@ Services powering storefront, cart/checkout, store customization, and product re
 import json
 import os
 import uuid
-from collections import defaultdict
+from collections import defaultdict, namedtuple
 from decimal import Decimal, InvalidOperation
 from typing import Dict, Iterable, List, Optional, Tuple
 
-from sqlalchemy import and_, func
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, func, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
 from project import db
 from project.models import (
     Cart,
     CartItem,
     Category,
+    InventoryTransaction,
     Order,
     OrderItem,
     OrderTrackingEvent,
@@ -26,6 +32,11 @@ from project.models import (
     StoreProfile,
     User,
 )
+from project.services.audit_service import record_audit
+from project.services.inventory_service import track_low_stock
+from project.services.metrics_cache import invalidate_platform_metrics, invalidate_seller_metrics
+from project.services.stats_service import record_new_orders, record_product_sales, seller_order_totals
+from project.utils.slugs import flush_with_unique_slug, slugify
 from werkzeug.utils import secure_filename
 
 
@@ -33,41 +44,29 @@ class StorefrontError(ValueError):
     """Raised when shopper or store operations fail validation."""
 
 
-def _slugify(value: str) -> str:
-    return (
-        (value or "")
-        .strip()
-        .lower()
-        .replace(" ", "-")
-        .replace("_", "-")
-    )
-
-
 def ensure_store_profile(seller: User) -> StoreProfile:
     """Guarantee that a seller has an associated store profile."""
     store = StoreProfile.query.filter_by(seller_id=seller.id).first()
     if store:
         return store
-    slug_base = _slugify(seller.username or f"store-{seller.id}")
-    slug = slug_base
-    counter = 1
-    while StoreProfile.query.filter_by(slug=slug).first():
-        counter += 1
-        slug = f"{slug_base}-{counter}"
     store = StoreProfile(
         seller_id=seller.id,
         name=(seller.username or "Storefront").title(),
-        slug=slug,
         tagline="New seller on Dione",
     )
-    db.session.add(store)
+    # A concurrent request for the same seller may create the profile first.
+    store = flush_with_unique_slug(
+        store,
+        slugify(seller.username or f"store-{seller.id}"),
+        on_conflict=lambda: StoreProfile.query.filter_by(seller_id=seller.id).first(),
+    )
     db.session.commit()
     return store
 
 
 def update_store_profile(store: StoreProfile, form_data, files, config) -> StoreProfile:
     store.name = (form_data.get("name") or store.name or "").strip() or store.name
-    store.slug = _slugify(form_data.get("slug") or store.slug or store.name)
+    desired_slug = slugify(form_data.get("slug") or store.slug or store.name)
     store.tagline = (form_data.get("tagline") or "").strip()
     store.description = (form_data.get("description") or "").strip()
     store.contact_email = (form_data.get("contact_email") or "").strip()
@@ -96,6 +95,9 @@ def update_store_profile(store: StoreProfile, form_data, files, config) -> Store
         file.save(path)
         setattr(store, field, f"uploads/{unique_name}")
 
+    db.session.flush()
+    if desired_slug != store.slug:
+        flush_with_unique_slug(store, desired_slug)
     db.session.commit()
     return store
 
@@ -103,14 +105,7 @@ def update_store_profile(store: StoreProfile, form_data, files, config) -> Store
 def store_analytics(store: StoreProfile) -> Dict[str, float]:
     """Return aggregated analytics for a store."""
     total_products = Product.query.filter_by(seller_id=store.seller_id).count()
-    order_query = Order.query.filter_by(seller_id=store.seller_id)
-    total_orders = order_query.count()
-    revenue = (
-        db.session.query(func.coalesce(func.sum(Order.total_amount), 0))
-        .filter(Order.seller_id == store.seller_id)
-        .scalar()
-        or 0
-    )
+    order_totals = seller_order_totals(store.seller_id)
     rating_stats = (
         db.session.query(
             func.coalesce(func.avg(Review.rating), 0),
@@ -121,8 +116,8 @@ def store_analytics(store: StoreProfile) -> Dict[str, float]:
     )
     return {
         "total_products": total_products,
-        "total_orders": total_orders,
-        "total_revenue": float(revenue),
+        "total_orders": order_totals["orders"],
+        "total_revenue": order_totals["gross_revenue"],
         "average_rating": float(rating_stats[0]),
         "review_count": rating_stats[1],
     }
@@ -179,105 +174,375 @@ def _decimal(value: str) -> Decimal:
 
 
 def get_or_create_cart(user: User) -> Cart:
-    cart = Cart.query.filter_by(user_id=user.id, status="active").first()
+    """Return the user's active cart, creating it if needed, in one round trip.
+
+    The insert is an upsert against the unique ``active_user_id`` column, so
+    concurrent requests converge on the same cart. The caller commits.
+    """
+    values = {"user_id": user.id, "active_user_id": user.id, "status": "active"}
+    dialect = db.session.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = (
+            sqlite_insert(Cart)
+            .values(**values)
+            .on_conflict_do_update(index_elements=[Cart.active_user_id], set_={"updated_at": func.now()})
+            .returning(Cart)
+        )
+        return db.session.scalars(stmt).one()
+    if dialect in ("mysql", "mariadb"):
+        stmt = (
+            mysql_insert(Cart.__table__)
+            .values(**values)
+            .on_duplicate_key_update(id=func.last_insert_id(Cart.__table__.c.id), updated_at=func.now())
+        )
+        cart_id = db.session.execute(stmt).lastrowid
+        return db.session.get(Cart, cart_id)
+
+    cart = Cart.query.filter_by(active_user_id=user.id).first()
     if cart:
         return cart
-    cart = Cart(user_id=user.id, status="active")
-    db.session.add(cart)
-    db.session.commit()
+    try:
+        with db.session.begin_nested():
+            cart = Cart(**values)
+            db.session.add(cart)
+    except IntegrityError:
+        cart = Cart.query.filter_by(active_user_id=user.id).one()
     return cart
 
 
-def add_item_to_cart(user: User, product_id: int, variant_id: Optional[int], quantity: int):
-    if quantity <= 0:
-        raise StorefrontError("Quantity must be at least 1.")
-    product = Product.query.filter_by(id=product_id, is_active=True).first()
+def _line_price(product: Product, variant: Optional[ProductVariant]) -> Decimal:
+    if not variant:
+        return product.price
+    return (Decimal(product.price) + Decimal(variant.price_delta)).quantize(Decimal("0.01"))
+
+
+CartLine = Tuple[int, Optional[int], int]
+CartItemKey = Tuple[int, Optional[int]]
+
+
+def _load_cart_line_targets(lines: Iterable[CartLine]):
+    """Fetch the active products and variants referenced by ``lines`` with one IN query each."""
+    lines = list(lines)
+    product_ids = {product_id for product_id, _, _ in lines}
+    variant_ids = {variant_id for _, variant_id, _ in lines if variant_id}
+    products = {}
+    if product_ids:
+        products = {
+            product.id: product
+            for product in Product.query.filter(Product.id.in_(product_ids), Product.is_active.is_(True))
+        }
+    variants = {}
+    if variant_ids:
+        variants = {
+            variant.id: variant
+            for variant in ProductVariant.query.filter(ProductVariant.id.in_(variant_ids))
+        }
+    return products, variants
+
+
+def _line_target(products, variants, product_id: int, variant_id: Optional[int]):
+    """Return ``(product, variant)`` for a line, or ``None`` if either is unavailable."""
+    product = products.get(product_id)
     if not product:
-        raise StorefrontError("Product not available.")
+        return None
     variant = None
-    base_price = product.price
     if variant_id:
-        variant = ProductVariant.query.filter_by(id=variant_id, product_id=product.id).first()
-        if not variant:
+        variant = variants.get(variant_id)
+        if not variant or variant.product_id != product.id:
+            return None
+    return product, variant
+
+
+def _validate_cart_lines(lines: Iterable[CartLine]):
+    """Validate requested lines against current stock, summing duplicates.
+
+    Returns the requested quantity per ``(product_id, variant_id)`` together
+    with the loaded products and variants.
+    """
+    requested: Dict[CartItemKey, int] = {}
+    for product_id, variant_id, quantity in lines:
+        if quantity <= 0:
+            raise StorefrontError("Quantity must be at least 1.")
+        key = (product_id, variant_id or None)
+        requested[key] = requested.get(key, 0) + quantity
+    if not requested:
+        raise StorefrontError("No items to add.")
+
+    products, variants = _load_cart_line_targets((pid, vid, qty) for (pid, vid), qty in requested.items())
+    for (product_id, variant_id), quantity in requested.items():
+        if product_id not in products:
+            raise StorefrontError("Product not available.")
+        target = _line_target(products, variants, product_id, variant_id)
+        if not target:
             raise StorefrontError("Variant not available.")
-        if variant.stock < quantity:
-            raise StorefrontError("Variant out of stock.")
-        base_price = (Decimal(base_price) + Decimal(variant.price_delta)).quantize(Decimal("0.01"))
-    else:
-        if product.stock < quantity:
+        product, variant = target
+        if variant:
+            if variant.stock < quantity:
+                raise StorefrontError("Variant out of stock.")
+        elif product.stock < quantity:
             raise StorefrontError("Not enough stock for this product.")
+    return requested, products, variants
+
+
+def _apply_cart_lines(cart: Cart, requested: Dict[CartItemKey, int], products, variants, cap_to_stock: bool = False):
+    """Merge ``requested`` quantities into ``cart``'s existing lines."""
+    existing = {(item.product_id, item.variant_id or None): item for item in cart.items}
+    for (product_id, variant_id), quantity in requested.items():
+        product = products[product_id]
+        variant = variants.get(variant_id) if variant_id else None
+        item = existing.get((product_id, variant_id))
+        total = (item.quantity if item else 0) + quantity
+        if cap_to_stock:
+            total = min(total, variant.stock if variant else product.stock)
+        if total <= 0:
+            continue
+        unit_price = _line_price(product, variant)
+        if item:
+            item.quantity = total
+            item.unit_price = unit_price
+        else:
+            db.session.add(
+                CartItem(
+                    cart=cart,
+                    product_id=product_id,
+                    variant_id=variant_id,
+                    quantity=total,
+                    unit_price=unit_price,
+                )
+            )
+    cart.updated_at = func.now()
+
 
+def add_items_to_cart(user: User, lines: Iterable[CartLine]) -> Cart:
+    """Add several ``(product_id, variant_id, quantity)`` lines with one commit.
+
+    All products and variants are validated with one IN query each before
+    anything is written, so an invalid line rejects the whole batch.
+    """
+    requested, products, variants = _validate_cart_lines(lines)
     cart = get_or_create_cart(user)
-    item = next(
-        (i for i in cart.items if i.product_id == product.id and (i.variant_id or None) == (variant.id if variant else None)),
-        None,
+    _apply_cart_lines(cart, requested, products, variants)
+    db.session.commit()
+    return cart
+
+
+def add_item_to_cart(user: User, product_id: int, variant_id: Optional[int], quantity: int):
+    return add_items_to_cart(user, [(product_id, variant_id, quantity)])
+
+
+# Guest carts live entirely in a signed cookie as ``[product_id, variant_id, qty]``
+# triples so anonymous shoppers never cause a database write.
+GUEST_CART_COOKIE = "guest_cart"
+GUEST_CART_MAX_LINES = 30
+
+GuestCartItem = namedtuple("GuestCartItem", "product variant quantity unit_price")
+
+
+def _guest_cart_serializer(secret_key: str) -> URLSafeSerializer:
+    return URLSafeSerializer(secret_key, salt="guest-cart")
+
+
+def load_guest_cart(raw: Optional[str], secret_key: str) -> List[CartLine]:
+    """Decode a guest cart cookie, discarding anything tampered or malformed."""
+    if not raw:
+        return []
+    try:
+        payload = _guest_cart_serializer(secret_key).loads(raw)
+    except BadSignature:
+        return []
+    lines: List[CartLine] = []
+    if not isinstance(payload, list):
+        return lines
+    for entry in payload[:GUEST_CART_MAX_LINES]:
+        try:
+            product_id, variant_id, quantity = (int(value) for value in entry)
+        except (TypeError, ValueError):
+            continue
+        if product_id > 0 and quantity > 0:
+            lines.append((product_id, variant_id or None, quantity))
+    return lines
+
+
+def dump_guest_cart(lines: Iterable[CartLine], secret_key: str) -> str:
+    return _guest_cart_serializer(secret_key).dumps(
+        [[product_id, variant_id or 0, quantity] for product_id, variant_id, quantity in lines]
     )
-    if item:
-        item.quantity += quantity
-        item.unit_price = base_price
-    else:
-        item = CartItem(
-            cart=cart,
-            product_id=product.id,
-            variant_id=variant.id if variant else None,
-            quantity=quantity,
-            unit_price=base_price,
-        )
-        db.session.add(item)
+
+
+def add_items_to_guest_cart(lines: List[CartLine], new_lines: Iterable[CartLine]) -> List[CartLine]:
+    """Return guest cart ``lines`` with ``new_lines`` merged in, using read-only validation."""
+    requested, _, _ = _validate_cart_lines(new_lines)
+    merged: Dict[CartItemKey, int] = {(pid, vid): qty for pid, vid, qty in lines}
+    for key, quantity in requested.items():
+        merged[key] = merged.get(key, 0) + quantity
+    if len(merged) > GUEST_CART_MAX_LINES:
+        raise StorefrontError("Your cart is full. Log in to add more items.")
+    return [(pid, vid, qty) for (pid, vid), qty in merged.items()]
+
+
+def add_item_to_guest_cart(
+    lines: List[CartLine],
+    product_id: int,
+    variant_id: Optional[int],
+    quantity: int,
+) -> List[CartLine]:
+    return add_items_to_guest_cart(lines, [(product_id, variant_id, quantity)])
+
+
+def guest_cart_items(lines: Iterable[CartLine]) -> List[GuestCartItem]:
+    """Resolve guest cart lines into displayable items, skipping unavailable ones."""
+    lines = list(lines)
+    products, variants = _load_cart_line_targets(lines)
+    items = []
+    for product_id, variant_id, quantity in lines:
+        target = _line_target(products, variants, product_id, variant_id)
+        if target:
+            product, variant = target
+            items.append(GuestCartItem(product, variant, quantity, _line_price(product, variant)))
+    return items
+
+
+def merge_guest_cart(user: User, lines: Iterable[CartLine]) -> Optional[Cart]:
+    """Fold a guest cart into the user's persistent cart with a single commit.
+
+    Lines whose product or variant has disappeared are dropped and quantities
+    are capped at the stock currently available.
+    """
+    lines = list(lines)
+    if not lines:
+        return None
+    products, variants = _load_cart_line_targets(lines)
+    requested: Dict[CartItemKey, int] = {}
+    for product_id, variant_id, quantity in lines:
+        if _line_target(products, variants, product_id, variant_id):
+            key = (product_id, variant_id)
+            requested[key] = requested.get(key, 0) + quantity
+    cart = get_or_create_cart(user)
+    _apply_cart_lines(cart, requested, products, variants, cap_to_stock=True)
     db.session.commit()
     return cart
 
 
 def list_cart_items(user: User) -> List[CartItem]:
-    cart = Cart.query.filter_by(user_id=user.id, status="active").first()
+    cart = Cart.query.filter_by(active_user_id=user.id).first()
     if not cart:
         return []
     return list(cart.items)
 
 
+def _line_total(lines: Iterable[dict]) -> Decimal:
+    return sum((line["quantity"] * line["unit_price"] for line in lines), Decimal("0.00"))
+
+
+def _insert_orders(rows: List[dict]) -> List[Order]:
+    """Insert order rows in one round trip where the dialect allows it.
+
+    Rows are matched back to their seller rather than relying on RETURNING
+    order, so each row must belong to a different seller. Server-generated
+    columns such as ``placed_at`` come back loaded either way.
+    """
+    if db.session.get_bind().dialect.insert_executemany_returning:
+        orders = db.session.scalars(insert(Order).returning(Order), rows).all()
+    else:
+        orders = [Order(**row) for row in rows]
+        db.session.add_all(orders)
+        db.session.flush()
+        # One SELECT fills the server defaults the flush left expired.
+        db.session.scalars(select(Order).where(Order.id.in_([order.id for order in orders]))).all()
+    by_seller = {order.seller_id: order for order in orders}
+    return [by_seller[row["seller_id"]] for row in rows]
+
+
 def checkout_cart(user: User) -> List[Order]:
-    cart = Cart.query.filter_by(user_id=user.id, status="active").first()
+    """Turn the user's active cart into one order per seller.
+
+    Stock is validated and line totals are computed in memory; the orders are
+    then written with one bulk INSERT and their items, tracking events and
+    inventory ledger rows with one executemany each, keeping the write
+    transaction short for carts that span many sellers.
+    """
+    cart = (
+        Cart.query.options(
+            selectinload(Cart.items).joinedload(CartItem.product),
+            selectinload(Cart.items).joinedload(CartItem.variant),
+        )
+        .filter_by(active_user_id=user.id)
+        .first()
+    )
     if not cart or not cart.items:
         raise StorefrontError("Your cart is empty.")
 
-    grouped: Dict[int, List[CartItem]] = defaultdict(list)
+    lines_by_seller: Dict[int, List[dict]] = defaultdict(list)
+    sales = []
+    # Low-stock tracking watches Product.stock; variant lines draw on the
+    # variant's own stock and leave it unchanged, so they are not listed.
+    decremented_products = []
     for item in cart.items:
-        grouped[item.product.seller_id].append(item)
-
-    orders: List[Order] = []
-    for seller_id, items in grouped.items():
-        order = Order(seller_id=seller_id, buyer_id=user.id, status="processing")
-        db.session.add(order)
-        db.session.flush()
-        for item in items:
-            product = item.product
-            variant = item.variant
-            qty = item.quantity
-            if variant:
-                if variant.stock < qty:
-                    raise StorefrontError(f"{product.name} variant '{variant.value}' no longer available.")
-                variant.stock -= qty
-                line_price = Decimal(item.unit_price)
-            else:
-                if product.stock < qty:
-                    raise StorefrontError(f"{product.name} is out of stock.")
-                product.stock -= qty
-                line_price = Decimal(item.unit_price)
-            order_item = OrderItem(
-                order=order,
-                product_id=product.id,
-                variant_id=variant.id if variant else None,
-                quantity=qty,
-                unit_price=line_price,
-            )
-            db.session.add(order_item)
-        order.recompute_total()
-        db.session.add(OrderTrackingEvent(order=order, status="pending", message="Order received"))
-        orders.append(order)
+        product = item.product
+        variant = item.variant
+        qty = item.quantity
+        if variant:
+            if variant.stock < qty:
+                raise StorefrontError(f"{product.name} variant '{variant.value}' no longer available.")
+            variant.stock -= qty
+        else:
+            if product.stock < qty:
+                raise StorefrontError(f"{product.name} is out of stock.")
+            product.stock -= qty
+            decremented_products.append(product)
+        lines_by_seller[product.seller_id].append(
+            {
+                "product_id": product.id,
+                "variant_id": variant.id if variant else None,
+                "quantity": qty,
+                "unit_price": Decimal(item.unit_price),
+            }
+        )
+        sales.append((product.id, qty, qty * Decimal(item.unit_price)))
+
+    # placed_at is left to the column's server default, like every other timestamp.
+    order_rows = [
+        {
+            "seller_id": seller_id,
+            "buyer_id": user.id,
+            "status": "processing",
+            "total_amount": _line_total(lines),
+        }
+        for seller_id, lines in lines_by_seller.items()
+    ]
+    orders = _insert_orders(order_rows)
+
+    order_items = [
+        dict(line, order_id=order.id)
+        for order in orders
+        for line in lines_by_seller[order.seller_id]
+    ]
+    db.session.execute(insert(OrderItem), order_items)
+    db.session.execute(
+        insert(OrderTrackingEvent),
+        [{"order_id": order.id, "status": "pending", "message": "Order received"} for order in orders],
+    )
+    # Variant lines draw on the variant's own stock, not Product.stock.
+    ledger_rows = [
+        {"product_id": line["product_id"], "change": -line["quantity"], "source": "order", "note": f"Order #{order.id}"}
+        for order in orders
+        for line in lines_by_seller[order.seller_id]
+        if line["variant_id"] is None
+    ]
+    if ledger_rows:
+        db.session.execute(insert(InventoryTransaction), ledger_rows)
+    record_new_orders(
+        (order, sum(line["quantity"] for line in lines_by_seller[order.seller_id])) for order in orders
+    )
+    record_product_sales(sales)
+    track_low_stock(decremented_products)
 
     cart.status = "checked_out"
+    cart.active_user_id = None
     cart.items.clear()
     db.session.commit()
+    # Reading order.seller_id here would reload every order expired by the commit.
+    invalidate_seller_metrics(*lines_by_seller)
     return orders
 
 
@@ -320,6 +585,7 @@ def create_review(user: User, product_id: int, rating: int, title: str, body: st
         count += 1
     review.media_count = count
     db.session.commit()
+    invalidate_seller_metrics(store.seller_id)
     return review
 
 
@@ -360,10 +626,42 @@ def respond_to_review(seller: User, review_id: int, message: str) -> ReviewRespo
     return response
 
 
+# Upper bound on reviews changed by one bulk moderation action.
+MODERATION_BATCH_LIMIT = 500
+
+
 def moderate_review(review_id: int, publish: bool) -> Review:
     review = Review.query.get(review_id)
     if not review:
         raise StorefrontError("Review not found.")
-    review.is_published = bool(publish)
-    db.session.commit()
+    moderate_reviews([review.id], publish)
     return review
+
+
+def moderate_reviews(review_ids: Iterable[int], publish: bool) -> int:
+    """Publish or hide many reviews with one UPDATE; returns how many changed.
+
+    Rating averages and breakdowns are aggregated from published reviews when
+    read, so they follow this commit. The cached seller metrics of every
+    affected store and the platform moderation count are invalidated with it.
+    """
+    review_ids = sorted(set(review_ids))
+    if len(review_ids) > MODERATION_BATCH_LIMIT:
+        raise StorefrontError(f"Select at most {MODERATION_BATCH_LIMIT} reviews at a time.")
+    if not review_ids:
+        return 0
+    pending = Review.id.in_(review_ids), Review.is_published != bool(publish)
+    rows = db.session.execute(
+        select(Review.id, StoreProfile.seller_id).join(StoreProfile, Review.store_id == StoreProfile.id).where(*pending)
+    ).all()
+    changed = db.session.execute(
+        update(Review).where(*pending).values(is_published=bool(publish)).execution_options(synchronize_session=False)
+    ).rowcount
+    action = "review.publish" if publish else "review.hide"
+    for row in rows:
+        record_audit(action, "review", row.id)
+    db.session.commit()
+    if changed:
+        invalidate_seller_metrics(*(row.seller_id for row in rows))
+        invalidate_platform_metrics()
+    return changed
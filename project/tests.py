@@ -1,26 +1,97 @@
 import itertools
 import io
+import threading
+import time
+from datetime import date, datetime, timedelta
 from decimal import Decimal
 from pathlib import Path
 from typing import Dict, Iterable, Tuple
 
 import pytest
-from sqlalchemy import inspect
+from sqlalchemy import event, func, inspect, select
 from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash
 
-from project import create_app, db
+from project import create_app, db, mail
+from project.services.admin_service import (
+    BULK_REVIEW_LIMIT,
+    AdminError,
+    list_pending_requests,
+    list_reviews,
+    list_users,
+    review_role_requests,
+)
+from project.services.account_deletion_service import drain_deletion_jobs, run_deletion_step
+from project.services.audit_service import AuditFilters, flush_audit_log, list_audit_events, record_audit
+from project.services.auth_service import AuthService
+from project.services.retention_service import prune_carts
+from project.services.settings_service import get_settings, save_settings, setting_enabled
+from project.services.seller_service import (
+    ProductValidationError,
+    gather_dashboard_metrics,
+    list_seller_orders,
+    list_seller_products,
+    log_manual_order,
+    update_order_status,
+    upsert_category,
+)
+from project.services.stats_service import rebuild_seller_daily_stats, reconcile_product_sales, seller_order_totals
+from project.services.email_service import deliver_outbox, drain_outbox, enqueue_email
+from project.services.inventory_service import (
+    iter_inventory_drift,
+    ledger_balance,
+    rebuild_low_stock,
+    send_low_stock_digests,
+    take_inventory_snapshots,
+    track_low_stock,
+)
+from project.services.metrics_cache import (
+    PLATFORM_SCOPE,
+    MetricsCache,
+    invalidate_platform_metrics,
+    invalidate_seller_metrics,
+)
+from project.services.order_explorer_service import OrderFilters, list_orders, order_totals
+from project.services.platform_service import (
+    _grouped_user_counts,
+    _stored_user_counts,
+    monitoring_metrics,
+    rebuild_platform_counters,
+)
+from project.services.storefront_service import (
+    ensure_store_profile,
+    get_or_create_cart,
+    get_rating_breakdown,
+    moderate_reviews,
+    update_store_profile,
+)
 from project.models import (
+    AuditEvent,
+    Cart,
+    CartItem,
     Category,
+    EmailOutbox,
+    InventorySnapshot,
+    InventoryTransaction,
+    LowStockItem,
     OAuth,
     Order,
+    OrderItem,
     OrderTrackingEvent,
+    PlatformCounter,
     Product,
+    ProductImage,
     Review,
+    SellerDailyStats,
     SiteSetting,
     StoreProfile,
     User,
+    UserDeletionJob,
 )
+from project.utils.debug_smtp import DebugSMTPServer
+from project.utils.slugs import next_free_slug
+from project.utils.statements import StatementCounter
+from project.utils.timeids import id_floor, id_timestamp, next_id
 from project.utils.validators import Validators
 
 
@@ -256,7 +327,6 @@ def test_public_routes_render(client, path, status_code):
         ("/rider/dashboard", "/login"),
         ("/rider/deliveries", "/login"),
         ("/pending", "/login"),
-        ("/shop/cart", "/login"),
         ("/admin/overview", "/admin/login"),
         ("/admin/users", "/admin/login"),
         ("/admin/pending", "/admin/login"),
@@ -468,6 +538,318 @@ def test_product_image_limit_enforced(client, user_factory):
     assert b"only store up to 5 images" in response.data
 
 
+def test_seller_dashboard_query_count_is_bounded(client, app, user_factory):
+    seller = user_factory(email="kpis@example.com", role="seller", is_approved=True)
+    login(client, seller.email, DEFAULT_PASSWORD)
+    with app.app_context():
+        category = Category(name="Tools", slug="tools")
+        products = [
+            Product(
+                seller_id=seller.id,
+                name=f"Tool {idx}",
+                price=Decimal("10.00"),
+                stock=idx,
+                category=category,
+                is_featured=idx % 2 == 0,
+            )
+            for idx in range(12)
+        ]
+        db.session.add_all(products)
+        db.session.flush()
+        for idx, status in enumerate(("pending", "processing", "completed", "cancelled") * 3):
+            order = Order(seller_id=seller.id, status=status, total_amount=Decimal("10.00"))
+            order.items.append(OrderItem(product_id=products[idx].id, quantity=1, unit_price=Decimal("10.00")))
+            db.session.add(order)
+        db.session.commit()
+        rebuild_seller_daily_stats()
+        rebuild_low_stock(seller.id)
+    client.get("/seller/dashboard")
+    with app.app_context():
+        invalidate_seller_metrics(seller.id)
+        with StatementCounter(db.engine) as counter:
+            response = client.get("/seller/dashboard")
+    assert response.status_code == 200
+    assert counter.count <= 9, counter.statements
+    with app.app_context():
+        metrics = gather_dashboard_metrics(seller.id)
+    assert metrics["total_products"] == 12
+    assert metrics["featured_products"] == 6
+    assert metrics["total_stock"] == sum(range(12))
+    assert metrics["total_orders"] == 12
+    assert metrics["open_orders"] == 6
+    assert metrics["total_revenue"] == pytest.approx(60.0)
+    assert [p["stock"] for p in metrics["low_inventory"]] == [0, 1, 2, 3, 4]
+    assert len(metrics["featured_list"]) == 5
+
+
+def test_seller_daily_stats_follow_order_writes_and_rebuild(client, app, user_factory):
+    seller = user_factory(role="seller", is_approved=True)
+    buyer = user_factory(email="rollup@example.com")
+    with app.app_context():
+        product = Product(seller_id=seller.id, name="Kettle", price=Decimal("25.00"), stock=20)
+        db.session.add(product)
+        db.session.commit()
+        product_id = product.id
+    login(client, buyer.email, DEFAULT_PASSWORD)
+    client.post("/shop/cart/items", data={"product_id": product_id, "quantity": 3})
+    client.post("/shop/cart/checkout")
+    with app.app_context():
+        seller_row = db.session.get(User, seller.id)
+        manual = log_manual_order(seller_row, product_id, 2)
+        update_order_status(manual, "cancelled")
+
+        def snapshot():
+            return [
+                (row.orders, row.units, float(row.gross_revenue), float(row.recognized_revenue),
+                 row.processing_count, row.cancelled_count)
+                for row in SellerDailyStats.query.filter_by(seller_id=seller.id)
+            ]
+
+        maintained = snapshot()
+        assert maintained == [(2, 5, 125.0, 75.0, 1, 1)]
+        rebuild_seller_daily_stats(seller.id)
+        assert snapshot() == maintained
+        totals = seller_order_totals(seller.id)
+        assert totals["orders"] == 2
+        assert totals["open_orders"] == 1
+
+
+def test_product_sales_counters_maintained_and_reconciled(client, app, user_factory):
+    seller = user_factory(email="counters@example.com", role="seller", is_approved=True)
+    buyer = user_factory(email="counterbuyer@example.com")
+    with app.app_context():
+        mug = Product(seller_id=seller.id, name="Mug", price=Decimal("8.00"), stock=20)
+        tray = Product(seller_id=seller.id, name="Tray", price=Decimal("30.00"), stock=20)
+        db.session.add_all([mug, tray])
+        db.session.commit()
+        mug_id, tray_id = mug.id, tray.id
+    login(client, buyer.email, DEFAULT_PASSWORD)
+    client.post("/shop/cart/items", data={"product_id": mug_id, "quantity": 3})
+    client.post("/shop/cart/checkout")
+    with app.app_context():
+        log_manual_order(db.session.get(User, seller.id), tray_id, 1)
+        with StatementCounter(db.engine) as counter:
+            performance = gather_dashboard_metrics(seller.id)["product_performance"]
+        assert [(row["name"], row["units_sold"], float(row["revenue"])) for row in performance] == [
+            ("Tray", 1, 30.0),
+            ("Mug", 3, 24.0),
+        ]
+        assert not any("order_item" in statement for statement in counter.statements)
+
+        db.session.get(Product, mug_id).units_sold = 99
+        db.session.commit()
+        assert reconcile_product_sales(seller.id) == 1
+        assert reconcile_product_sales() == 0
+        assert db.session.get(Product, mug_id).units_sold == 3
+
+
+def test_inventory_ledger_covers_checkout_and_reconciles(client, app, user_factory):
+    seller = user_factory(email="ledger@example.com", role="seller", is_approved=True)
+    buyer = user_factory(email="ledgerbuyer@example.com")
+    with app.app_context():
+        product = Product(seller_id=seller.id, name="Bowl", price=Decimal("5.00"), stock=0)
+        db.session.add(product)
+        product.adjust_stock(10, note="Initial stock", source="initial")
+        db.session.commit()
+        product_id = product.id
+    login(client, buyer.email, DEFAULT_PASSWORD)
+    client.post("/shop/cart/items", data={"product_id": product_id, "quantity": 3})
+    client.post("/shop/cart/checkout")
+    with app.app_context():
+        log_manual_order(db.session.get(User, seller.id), product_id, 2)
+        assert ledger_balance(product_id) == db.session.get(Product, product_id).stock == 5
+
+        assert take_inventory_snapshots(now=datetime.utcnow() + timedelta(hours=1)) == 1
+        snapshot = db.session.get(InventorySnapshot, product_id)
+        assert (snapshot.balance, snapshot.last_transaction_id) == (5, InventoryTransaction.query.count())
+        log_manual_order(db.session.get(User, seller.id), product_id, 1)
+        assert ledger_balance(product_id) == 4
+        assert list(iter_inventory_drift()) == []
+
+        db.session.get(Product, product_id).stock = 50
+        extras = [Product(seller_id=seller.id, name=f"Cup {idx}", price=Decimal("2.00"), stock=idx) for idx in (1, 2)]
+        db.session.add_all(extras)
+        db.session.commit()
+        assert [(d["product_id"], d["drift"]) for d in iter_inventory_drift()] == [
+            (product_id, 46), (extras[0].id, 1), (extras[1].id, 2)
+        ]
+    result = app.test_cli_runner().invoke(args=["reconcile-inventory", "--repair", "--batch-size", "2"])
+    assert "drift=+46" in result.output
+    assert "Wrote 3 reconciliation row(s)." in result.output
+    with app.app_context():
+        assert list(iter_inventory_drift()) == []
+
+
+def test_low_stock_crossing_already_recorded_by_a_concurrent_write(app, user_factory):
+    seller = user_factory(role="seller")
+    with app.app_context():
+        product = Product(seller_id=seller.id, name="Kettle", price=Decimal("9.00"), stock=2, reorder_threshold=5)
+        db.session.add(product)
+        db.session.commit()
+
+        product_id = product.id
+        raced = []
+
+        # Another checkout records the crossing right after our SELECT saw no row.
+        def racing_insert(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("SELECT low_stock_item.product_id") and not raced:
+                raced.append(True)
+                cursor.connection.execute(
+                    "INSERT INTO low_stock_item (product_id, seller_id, stock, threshold) VALUES (?, ?, 3, 5)",
+                    (product_id, seller.id),
+                )
+
+        event.listen(db.engine, "after_cursor_execute", racing_insert)
+        try:
+            track_low_stock([product])
+        finally:
+            event.remove(db.engine, "after_cursor_execute", racing_insert)
+        db.session.commit()
+        assert raced
+        row = db.session.get(LowStockItem, product.id)
+        assert (row.stock, row.threshold, row.alerted_at) == (2, 5, None)
+        assert LowStockItem.query.count() == 1
+
+
+def test_low_stock_crossings_tracked_at_write_time_and_digested(client, app, user_factory):
+    seller = user_factory(email="lowstock@example.com", role="seller", is_approved=True)
+    buyer = user_factory(email="lowstockbuyer@example.com")
+    login(client, seller.email, DEFAULT_PASSWORD)
+    client.post(
+        "/seller/products/new",
+        data={"name": "Teapot", "price": "15", "stock": "8", "reorder_threshold": "5"},
+        follow_redirects=True,
+    )
+    with app.app_context():
+        product_id = Product.query.filter_by(name="Teapot").one().id
+        assert LowStockItem.query.count() == 0
+    client.get("/logout")
+    login(client, buyer.email, DEFAULT_PASSWORD)
+    client.post("/shop/cart/items", data={"product_id": product_id, "quantity": 3})
+    client.post("/shop/cart/checkout")
+    with app.app_context():
+        log_manual_order(db.session.get(User, seller.id), product_id, 1)
+        row = db.session.get(LowStockItem, product_id)
+        assert (row.stock, row.threshold, row.alerted_at) == (4, 5, None)
+
+        with mail.record_messages() as outbox:
+            assert send_low_stock_digests() == 1
+            assert send_low_stock_digests() == 0
+            assert outbox == []
+            drain_outbox()
+        assert outbox[0].recipients == [seller.email]
+        assert "Teapot: 4 left (reorder at 5)" in outbox[0].body
+        assert [p["name"] for p in gather_dashboard_metrics(seller.id)["low_inventory"]] == ["Teapot"]
+
+    client.get("/logout")
+    login(client, seller.email, DEFAULT_PASSWORD)
+    client.post(
+        f"/seller/products/{product_id}/edit",
+        data={"name": "Teapot", "price": "15", "stock": "20", "reorder_threshold": "5", "is_active": "on"},
+        follow_redirects=True,
+    )
+    with app.app_context():
+        assert LowStockItem.query.count() == 0
+
+
+def test_seller_dashboard_metrics_cached_and_invalidated(client, app, user_factory):
+    seller = user_factory(email="cached@example.com", role="seller", is_approved=True)
+    login(client, seller.email, DEFAULT_PASSWORD)
+    with app.app_context():
+        product = Product(seller_id=seller.id, name="Lamp", price=Decimal("30.00"), stock=9)
+        db.session.add(product)
+        db.session.commit()
+        product_id = product.id
+    client.get("/seller/dashboard")
+    with app.app_context():
+        with StatementCounter(db.engine) as counter:
+            response = client.get("/seller/dashboard")
+    assert b"Figures updated" in response.data
+    assert not any("seller_daily_stats" in statement for statement in counter.statements)
+
+    client.post("/seller/orders", data={"product_id": product_id, "quantity": 2})
+    response = client.get("/seller/dashboard")
+    assert b"2 orders" not in response.data
+    assert b"1 orders" in response.data
+
+
+def test_metrics_cache_serves_stale_value_while_refreshing(app):
+    app.config.update(SELLER_METRICS_SOFT_TTL=0, SELLER_METRICS_ASYNC_REFRESH=True)
+    cache = MetricsCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    with app.app_context():
+        assert cache.get("dashboard", 1, compute) == (1, 0.0)
+        value, age = cache.get("dashboard", 1, compute)
+        assert value == 1
+        assert age >= 0
+        deadline = time.monotonic() + 5
+        while cache._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.get("dashboard", 1, compute)[0] == 2
+        cache.invalidate(1)
+        while cache._refreshing and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert cache.get("dashboard", 1, compute) == (len(calls), 0.0)
+
+
+def test_platform_metrics_follow_their_own_ttls(app):
+    app.config.update(SELLER_METRICS_SOFT_TTL=0, SELLER_METRICS_HARD_TTL=0, PLATFORM_METRICS_SOFT_TTL=60)
+    cache = MetricsCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return len(calls)
+
+    with app.app_context():
+        assert cache.get("user_counts", PLATFORM_SCOPE, compute)[0] == 1
+        assert cache.get("user_counts", PLATFORM_SCOPE, compute)[0] == 1
+        cache.get("dashboard", 1, compute)
+        assert cache.get("dashboard", 1, compute)[0] == 3
+
+
+def test_sales_series_fills_gaps_buckets_and_compares_periods(client, app, user_factory):
+    seller = user_factory(email="series@example.com", role="seller", is_approved=True)
+    with app.app_context():
+        for day, orders, revenue in [
+            (date(2026, 2, 20), 1, "50.00"),
+            (date(2026, 3, 2), 2, "40.00"),
+            (date(2026, 3, 4), 1, "20.00"),
+            (date(2026, 3, 10), 3, "90.00"),
+        ]:
+            db.session.add(SellerDailyStats(
+                seller_id=seller.id, day=day, orders=orders, units=orders,
+                gross_revenue=Decimal(revenue), recognized_revenue=Decimal(revenue),
+            ))
+        db.session.commit()
+    login(client, seller.email, DEFAULT_PASSWORD)
+
+    daily = client.get("/seller/store/analytics/series?start=2026-03-02&end=2026-03-15&window=2").get_json()
+    assert len(daily["labels"]) == 14
+    assert daily["series"]["revenue"][:4] == [40.0, 0.0, 20.0, 0.0]
+    assert daily["moving_average"]["revenue"][:3] == [40.0, 20.0, 10.0]
+    assert daily["totals"] == {"orders": 6, "units": 6, "revenue": 150.0}
+    assert daily["previous_totals"]["revenue"] == 50.0
+    assert daily["deltas"]["revenue"] == 200.0
+
+    weekly = client.get("/seller/store/analytics/series?start=2026-03-02&end=2026-03-15&granularity=week").get_json()
+    assert weekly["labels"] == ["2026-03-02", "2026-03-09"]
+    assert weekly["series"]["orders"] == [3, 3]
+
+    bad = client.get("/seller/store/analytics/series?granularity=hour")
+    assert bad.status_code == 400
+    assert "Granularity" in bad.get_json()["error"]
+    for window in ("abc", "", "-3", "0", "1000", "%C2%B2"):
+        bad = client.get(f"/seller/store/analytics/series?window={window}")
+        assert bad.status_code == 400, window
+        assert "Window" in bad.get_json()["error"]
+
+
 def test_manual_order_creation_updates_inventory(client, app, user_factory):
     seller = user_factory(email="orders@example.com", role="seller", is_approved=True)
     login(client, seller.email, DEFAULT_PASSWORD)
@@ -494,6 +876,96 @@ def test_manual_order_creation_updates_inventory(client, app, user_factory):
         assert float(order.total_amount) == pytest.approx(200.0, rel=1e-3)
 
 
+def test_seller_products_page_paginates_searches_and_skips_description(client, app, user_factory):
+    seller = user_factory(email="catalog@example.com", role="seller", is_approved=True)
+    with app.app_context():
+        category = Category(name="Lighting", slug="lighting")
+        products = [
+            Product(
+                seller_id=seller.id,
+                name=f"Lamp {idx:02d}",
+                price=Decimal(idx + 1),
+                stock=idx,
+                description="x" * 5000,
+                category=category if idx % 2 else None,
+            )
+            for idx in range(25)
+        ]
+        db.session.add_all(products)
+        db.session.flush()
+        db.session.add_all([
+            ProductImage(product_id=products[3].id, path="uploads/second.jpg", position=1),
+            ProductImage(product_id=products[3].id, path="uploads/first.jpg", position=0),
+        ])
+        db.session.commit()
+
+        with StatementCounter(db.engine) as counter:
+            page = list_seller_products(seller.id, sort="price", page=1, per_page=10)
+        assert counter.count == 2
+        assert not any("description" in statement for statement in counter.statements)
+        assert (page.total, page.pages) == (25, 3)
+        assert [row.name for row in page.rows[:4]] == ["Lamp 00", "Lamp 01", "Lamp 02", "Lamp 03"]
+        assert page.rows[3].image_path == "uploads/first.jpg"
+        assert page.rows[1].category_name == "Lighting"
+        assert len(list_seller_products(seller.id, page=9, per_page=10).rows) == 5
+        matches = list_seller_products(seller.id, search="lamp 1")
+        assert matches.total == 10
+        assert {row.name for row in matches.rows} == {f"Lamp {idx}" for idx in range(10, 20)}
+
+    login(client, seller.email, DEFAULT_PASSWORD)
+    response = client.get("/seller/products?sort=name&page=2")
+    assert b"Page 2 of 2" in response.data
+    assert b"Lamp 24" in response.data
+    assert b"Lamp 00" not in response.data
+
+
+def test_seller_orders_keyset_pages_filters_and_product_search(client, app, user_factory):
+    seller = user_factory(email="pages@example.com", role="seller", is_approved=True)
+    base = datetime(2026, 5, 1, 12, 0, 0)
+    with app.app_context():
+        lantern = Product(seller_id=seller.id, name="Paper Lantern", price=Decimal("12.00"), stock=4)
+        db.session.add_all([lantern, Product(seller_id=seller.id, name="Candle", price=Decimal("3.00"), stock=9)])
+        db.session.flush()
+        for idx in range(30):
+            # Pairs share a timestamp so the id tie-breaker is exercised.
+            order = Order(
+                seller_id=seller.id,
+                status="shipped" if idx % 2 else "pending",
+                total_amount=12,
+                placed_at=base - timedelta(hours=idx // 2),
+            )
+            order.items.append(OrderItem(product_id=lantern.id, quantity=1, unit_price=Decimal("12.00")))
+            db.session.add(order)
+        db.session.commit()
+        expected = [
+            order.id
+            for order in Order.query.filter_by(seller_id=seller.id).order_by(Order.placed_at.desc(), Order.id.desc())
+        ]
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = list_seller_orders(seller.id, after=cursor, limit=7)
+            seen.extend(order.id for order in page)
+            if not cursor:
+                break
+        assert seen == expected
+        shipped, _ = list_seller_orders(seller.id, status="shipped", end=base.date() - timedelta(days=1))
+        assert all(order.status == "shipped" for order in shipped)
+        assert len(shipped) == 2
+        with pytest.raises(ProductValidationError):
+            list_seller_orders(seller.id, after="garbage")
+
+    login(client, seller.email, DEFAULT_PASSWORD)
+    response = client.get("/seller/orders")
+    assert b"Paper Lantern" in response.data
+    assert b"Older" in response.data
+    assert b"Older" not in client.get("/seller/orders?status=shipped").data
+    response = client.get("/seller/orders?start=2026-02-30", follow_redirects=True)
+    assert b"Start date must use the YYYY-MM-DD format." in response.data
+    results = client.get("/seller/products/search?q=lant").get_json()["results"]
+    assert [product["name"] for product in results] == ["Paper Lantern"]
+
+
 def test_seller_can_update_order_status(client, app, user_factory):
     seller = user_factory(email="status@example.com", role="seller", is_approved=True)
     login(client, seller.email, DEFAULT_PASSWORD)
@@ -523,6 +995,26 @@ def test_store_profile_auto_created_on_dashboard(client, app, user_factory):
         assert store.slug
 
 
+def test_store_profile_id_cached_in_session(client, app, user_factory):
+    seller = user_factory(email="cachedstore@example.com", role="seller", is_approved=True)
+    login(client, seller.email, DEFAULT_PASSWORD)
+    client.get("/seller/dashboard")
+    with app.app_context():
+        with StatementCounter(db.engine) as counter:
+            client.get("/seller/products")
+        assert not any("FROM store_profile" in statement for statement in counter.statements)
+        with StatementCounter(db.engine) as counter:
+            client.get("/seller/store/reviews")
+        assert sum("FROM store_profile" in statement for statement in counter.statements) == 1
+
+        db.session.delete(StoreProfile.query.filter_by(seller_id=seller.id).one())
+        db.session.commit()
+    response = client.get("/seller/store/profile")
+    assert response.status_code == 200
+    with app.app_context():
+        assert StoreProfile.query.filter_by(seller_id=seller.id).count() == 1
+
+
 def test_store_profile_update(client, app, user_factory):
     seller = user_factory(email="storeupdate@example.com", role="seller", is_approved=True)
     login(client, seller.email, DEFAULT_PASSWORD)
@@ -540,6 +1032,66 @@ def test_store_profile_update(client, app, user_factory):
         assert store.contact_email == "store@example.com"
 
 
+def test_store_slugs_allocated_with_one_prefix_query(app, user_factory):
+    owners = [user_factory(email=f"slug{idx}@example.com", role="seller", is_approved=True) for idx in range(4)]
+    with app.app_context():
+        db.session.add_all([
+            StoreProfile(seller_id=owners[0].id, name="Acme", slug="acme"),
+            StoreProfile(seller_id=owners[1].id, name="Acme", slug="acme-10"),
+            StoreProfile(seller_id=owners[2].id, name="Acme Shop", slug="acme-shop"),
+        ])
+        db.session.commit()
+        with StatementCounter(db.engine) as counter:
+            assert next_free_slug(StoreProfile, "acme") == "acme-11"
+        assert counter.count == 1
+        assert next_free_slug(StoreProfile, "acme%") == "acme%"
+
+        store = db.session.get(User, owners[3].id)
+        store = ensure_store_profile(store)
+        update_store_profile(store, {"slug": "Acme Shop"}, {}, app.config)
+        assert store.slug == "acme-shop-2"
+        assert upsert_category("Home Decor").id == upsert_category("home_decor").id
+
+
+def test_concurrent_store_profiles_get_distinct_slugs(tmp_path):
+    concurrent_app = create_app(
+        "testing",
+        config_overrides={"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'slugs.db'}"},
+    )
+    with concurrent_app.app_context():
+        db.create_all()
+        sellers = [User(username=name, email=f"{name}{idx}@example.com", role="seller")
+                   for idx, name in enumerate(["acme", "Acme", "ACME", "aCme", "acMe", "acmE"])]
+        db.session.add_all(sellers)
+        db.session.commit()
+        seller_ids = [seller.id for seller in sellers]
+
+    barrier = threading.Barrier(len(seller_ids))
+    errors = []
+
+    def create(seller_id):
+        with concurrent_app.app_context():
+            try:
+                seller = db.session.get(User, seller_id)
+                barrier.wait()
+                ensure_store_profile(seller)
+            except Exception as exc:  # pragma: no cover - surfaced below
+                errors.append(exc)
+            finally:
+                db.session.remove()
+
+    threads = [threading.Thread(target=create, args=(seller_id,)) for seller_id in seller_ids]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with concurrent_app.app_context():
+        slugs = [store.slug for store in StoreProfile.query.all()]
+        db.engine.dispose()
+    assert errors == []
+    assert sorted(slugs) == ["acme", "acme-2", "acme-3", "acme-4", "acme-5", "acme-6"]
+
+
 def test_rider_dashboard_allowed_for_rider(client, user_factory):
     rider = user_factory(email="rider@example.com", role="rider", is_approved=True)
     login(client, rider.email, DEFAULT_PASSWORD)
@@ -702,6 +1254,42 @@ def test_admin_users_lists_roles(admin_client, user_factory):
     assert b"rider" in response.data
 
 
+def test_admin_user_directory_pages_filters_and_searches(admin_client, app, user_factory):
+    for idx in range(30):
+        user_factory(username=f"shopper{idx:02d}", email=f"shopper{idx:02d}@example.com")
+    user_factory(username="vendor", email="vendor@example.com", role="seller", is_suspended=True)
+    user_factory(username="hopeful", email="hopeful@example.com", role_requested="rider", is_approved=False)
+    with app.app_context():
+        first = list_users(sort="username", per_page=10)
+        assert first.total == 33
+        assert first.pages == 4
+        assert len(first.rows) == 10
+        last = list_users(sort="username", page=99, per_page=10)
+        assert last.page == 4
+        assert [u.username for u in list_users(search="shopper0", sort="username").rows] == [
+            f"shopper0{idx}" for idx in range(10)
+        ]
+        assert [u.username for u in list_users(search="vendor@").rows] == ["vendor"]
+        assert list_users(search="%").total == 0
+        assert [u.username for u in list_users(role="seller").rows] == ["vendor"]
+        assert [u.username for u in list_users(status="suspended").rows] == ["vendor"]
+        assert [u.username for u in list_users(status="pending").rows] == ["hopeful"]
+        assert list_users(status="active").total == 31
+        pending_page = list_pending_requests(role="rider")
+        assert [u.username for u in pending_page.rows] == ["hopeful"]
+        assert list_pending_requests(role="seller").total == 0
+
+        with StatementCounter(db.engine) as counter:
+            response = admin_client.get("/admin/users?q=shopper1&sort=username")
+    assert response.status_code == 200
+    assert b"shopper10" in response.data
+    assert b"shopper20" not in response.data
+    user_queries = [statement for statement in counter.statements if "FROM user" in statement]
+    assert len(user_queries) <= 3, user_queries
+    response = admin_client.get("/admin/pending?q=hope")
+    assert b"hopeful" in response.data
+
+
 def test_admin_can_approve_request(admin_client, app, user_factory):
     pending_user = user_factory(
         username="promote",
@@ -720,6 +1308,118 @@ def test_admin_can_approve_request(admin_client, app, user_factory):
         assert refreshed.is_approved is True
 
 
+def test_admin_decisions_and_password_resets_queue_email(admin_client, app, client, user_factory):
+    pending_user = user_factory(role_requested="seller", is_approved=False)
+    with app.app_context():
+        with mail.record_messages() as outbox:
+            admin_client.post(f"/admin/approve-request/{pending_user.id}")
+            client.post("/reset", data={"email": pending_user.email})
+            assert outbox == []
+            queued = EmailOutbox.query.order_by(EmailOutbox.id).all()
+            assert [(row.recipients, row.status) for row in queued] == [
+                (pending_user.email, "pending"),
+                (pending_user.email, "pending"),
+            ]
+            assert "approved" in queued[0].subject
+            assert queued[1].html
+            assert drain_outbox() == 2
+        assert [message.recipients for message in outbox] == [[pending_user.email]] * 2
+        assert EmailOutbox.query.filter_by(status="sent").count() == 2
+
+
+@pytest.mark.parametrize("bounce_first", [False, True])
+def test_outbox_reuses_one_smtp_connection_and_backs_off(tmp_path, bounce_first):
+    server = DebugSMTPServer(rejected_recipients={"bounce@example.com"}).start()
+    smtp_app = create_app(
+        "testing",
+        config_overrides={
+            "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'outbox.db'}",
+            "MAIL_SERVER": "127.0.0.1",
+            "MAIL_PORT": server.port,
+            "MAIL_USE_TLS": False,
+            "MAIL_SUPPRESS_SEND": False,
+            "EMAIL_OUTBOX_MAX_ATTEMPTS": 2,
+        },
+    )
+    try:
+        with smtp_app.app_context():
+            db.create_all()
+            if bounce_first:
+                # A refused recipient must not abort the rest of the batch.
+                enqueue_email(["bounce@example.com"], subject="Bounce", body="Thanks!")
+            for idx in range(3):
+                enqueue_email([f"buyer{idx}@example.com"], subject=f"Order {idx}", body="Thanks!")
+            if not bounce_first:
+                enqueue_email(["bounce@example.com"], subject="Bounce", body="Thanks!")
+            assert enqueue_email([None], subject="Nobody") is None
+            db.session.commit()
+
+            now = datetime.utcnow() + timedelta(seconds=1)
+            assert deliver_outbox(now=now) == 4
+            assert server.connections == 1
+            assert sorted(message.recipients[0] for message in server.messages) == [
+                "buyer0@example.com",
+                "buyer1@example.com",
+                "buyer2@example.com",
+            ]
+            assert b"Subject: Order 0" in server.messages[0].data
+            bounced = EmailOutbox.query.filter_by(subject="Bounce").one()
+            assert (bounced.status, bounced.attempts) == ("pending", 1)
+            assert bounced.next_attempt_at == now + timedelta(seconds=30)
+
+            assert deliver_outbox(now=now) == 0
+            assert deliver_outbox(now=now + timedelta(seconds=30)) == 1
+            bounced = EmailOutbox.query.filter_by(subject="Bounce").one()
+            assert (bounced.status, bounced.attempts) == ("failed", 2)
+            assert "bounce@example.com" in bounced.last_error
+            assert EmailOutbox.query.filter_by(status="sent").count() == 3
+            assert server.connections == 2
+    finally:
+        server.stop()
+        with smtp_app.app_context():
+            db.drop_all()
+            db.engine.dispose()
+
+
+def test_admin_bulk_review_updates_once_and_queues_notifications(admin_client, app, admin_user, user_factory):
+    applicants = [
+        user_factory(role_requested="seller" if idx % 2 else "rider", is_approved=False) for idx in range(6)
+    ]
+    bystander = user_factory(role="buyer")
+    with app.app_context():
+        rebuild_platform_counters()
+        with StatementCounter(db.engine) as counter:
+            response = admin_client.post(
+                "/admin/pending/review",
+                data={"action": "approve", "user_ids": [u.id for u in applicants[:4]] + [bystander.id]},
+                follow_redirects=True,
+            )
+        assert b"4 request(s) approved." in response.data
+        user_updates = [statement for statement in counter.statements if statement.startswith("UPDATE user")]
+        assert len(user_updates) == 1, user_updates
+        approved = [db.session.get(User, u.id) for u in applicants[:4]]
+        assert sorted(u.role for u in approved) == ["rider", "rider", "seller", "seller"]
+        assert all(u.is_approved and u.role_requested is None for u in approved)
+        assert {u.approved_by_id for u in approved} == {admin_user.id}
+        assert all(u.approved_at is not None for u in approved)
+        assert db.session.get(User, bystander.id).approved_by_id is None
+        assert sorted(row.recipients for row in EmailOutbox.query.all()) == sorted(u.email for u in approved)
+
+        admin_client.post(
+            "/admin/pending/review",
+            data={"action": "reject", "user_ids": [u.id for u in applicants[4:]]},
+        )
+        declined = [db.session.get(User, u.id) for u in applicants[4:]]
+        assert [(u.role, u.role_requested, u.is_approved) for u in declined] == [("buyer", None, False)] * 2
+        assert EmailOutbox.query.filter(EmailOutbox.subject.contains("declined")).count() == 2
+        stored = {name: value for name, value in _stored_user_counts().items() if value}
+        assert stored == {name: value for name, value in _grouped_user_counts().items() if value}
+
+    with app.app_context():
+        with pytest.raises(AdminError):
+            review_role_requests(range(BULK_REVIEW_LIMIT + 1), approve=True, reviewer_id=admin_user.id)
+
+
 def test_admin_can_reject_request(admin_client, app, user_factory):
     pending_user = user_factory(
         username="reject",
@@ -752,8 +1452,252 @@ def test_admin_suspend_reactivate_and_delete_user(admin_client, app, user_factor
         user = db.session.get(User, target.id)
         assert user.is_suspended is False
     response = admin_client.post(f"/admin/users/{target.id}/delete", follow_redirects=True)
+    assert b"being removed in the background" in response.data
     with app.app_context():
-        assert db.session.get(User, target.id) is None
+        user = db.session.get(User, target.id)
+        assert user.deleted_at is not None and user.is_suspended is True
+        drain_deletion_jobs()
+        db.session.expire_all()
+        user = db.session.get(User, target.id)
+        assert user.email is None and user.username == f"deleted-user-{target.id}"
+
+
+def test_user_deletion_runs_in_chunks_and_keeps_sold_history(admin_client, app, admin_user, user_factory):
+    seller = user_factory(role="seller", email="closing@example.com")
+    buyer = user_factory(email="leaving@example.com")
+    shopper = user_factory()
+    upload_root = Path(app.config["UPLOAD_FOLDER"])
+    with app.app_context():
+        store = ensure_store_profile(db.session.get(User, seller.id))
+        products = [
+            Product(seller_id=seller.id, name=f"Mug {idx}", price=Decimal("5.00"), stock=3) for idx in range(5)
+        ]
+        db.session.add_all(products)
+        db.session.flush()
+        db.session.add_all(
+            InventoryTransaction(product_id=product.id, change=3, source="initial") for product in products
+        )
+        image_file = upload_root / f"{products[0].id}_deletion_test.png"
+        image_file.write_bytes(b"png")
+        db.session.add(ProductImage(product_id=products[0].id, path=f"uploads/{image_file.name}"))
+        sold = products[1]
+        order = Order(seller_id=seller.id, buyer_id=buyer.id, total_amount=Decimal("5.00"))
+        order.items.append(OrderItem(product_id=sold.id, quantity=1, unit_price=Decimal("5.00")))
+        db.session.add(order)
+        for product in products[:3]:
+            db.session.add(Review(product_id=product.id, store_id=store.id, user_id=buyer.id, rating=4, body="ok"))
+        cart = Cart(user_id=shopper.id)
+        cart.items.append(CartItem(product_id=products[2].id, quantity=1, unit_price=Decimal("5.00")))
+        db.session.add(cart)
+        db.session.add(Cart(user_id=buyer.id))
+        db.session.commit()
+        product_ids = [product.id for product in products]
+        sold_id, order_id = sold.id, order.id
+
+    response = admin_client.post(f"/admin/users/{seller.id}/delete", follow_redirects=True)
+    assert response.status_code == 200
+    admin_client.post(f"/admin/users/{buyer.id}/delete")
+    with app.app_context():
+        # Nothing but the account itself changes on the request path.
+        assert db.session.execute(db.select(db.func.count(Product.id))).scalar() == 5
+        assert {user.id for user in list_users(status="deleted").rows} == {seller.id, buyer.id}
+        assert seller.id not in {user.id for user in list_users().rows}
+        assert _grouped_user_counts()["role:seller"] == 0
+
+        steps = 0
+        while True:
+            with StatementCounter(db.engine) as counter:
+                job = run_deletion_step(chunk_size=2)
+            if job is None:
+                break
+            assert counter.count <= 20, counter.statements
+            steps += 1
+        assert steps > 6
+        db.session.expire_all()
+
+        seller_job = db.session.execute(db.select(UserDeletionJob).filter_by(user_id=seller.id)).scalar_one()
+        assert seller_job.status == "done" and seller_job.finished_at is not None
+        assert (seller_job.products_removed, seller_job.products_retired) == (4, 1)
+        assert seller_job.reviews_removed == 3 and seller_job.files_removed == 1
+        assert not image_file.exists()
+        remaining = db.session.execute(db.select(Product).where(Product.id.in_(product_ids))).scalars().all()
+        assert [(product.id, product.is_active, product.stock) for product in remaining] == [(sold_id, False, 0)]
+        assert ledger_balance(sold_id) == 0
+        assert list(iter_inventory_drift()) == []
+        assert db.session.execute(db.select(db.func.count(CartItem.id))).scalar() == 0
+        assert db.session.execute(db.select(db.func.count(StoreProfile.id))).scalar() == 0
+
+        buyer_job = db.session.execute(db.select(UserDeletionJob).filter_by(user_id=buyer.id)).scalar_one()
+        assert buyer_job.status == "done"
+        assert (buyer_job.carts_removed, buyer_job.orders_anonymized) == (1, 1)
+        kept_order = db.session.get(Order, order_id)
+        assert kept_order.buyer_id is None and kept_order.seller_id == seller.id
+        assert [item.product_id for item in kept_order.items] == [sold_id]
+        assert db.session.get(User, seller.id).email is None
+
+    response = admin_client.get("/admin/users?status=deleted")
+    assert b"Deleted" in response.data and b"1 retired" in response.data
+    response = admin_client.post(f"/admin/users/{seller.id}/reactivate", follow_redirects=True)
+    assert b"cannot be reactivated" in response.data
+
+
+def test_admin_overview_counts_users_in_one_query(admin_client, app, user_factory):
+    user_factory(role="seller")
+    user_factory(role="rider")
+    user_factory(role="buyer", role_requested="seller", is_approved=False)
+    with app.app_context():
+        invalidate_platform_metrics()
+        with StatementCounter(db.engine) as counter:
+            response = admin_client.get("/admin/overview")
+    assert response.status_code == 200
+    grouped = [statement for statement in counter.statements if "GROUP BY user.role" in statement]
+    assert len(grouped) == 1, counter.statements
+    assert sum("FROM user" in statement for statement in counter.statements) <= 2
+    assert b"User counts updated" in response.data
+
+
+def test_admin_monitoring_uses_one_statement(admin_client, app):
+    with app.app_context():
+        with StatementCounter(db.engine) as counter:
+            response = admin_client.get("/admin/monitoring")
+    assert response.status_code == 200
+    metric_queries = [statement for statement in counter.statements if '"order"' in statement]
+    assert len(metric_queries) == 1, metric_queries
+
+
+def test_platform_counters_follow_signup_approval_and_deletion(admin_client, app, client, user_factory):
+    pending = user_factory(role="buyer", role_requested="seller", is_approved=False)
+    doomed = user_factory(role="rider")
+    with app.app_context():
+        rebuild_platform_counters()
+    client.post(
+        "/signup",
+        data={"username": "counted", "email": "counted@example.com", "password": "newpassword123"},
+    )
+    admin_client.post(f"/admin/approve-request/{pending.id}")
+    admin_client.post(f"/admin/users/{doomed.id}/delete")
+    with app.app_context():
+        stored = {name: value for name, value in _stored_user_counts().items() if value}
+        assert stored == {name: value for name, value in _grouped_user_counts().items() if value}
+        assert stored["role:seller"] == 1
+        assert "pending" not in stored
+        assert "role:rider" not in stored
+
+        app.config["ADMIN_COUNTS_FROM_COUNTERS"] = True
+        db.session.get(PlatformCounter, "users").value += 100
+        db.session.commit()
+        invalidate_platform_metrics()
+        response = admin_client.get("/admin/overview")
+    assert response.status_code == 200
+    assert str(stored["users"] + 100).encode() in response.data
+
+
+def test_admin_order_explorer_pages_filters_totals_and_exports(admin_client, app, user_factory):
+    seller = user_factory(role="seller", email="shop@example.com")
+    other_seller = user_factory(role="seller")
+    buyer = user_factory(email="buyer@example.com")
+    base = datetime(2026, 3, 1, 12, 0)
+    with app.app_context():
+        for idx in range(7):
+            db.session.add(
+                Order(
+                    seller_id=seller.id if idx % 2 == 0 else other_seller.id,
+                    buyer_id=buyer.id if idx < 3 else None,
+                    status="shipped" if idx % 3 == 0 else "pending",
+                    total_amount=Decimal(10 * (idx + 1)),
+                    placed_at=base + timedelta(days=idx),
+                )
+            )
+        db.session.commit()
+
+        first, cursor = list_orders(OrderFilters(), limit=3)
+        second, cursor = list_orders(OrderFilters(), after=cursor, limit=3)
+        third, cursor = list_orders(OrderFilters(), after=cursor, limit=3)
+        assert [row.total_amount for row in first + second + third] == [Decimal(10 * n) for n in range(7, 0, -1)]
+        assert cursor is None
+        assert first[0].seller_name == seller.username and first[0].buyer_email is None
+
+        seller_rows, _ = list_orders(OrderFilters(seller_id=seller.id, status="shipped"))
+        assert [row.total_amount for row in seller_rows] == [Decimal(70), Decimal(10)]
+        dated, _ = list_orders(OrderFilters(start=date(2026, 3, 2), end=date(2026, 3, 3)))
+        assert [row.total_amount for row in dated] == [Decimal(30), Decimal(20)]
+
+        with StatementCounter(db.engine) as counter:
+            totals = order_totals(OrderFilters(buyer_id=buyer.id))
+        assert counter.count == 1
+        assert (totals["orders"], totals["revenue"], totals["shipped"], totals["pending"]) == (3, 60.0, 1, 2)
+        assert totals["average"] == 20.0
+
+    response = admin_client.get("/admin/orders?seller=shop@example.com&status=shipped")
+    assert response.status_code == 200
+    assert b"Matching Orders" in response.data
+    assert b"70.00" in response.data and b"20.00" not in response.data
+    response = admin_client.get("/admin/orders?seller=nobody@example.com", follow_redirects=True)
+    assert b"No user with email nobody@example.com." in response.data
+    response = admin_client.get("/admin/orders?seller=%C2%B2", follow_redirects=True)
+    assert response.status_code == 200
+    assert "No user with email ²." in response.get_data(as_text=True)
+    response = admin_client.get("/admin/orders/export.csv?start=2024-13-01")
+    assert response.status_code == 302
+    response = admin_client.get("/admin/orders?end=yesterday", follow_redirects=True)
+    assert b"End date must use the YYYY-MM-DD format." in response.data
+
+    response = admin_client.get("/admin/orders/export.csv?buyer=buyer@example.com")
+    assert response.mimetype == "text/csv"
+    lines = response.get_data(as_text=True).strip().splitlines()
+    assert lines[0] == "order_id,placed_at,status,total_amount,currency,seller,buyer_email"
+    assert len(lines) == 4
+    assert all(line.endswith(",buyer@example.com") for line in lines[1:])
+    assert b"Gross Revenue" in admin_client.get("/admin/sales?start=2026-03-01").data
+
+
+def test_admin_content_center_pages_and_bulk_moderates_reviews(admin_client, app, user_factory):
+    sellers = [user_factory(role="seller"), user_factory(role="seller")]
+    author = user_factory(username="critic")
+    with app.app_context():
+        review_ids = []
+        for seller_id in (s.id for s in sellers):
+            store = ensure_store_profile(db.session.get(User, seller_id))
+            product = Product(seller_id=seller_id, name=f"Lamp {seller_id}", price=Decimal("20.00"), stock=5)
+            db.session.add(product)
+            db.session.flush()
+            for rating in (5, 3, 1):
+                review = Review(product_id=product.id, store_id=store.id, user_id=author.id, rating=rating,
+                                body="ok", media_count=rating % 2)
+                db.session.add(review)
+                db.session.flush()
+                review_ids.append(review.id)
+        db.session.commit()
+        first_product = db.session.get(Review, review_ids[0]).product_id
+        assert get_rating_breakdown(first_product)["average"] == 3
+
+        admin_client.get("/admin/content")
+        with StatementCounter(db.engine) as counter:
+            response = admin_client.get("/admin/content?status=published")
+        assert response.status_code == 200
+        assert b"Lamp" in response.data and b"critic" in response.data
+        review_queries = [statement for statement in counter.statements if "FROM review" in statement]
+        assert len(review_queries) == 2, review_queries
+        assert not any("FROM product" in statement and "review" not in statement for statement in counter.statements)
+
+        low_ratings = review_ids[2::3] + review_ids[1::3]
+        with StatementCounter(db.engine) as counter:
+            response = admin_client.post(
+                "/admin/content/reviews/bulk",
+                data={"action": "hide", "review_ids": low_ratings},
+                follow_redirects=True,
+            )
+        assert b"4 review(s) hidden." in response.data
+        updates = [statement for statement in counter.statements if statement.startswith("UPDATE review")]
+        assert len(updates) == 1, updates
+        assert get_rating_breakdown(first_product)["average"] == 5
+        assert list_reviews(status="hidden").total == 4
+        assert list_reviews(status="published").total == 2
+        assert monitoring_metrics()[0]["pending_reviews"] == 4
+
+        assert moderate_reviews(review_ids, publish=True) == 4
+        assert list_reviews(status="hidden").total == 0
+        assert monitoring_metrics()[0]["pending_reviews"] == 0
 
 
 def test_admin_cannot_suspend_self(admin_client, app, admin_user):
@@ -783,6 +1727,54 @@ def test_admin_settings_bootstrap_and_update(admin_client, app):
         assert setting.value == "support@example.com"
 
 
+def test_site_settings_snapshot_and_maintenance_gate(admin_client, app, user_factory):
+    buyer = user_factory()
+    visitor = app.test_client()
+    admin_client.post(
+        "/admin/settings",
+        data={"support_email": "help@dione.test", "support_phone": "+63 900 111 2222", "maintenance_mode": "on"},
+    )
+    with app.app_context():
+        assert get_settings()["maintenance_mode"] == "true"
+        with app.test_request_context("/"):
+            with StatementCounter(db.engine) as counter:
+                assert setting_enabled("maintenance_mode") is True
+                get_settings()
+            assert counter.count == 0, counter.statements
+        with pytest.raises(TypeError):
+            get_settings()["maintenance_mode"] = "false"
+
+    response = visitor.get("/")
+    assert response.status_code == 503
+    assert b"help@dione.test" in response.data
+    assert login(visitor, buyer.email, DEFAULT_PASSWORD).status_code == 503
+    assert visitor.get("/shop/").status_code == 503
+    assert admin_client.get("/").status_code == 200
+    assert admin_client.get("/admin/overview").status_code == 200
+
+    with app.app_context():
+        # Another process switches maintenance off: only the shared version moves.
+        db.session.execute(
+            SiteSetting.__table__.update().where(SiteSetting.key == "maintenance_mode").values(value="false")
+        )
+        db.session.get(PlatformCounter, "settings_version").value += 1
+        db.session.commit()
+        assert get_settings()["maintenance_mode"] == "true"
+        app.extensions["site_settings"].checked_at = 0.0
+        assert get_settings()["maintenance_mode"] == "false"
+    assert visitor.get("/").status_code == 200
+
+
+def test_auto_approve_setting_skips_the_pending_queue(app):
+    with app.app_context():
+        save_settings({"auto_approve_riders": "true"})
+        rider, error = AuthService.create_user("fastrider", "fast@example.com", "secret123", role="rider")
+        seller, _ = AuthService.create_user("slowseller", "slow@example.com", "secret123", role="seller")
+        assert error is None
+        assert (rider.role, rider.role_requested, rider.is_approved) == ("rider", None, True)
+        assert (seller.role, seller.role_requested, seller.is_approved) == ("buyer", "seller", False)
+
+
 def test_admin_dashboard_counts_include_pending(admin_client, user_factory):
     user_factory(role="buyer")
     user_factory(role="seller")
@@ -846,6 +1838,209 @@ def test_cart_checkout_creates_orders_and_tracking(client, app, user_factory):
         assert OrderTrackingEvent.query.filter_by(order_id=orders[0].id).count() == 1
 
 
+def test_multi_seller_checkout_splits_orders_and_totals(client, app, user_factory):
+    sellers = [user_factory(role="seller", is_approved=True) for _ in range(3)]
+    buyer = user_factory(email="multibuyer@example.com", role="buyer")
+    with app.app_context():
+        products = [
+            Product(seller_id=seller.id, name=f"Item {idx}", price=Decimal("10.50") * (idx + 1), stock=4)
+            for idx, seller in enumerate(sellers)
+        ]
+        db.session.add_all(products)
+        db.session.commit()
+        product_ids = [product.id for product in products]
+    login(client, buyer.email, DEFAULT_PASSWORD)
+    for product_id in product_ids:
+        client.post("/shop/cart/items", data={"product_id": product_id, "quantity": 2})
+    client.post("/shop/cart/checkout", follow_redirects=True)
+    with app.app_context():
+        orders = Order.query.filter_by(buyer_id=buyer.id).order_by(Order.seller_id).all()
+        assert [order.seller_id for order in orders] == [seller.id for seller in sellers]
+        assert [float(order.total_amount) for order in orders] == [21.0, 42.0, 63.0]
+        assert all(len(order.items) == 1 for order in orders)
+        assert OrderTrackingEvent.query.count() == 3
+        assert [db.session.get(Product, pid).stock for pid in product_ids] == [2, 2, 2]
+
+
+def test_checkout_takes_placed_at_from_the_database(client, app, user_factory):
+    sellers = [user_factory(role="seller", is_approved=True) for _ in range(2)]
+    buyer = user_factory(email="clockbuyer@example.com", role="buyer")
+    with app.app_context():
+        products = [Product(seller_id=seller.id, name="Clock", price=Decimal("5.00"), stock=3) for seller in sellers]
+        db.session.add_all(products)
+        db.session.commit()
+        product_ids = [product.id for product in products]
+    login(client, buyer.email, DEFAULT_PASSWORD)
+    for product_id in product_ids:
+        client.post("/shop/cart/items", data={"product_id": product_id, "quantity": 1})
+    client.post("/shop/cart/checkout", follow_redirects=True)
+    with app.app_context():
+        now = db.session.scalar(select(func.now()))
+        orders = Order.query.filter_by(buyer_id=buyer.id).all()
+        assert len(orders) == 2
+        for order in orders:
+            assert abs(order.placed_at - now) < timedelta(minutes=1)
+            stats = SellerDailyStats.query.filter_by(seller_id=order.seller_id).one()
+            assert stats.day == order.placed_at.date()
+
+
+def test_guest_cart_uses_cookie_and_merges_on_login(client, app, user_factory):
+    seller = user_factory(email="guestseller@example.com", role="seller", is_approved=True)
+    buyer = user_factory(email="guestbuyer@example.com", role="buyer")
+    with app.app_context():
+        product = Product(seller_id=seller.id, name="Guest Lamp", price=Decimal("45.00"), stock=3)
+        db.session.add(product)
+        db.session.commit()
+        product_id = product.id
+    client.post("/shop/cart/items", data={"product_id": product_id, "quantity": 2})
+    response = client.get("/shop/cart")
+    assert response.status_code == 200
+    assert b"Guest Lamp" in response.data
+    assert client.get_cookie("guest_cart") is not None
+    with app.app_context():
+        assert Cart.query.count() == 0
+
+    login(client, buyer.email, DEFAULT_PASSWORD)
+    assert client.get_cookie("guest_cart") is None
+    with app.app_context():
+        cart = Cart.query.filter_by(user_id=buyer.id, status="active").one()
+        assert [(item.product_id, item.quantity) for item in cart.items] == [(product_id, 2)]
+
+
+def test_guest_cart_ignores_tampered_cookie(client, app):
+    client.set_cookie("guest_cart", "not-a-signed-value")
+    response = client.get("/shop/cart")
+    assert response.status_code == 200
+    assert b"Your cart is empty" in response.data
+
+
+def test_batch_cart_add_merges_lines_and_rejects_invalid_batches(client, app, user_factory):
+    seller = user_factory(role="seller", is_approved=True)
+    buyer = user_factory(email="bundle@example.com")
+    with app.app_context():
+        tent = Product(seller_id=seller.id, name="Tent", price=Decimal("150.00"), stock=5)
+        stove = Product(seller_id=seller.id, name="Stove", price=Decimal("40.00"), stock=5)
+        db.session.add_all([tent, stove])
+        db.session.commit()
+        tent_id, stove_id = tent.id, stove.id
+    login(client, buyer.email, DEFAULT_PASSWORD)
+    client.post("/shop/cart/items", data={"product_id": tent_id, "quantity": 1})
+    response = client.post(
+        "/shop/cart/items/batch",
+        json={"items": [
+            {"product_id": tent_id, "quantity": 1},
+            {"product_id": stove_id, "quantity": 2},
+            {"product_id": stove_id, "quantity": 1},
+        ]},
+    )
+    assert response.status_code == 200
+    assert response.get_json() == {"added": 3, "cart_quantity": 5}
+
+    response = client.post(
+        "/shop/cart/items/batch",
+        json={"items": [{"product_id": tent_id, "quantity": 1}, {"product_id": 9999, "quantity": 1}]},
+    )
+    assert response.status_code == 400
+    assert response.get_json()["error"] == "Product not available."
+    with app.app_context():
+        cart = Cart.query.filter_by(active_user_id=buyer.id).one()
+        quantities = {item.product_id: item.quantity for item in cart.items}
+        assert quantities == {tent_id: 2, stove_id: 3}
+
+
+def test_get_or_create_cart_keeps_single_active_cart(app, user_factory):
+    shopper = user_factory()
+    with app.app_context():
+        first = get_or_create_cart(shopper)
+        db.session.commit()
+        second = get_or_create_cart(shopper)
+        db.session.commit()
+        assert first.id == second.id
+        assert Cart.query.filter_by(user_id=shopper.id).count() == 1
+
+        db.session.add(Cart(user_id=shopper.id, status="active"))
+        with pytest.raises(IntegrityError):
+            db.session.commit()
+        db.session.rollback()
+
+        cart = db.session.get(Cart, first.id)
+        cart.status = "checked_out"
+        cart.active_user_id = None
+        db.session.commit()
+        replacement = get_or_create_cart(shopper)
+        db.session.commit()
+        assert replacement.id != first.id
+        assert replacement.active_user_id == shopper.id
+
+
+def test_prune_carts_removes_checked_out_and_abandoned_carts(app, user_factory):
+    seller = user_factory(role="seller", is_approved=True)
+    shoppers = [user_factory() for _ in range(4)]
+    stale = datetime.utcnow() - timedelta(days=90)
+    with app.app_context():
+        product = Product(seller_id=seller.id, name="Mug", price=Decimal("5.00"), stock=10)
+        db.session.add(product)
+        carts = [
+            Cart(user_id=shoppers[0].id, status="checked_out"),
+            Cart(user_id=shoppers[1].id, status="checked_out"),
+            Cart(user_id=shoppers[2].id, status="active", updated_at=stale),
+            Cart(user_id=shoppers[3].id, status="active"),
+        ]
+        db.session.add_all(carts)
+        db.session.flush()
+        db.session.add_all(
+            CartItem(cart_id=cart.id, product_id=product.id, quantity=1, unit_price=Decimal("5.00"))
+            for cart in carts[2:]
+        )
+        db.session.commit()
+        fresh_cart_id = carts[3].id
+
+        preview = prune_carts(active_ttl_days=30, batch_size=2, dry_run=True)
+        assert preview == {"checked_out_carts": 2, "expired_active_carts": 1, "cart_items": 1, "batches": 2}
+        assert Cart.query.count() == 4
+
+        report = prune_carts(active_ttl_days=30, batch_size=2)
+        assert report == preview
+        assert [cart.id for cart in Cart.query.all()] == [fresh_cart_id]
+        assert CartItem.query.count() == 1
+
+
+def test_prune_carts_keeps_items_of_a_cart_touched_mid_batch(app, user_factory):
+    seller = user_factory(role="seller", is_approved=True)
+    shopper = user_factory()
+    with app.app_context():
+        product = Product(seller_id=seller.id, name="Mug", price=Decimal("5.00"), stock=10)
+        cart = Cart(user_id=shopper.id, status="active", updated_at=datetime.utcnow() - timedelta(days=90))
+        db.session.add_all([product, cart])
+        db.session.flush()
+        db.session.add(CartItem(cart_id=cart.id, product_id=product.id, quantity=1, unit_price=Decimal("5.00")))
+        db.session.commit()
+        cart_id = cart.id
+        touched = []
+
+        # The shopper comes back right after the batch SELECT picked the cart.
+        def shopper_returns(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("SELECT cart.id, cart.status") and not touched:
+                touched.append(True)
+                cursor.connection.execute("UPDATE cart SET updated_at = CURRENT_TIMESTAMP WHERE id = ?", (cart_id,))
+
+        event.listen(db.engine, "after_cursor_execute", shopper_returns)
+        try:
+            report = prune_carts(active_ttl_days=30)
+        finally:
+            event.remove(db.engine, "after_cursor_execute", shopper_returns)
+        assert touched
+        assert report == {"checked_out_carts": 0, "expired_active_carts": 0, "cart_items": 0, "batches": 1}
+        assert db.session.get(Cart, cart_id) is not None
+        assert CartItem.query.filter_by(cart_id=cart_id).count() == 1
+
+
+def test_prune_carts_cli_dry_run(app):
+    result = app.test_cli_runner().invoke(args=["prune-carts", "--dry-run"])
+    assert result.exit_code == 0
+    assert "Would delete 0 checked-out cart(s)" in result.output
+
+
 def test_review_creation_and_seller_response(client, app, user_factory):
     seller = user_factory(email="sellerreviews@example.com", role="seller", is_approved=True)
     buyer = user_factory(email="buyerreviews@example.com", role="buyer")
@@ -991,3 +2186,82 @@ def test_signup_form_validation(username, email, password, expected):
         assert errors == []
     else:
         assert len(errors) >= 1
+
+
+def test_time_ordered_ids_increase_and_decode():
+    before = datetime.utcnow() - timedelta(seconds=1)
+    ids = [next_id() for _ in range(5000)]
+    assert ids == sorted(set(ids))
+    assert before <= id_timestamp(ids[0]) <= datetime.utcnow() + timedelta(seconds=1)
+    assert id_floor(before) < ids[0]
+
+
+def test_audit_events_follow_commits_and_are_written_in_batches(app):
+    with app.app_context():
+        record_audit("user.suspend", "user", 1)
+        db.session.rollback()
+        record_audit("user.suspend", "user", 2)
+        record_audit("user.reactivate", "user", 2, {"reason": "appeal"})
+        db.session.commit()
+        assert db.session.execute(db.select(db.func.count(AuditEvent.id))).scalar() == 0
+
+        with StatementCounter(db.engine) as counter:
+            assert flush_audit_log() == 2
+        inserts = [statement for statement in counter.statements if statement.startswith("INSERT INTO audit_event")]
+        assert len(inserts) == 1, counter.statements
+
+        for idx in range(5):
+            record_audit("review.hide", "review", idx)
+        db.session.commit()
+        flush_audit_log()
+        first, cursor = list_audit_events(AuditFilters(), limit=4)
+        second, cursor = list_audit_events(AuditFilters(), before=cursor, limit=4)
+        assert cursor is None
+        events = first + second
+        assert [event.id for event in events] == sorted((event.id for event in events), reverse=True)
+        assert [event.target_id for event in events[:5]] == [4, 3, 2, 1, 0]
+        assert events[-1].details_dict == {}
+        assert events[-2].details_dict == {"reason": "appeal"}
+        assert [e.target_id for e in list_audit_events(AuditFilters(action="user.reactivate"))[0]] == [2]
+        tomorrow = date.today() + timedelta(days=1)
+        assert list_audit_events(AuditFilters(start=tomorrow))[0] == []
+        assert len(list_audit_events(AuditFilters(end=date.today()))[0]) == 7
+
+
+def test_admin_actions_are_audited_without_inline_writes(admin_client, app, admin_user, user_factory):
+    target = user_factory(username="audited")
+    applicant = user_factory(role="buyer", role_requested="seller", is_approved=False)
+    with app.app_context():
+        with StatementCounter(db.engine) as counter:
+            admin_client.post(f"/admin/users/{target.id}/suspend")
+        assert not any("audit_event" in statement for statement in counter.statements)
+        admin_client.post(f"/admin/users/{target.id}/reactivate")
+        admin_client.post("/admin/pending/review", data={"action": "approve", "user_ids": [applicant.id]})
+        admin_client.post("/admin/settings", data={"support_email": "help@example.com", "maintenance_mode": ""})
+        admin_client.post(f"/admin/users/{target.id}/delete")
+        flush_audit_log()
+        events = list_audit_events(AuditFilters())[0]
+        assert [event.action for event in events] == [
+            "user.delete",
+            "settings.update",
+            "role_request.approve",
+            "user.reactivate",
+            "user.suspend",
+        ]
+        assert {event.actor_id for event in events} == {admin_user.id}
+        assert events[1].details_dict["support_email"] == "help@example.com"
+
+    response = admin_client.get(f"/admin/audit?action=role_request.approve&actor={admin_user.email}")
+    assert response.status_code == 200
+    assert b'badge-secondary">role_request.approve' in response.data
+    assert b'badge-secondary">user.suspend' not in response.data
+    response = admin_client.get("/admin/audit?actor=nobody@example.com", follow_redirects=True)
+    assert b"No user with email" in response.data
+    for query, message in [
+        ("actor=%C2%B2", "No user with email ²."),
+        ("target_id=12x", "Target id must be a whole number."),
+        ("start=2026-13-01", "Start date must use the YYYY-MM-DD format."),
+    ]:
+        response = admin_client.get(f"/admin/audit?{query}", follow_redirects=True)
+        assert message in response.get_data(as_text=True), query
+
@@ -0,0 +1,96 @@
+"""
+A minimal in-process SMTP server for local development and tests.
+
+It speaks enough SMTP for ``smtplib`` and Flask-Mail: it accepts any login and
+every message, and keeps the messages in memory. Point ``MAIL_SERVER`` and
+``MAIL_PORT`` at it and set ``MAIL_USE_TLS`` to false.
+"""
+import socketserver
+import threading
+from collections import namedtuple
+from typing import Iterable, List
+
+ReceivedMessage = namedtuple("ReceivedMessage", "sender recipients data")
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line: str):
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self._reply("220 debug-smtp ready")
+        sender, recipients = None, []
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            command = raw.decode(errors="replace").strip()
+            verb = command[:4].upper()
+            if verb == "EHLO":
+                self._reply("250-debug-smtp")
+                self._reply("250 AUTH PLAIN")
+            elif verb == "HELO":
+                self._reply("250 debug-smtp")
+            elif verb == "AUTH":
+                self._reply("235 Authentication successful")
+            elif verb == "MAIL":
+                sender, recipients = command.split(":", 1)[1].strip().strip("<>"), []
+                self._reply("250 OK")
+            elif verb == "RCPT":
+                address = command.split(":", 1)[1].strip().strip("<>")
+                if address in server.rejected_recipients:
+                    self._reply("550 Mailbox unavailable")
+                else:
+                    recipients.append(address)
+                    self._reply("250 OK")
+            elif verb == "DATA":
+                self._reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(line[1:] if line.startswith(b"..") else line)
+                with server.lock:
+                    server.messages.append(ReceivedMessage(sender, recipients, b"".join(lines)))
+                self._reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self._reply("250 OK")
+            elif verb == "QUIT":
+                self._reply("221 Bye")
+                return
+            else:
+                self._reply("502 Command not implemented")
+
+
+class DebugSMTPServer(socketserver.ThreadingTCPServer):
+    """Collects delivered messages in ``messages`` and counts ``connections``.
+
+    Recipients listed in ``rejected_recipients`` are refused with a 550, which
+    lets tests exercise retry handling.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, rejected_recipients: Iterable[str] = ()):
+        super().__init__((host, port), _SMTPHandler)
+        self.lock = threading.Lock()
+        self.messages: List[ReceivedMessage] = []
+        self.connections = 0
+        self.rejected_recipients = set(rejected_recipients)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> "DebugSMTPServer":
+        threading.Thread(target=self.serve_forever, name="debug-smtp", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
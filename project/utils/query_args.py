@@ -0,0 +1,50 @@
+"""
+Strict parsing of filter values taken from query strings.
+
+``request.args.get(name, type=...)`` turns a malformed value into ``None``,
+which silently drops the filter it was meant to apply. These helpers raise
+``error`` (any ``ValueError`` subclass, typically the calling service's own)
+instead, and treat only a missing or blank value as "no filter".
+"""
+from datetime import date
+from typing import Optional, Type
+
+from sqlalchemy import select
+
+from project import db
+from project.models import User
+
+
+def parse_int_arg(value: Optional[str], label: str, error: Type[ValueError] = ValueError) -> Optional[int]:
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise error(f"{label} must be a whole number.")
+
+
+def parse_date_arg(value: Optional[str], label: str, error: Type[ValueError] = ValueError) -> Optional[date]:
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise error(f"{label} must use the YYYY-MM-DD format.")
+
+
+def resolve_user_arg(value: Optional[str], error: Type[ValueError] = ValueError) -> Optional[int]:
+    """Accept a user id or an exact email address."""
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    user_id = db.session.execute(select(User.id).where(User.email == value)).scalar()
+    if user_id is None:
+        raise error(f"No user with email {value}.")
+    return user_id
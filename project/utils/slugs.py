@@ -0,0 +1,63 @@
+"""
+Slug helpers shared by store profiles and categories.
+"""
+import re
+from typing import Callable, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
+
+from project import db
+
+SLUG_INSERT_ATTEMPTS = 5
+
+
+def slugify(value: str) -> str:
+    return (
+        (value or "")
+        .strip()
+        .lower()
+        .replace(" ", "-")
+        .replace("_", "-")
+    )
+
+
+def next_free_slug(model, base: str, exclude_id: Optional[int] = None) -> str:
+    """Return ``base`` if unused, otherwise ``base-N`` past the highest taken suffix.
+
+    A single prefix query over the unique slug index finds every taken
+    ``base``/``base-N`` variant, however many collisions there are.
+    """
+    query = select(model.slug).where(or_(model.slug == base, model.slug.startswith(f"{base}-", autoescape=True)))
+    if exclude_id is not None:
+        query = query.where(model.id != exclude_id)
+    taken = set(db.session.execute(query).scalars())
+    if base not in taken:
+        return base
+    suffix = re.compile(rf"{re.escape(base)}-(\d+)")
+    numbers = [int(match.group(1)) for match in map(suffix.fullmatch, taken) if match]
+    return f"{base}-{max(numbers, default=1) + 1}"
+
+
+def flush_with_unique_slug(instance, base: str, on_conflict: Optional[Callable[[], object]] = None):
+    """Give ``instance`` a free slug derived from ``base`` and flush it.
+
+    The flush runs in a savepoint; if a concurrent writer claims the slug (or
+    another unique column) first, ``on_conflict`` may return the row that won
+    the race, otherwise a fresh slug is allocated and the flush retried. Any
+    other pending changes on ``instance`` should be flushed beforehand, since
+    a rolled-back savepoint expires them. Returns the persisted object.
+    """
+    model = type(instance)
+    for attempt in range(SLUG_INSERT_ATTEMPTS):
+        instance.slug = next_free_slug(model, base, exclude_id=instance.id)
+        try:
+            with db.session.begin_nested():
+                db.session.add(instance)
+            return instance
+        except IntegrityError:
+            existing = on_conflict() if on_conflict else None
+            if existing is not None:
+                return existing
+            if attempt == SLUG_INSERT_ATTEMPTS - 1:
+                raise
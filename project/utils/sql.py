@@ -0,0 +1,84 @@
+"""
+Dialect-aware SQL helpers shared by the services.
+"""
+from typing import Dict, Iterable, List, Sequence
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from project import db
+
+
+def upsert_increment(model, rows: List[Dict], key_columns: Sequence[str], increment_columns: Iterable[str]):
+    """Insert ``rows``, or add their ``increment_columns`` onto rows that already exist.
+
+    Uses ``INSERT ... ON CONFLICT DO UPDATE`` on SQLite and
+    ``INSERT ... ON DUPLICATE KEY UPDATE`` on MySQL so each batch is a single
+    executemany; ``key_columns`` must be covered by a unique constraint. The
+    caller owns the transaction.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    increment_columns = list(increment_columns)
+    dialect = db.session.get_bind().dialect.name
+    touch = {"updated_at": func.now()} if "updated_at" in table.c else {}
+
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={**{col: table.c[col] + stmt.excluded[col] for col in increment_columns}, **touch},
+        )
+        db.session.execute(stmt, rows)
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update(
+            {**{col: table.c[col] + stmt.inserted[col] for col in increment_columns}, **touch}
+        )
+        db.session.execute(stmt, rows)
+    else:
+        for row in rows:
+            result = db.session.execute(
+                update(table)
+                .where(*[table.c[key] == row[key] for key in key_columns])
+                .values({**{col: table.c[col] + row[col] for col in increment_columns}, **touch})
+            )
+            if result.rowcount == 0:
+                db.session.execute(insert(table), [row])
+
+
+def upsert_replace(model, rows: List[Dict], key_columns: Sequence[str], replace_columns: Iterable[str]):
+    """Insert ``rows``, or overwrite ``replace_columns`` of rows that already exist.
+
+    The same dialect statements as ``upsert_increment``, for rows that a
+    concurrent transaction may have inserted between a caller's SELECT and
+    its write. The caller owns the transaction.
+    """
+    if not rows:
+        return
+    table = model.__table__
+    replace_columns = list(replace_columns)
+    dialect = db.session.get_bind().dialect.name
+
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_columns),
+            set_={col: stmt.excluded[col] for col in replace_columns},
+        )
+        db.session.execute(stmt, rows)
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(table)
+        stmt = stmt.on_duplicate_key_update({col: stmt.inserted[col] for col in replace_columns})
+        db.session.execute(stmt, rows)
+    else:
+        for row in rows:
+            result = db.session.execute(
+                update(table)
+                .where(*[table.c[key] == row[key] for key in key_columns])
+                .values({col: row[col] for col in replace_columns})
+            )
+            if result.rowcount == 0:
+                db.session.execute(insert(table), [row])
@@ -0,0 +1,26 @@
+"""
+Counting the SQL statements an engine executes, for tests and benchmarks.
+"""
+from sqlalchemy import event
+
+
+class StatementCounter:
+    """Record SQL statements sent to ``engine`` while used as a context manager."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)